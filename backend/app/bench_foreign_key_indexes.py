@@ -0,0 +1,184 @@
+"""
+Benchmark for the foreign-key index migration.
+Seeds a scratch SQLite database (100k assessments by default), times the lookups the
+routers issue without the indexes, applies the migration, and times them again.
+Run: python -m app.bench_foreign_key_indexes [--assessments 100000] [--db /tmp/bench.db]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+
+from app.database import Base
+from app import models
+from app.models import Dimension
+from app.migrate_add_foreign_key_indexes import INDEXES, create_missing_indexes
+
+BATCH_SIZE = 20_000
+
+# (label, SQL, parameter factory) - mirrors queries issued by the assessment/analytics routers
+QUERIES = [
+    ("scores by assessment", "SELECT * FROM scores WHERE assessment_id = :a", "assessment"),
+    ("findings by assessment", "SELECT * FROM findings WHERE assessment_id = :a", "assessment"),
+    ("recommendations by assessment", "SELECT * FROM recommendations WHERE assessment_id = :a", "assessment"),
+    ("recommendations by assessment+status",
+     "SELECT count(*) FROM recommendations WHERE assessment_id = :a AND status = 'completed'", "assessment"),
+    ("unread notifications by org",
+     "SELECT count(*) FROM notifications WHERE organization_id = :o AND is_read = 0", "organization"),
+    ("completed assessments by org",
+     "SELECT id FROM assessments WHERE organization_id = :o AND status = 'completed' ORDER BY completed_at",
+     "organization"),
+]
+
+
+def _insert_batched(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+
+
+def seed(engine, assessments: int, organizations: int):
+    """Create the schema without the benchmarked indexes and fill it with synthetic data."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for name, _, _ in INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    rng = random.Random(42)
+    start = datetime(2020, 1, 1)
+    dimensions = list(Dimension)
+    statuses = ["pending", "in_progress", "completed", "skipped"]
+
+    with engine.begin() as conn:
+        _insert_batched(conn, models.Organization.__table__, (
+            {"id": org_id, "name": f"Org {org_id}", "is_active": True}
+            for org_id in range(1, organizations + 1)
+        ))
+
+        def assessment_rows():
+            for assessment_id in range(1, assessments + 1):
+                created = start + timedelta(minutes=assessment_id)
+                completed = rng.random() < 0.7
+                yield {
+                    "id": assessment_id,
+                    "organization_id": rng.randint(1, organizations),
+                    "name": f"Assessment {assessment_id}",
+                    "status": "completed" if completed else "in_progress",
+                    "created_at": created,
+                    "completed_at": created + timedelta(days=1) if completed else None,
+                }
+        _insert_batched(conn, models.Assessment.__table__, assessment_rows())
+
+        _insert_batched(conn, models.Score.__table__, (
+            {
+                "assessment_id": assessment_id,
+                "dimension": dimension.name,
+                "maturity_score": 2.5,
+                "weighted_score": 2.5,
+                "max_possible_score": 5.0,
+                "percentage": 50.0,
+            }
+            for assessment_id in range(1, assessments + 1)
+            for dimension in dimensions
+        ))
+        _insert_batched(conn, models.Finding.__table__, (
+            {
+                "assessment_id": assessment_id,
+                "dimension": dimensions[i].name,
+                "severity": "high",
+                "title": "Finding",
+                "description": "Synthetic finding",
+            }
+            for assessment_id in range(1, assessments + 1)
+            for i in range(2)
+        ))
+        _insert_batched(conn, models.Recommendation.__table__, (
+            {
+                "assessment_id": assessment_id,
+                "dimension": dimensions[i % 4].name,
+                "title": "Recommendation",
+                "description": "Synthetic recommendation",
+                "effort": "medium",
+                "impact": "high",
+                "timeline": "30",
+                "priority": i,
+                "status": statuses[rng.randrange(4)],
+            }
+            for assessment_id in range(1, assessments + 1)
+            for i in range(5)
+        ))
+        _insert_batched(conn, models.Notification.__table__, (
+            {
+                "organization_id": rng.randint(1, organizations),
+                "assessment_id": assessment_id,
+                "type": "assessment_completed",
+                "title": "Assessment Completed",
+                "message": "Synthetic notification",
+                "is_read": rng.random() < 0.5,
+            }
+            for assessment_id in range(1, assessments + 1)
+        ))
+
+
+def time_queries(engine, assessments: int, organizations: int, repeats: int) -> dict:
+    """Average milliseconds per query for every entry in QUERIES."""
+    rng = random.Random(7)
+    results = {}
+    with engine.connect() as conn:
+        for label, sql, param in QUERIES:
+            statement = text(sql)
+            started = time.perf_counter()
+            for _ in range(repeats):
+                if param == "assessment":
+                    params = {"a": rng.randint(1, assessments)}
+                else:
+                    params = {"o": rng.randint(1, organizations)}
+                conn.execute(statement, params).fetchall()
+            results[label] = (time.perf_counter() - started) * 1000.0 / repeats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=100_000)
+    parser.add_argument("--organizations", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--db", help="SQLite file to use (default: a temporary file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="kpi99_bench_"), "bench.db")
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+
+    print(f"Seeding {args.assessments} assessments across {args.organizations} organizations in {path}...")
+    started = time.perf_counter()
+    seed(engine, args.assessments, args.organizations)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    before = time_queries(engine, args.assessments, args.organizations, args.repeats)
+    started = time.perf_counter()
+    created = create_missing_indexes(engine)
+    print(f"Created {len(created)} indexes in {time.perf_counter() - started:.1f}s")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    after = time_queries(engine, args.assessments, args.organizations, args.repeats)
+
+    width = max(len(label) for label, _, _ in QUERIES)
+    print(f"\n{'query'.ljust(width)}  {'before ms':>10}  {'after ms':>10}  {'speedup':>8}")
+    for label, _, _ in QUERIES:
+        speedup = before[label] / after[label] if after[label] > 0 else float("inf")
+        print(f"{label.ljust(width)}  {before[label]:10.3f}  {after[label]:10.3f}  {speedup:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
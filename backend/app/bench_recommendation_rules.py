@@ -0,0 +1,158 @@
+"""
+Regression benchmark for recommendation generation in a long-lived worker.
+Seeds a scratch SQLite database, generates recommendations for every assessment (10k by default)
+in one process, and fails unless each completion inserts the rows its score bands call for and the
+last window of completions is no slower than the first (within --max-slowdown).
+Run: python -m app.bench_recommendation_rules [--assessments 10000] [--db /tmp/bench.db]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app import models
+from app.models import Dimension
+from app.services.recommendations import RULE_CATALOG, RecommendationService, score_band
+
+BATCH_SIZE = 20_000
+
+
+def _insert_batched(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+
+
+def seed(engine, assessments: int, organizations: int) -> dict:
+    """Fill the schema with completed assessments; returns their scores by assessment id."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    start = datetime(2020, 1, 1)
+    scores = {
+        assessment_id: {dimension: round(rng.uniform(1.0, 5.0), 2) for dimension in Dimension}
+        for assessment_id in range(1, assessments + 1)
+    }
+
+    with engine.begin() as conn:
+        _insert_batched(conn, models.Organization.__table__, (
+            {"id": org_id, "name": f"Org {org_id}", "is_active": True}
+            for org_id in range(1, organizations + 1)
+        ))
+        _insert_batched(conn, models.Assessment.__table__, (
+            {
+                "id": assessment_id,
+                "organization_id": (assessment_id - 1) % organizations + 1,
+                "name": f"Assessment {assessment_id}",
+                "status": "completed",
+                "created_at": start + timedelta(minutes=assessment_id),
+                "completed_at": start + timedelta(minutes=assessment_id, hours=1),
+            }
+            for assessment_id in range(1, assessments + 1)
+        ))
+        _insert_batched(conn, models.Score.__table__, (
+            {
+                "assessment_id": assessment_id,
+                "dimension": dimension.name,
+                "maturity_score": score,
+                "weighted_score": score,
+                "max_possible_score": 5.0,
+                "percentage": score * 20.0,
+            }
+            for assessment_id, dimension_scores in scores.items()
+            for dimension, score in dimension_scores.items()
+        ))
+    return scores
+
+
+def catalog_sizes() -> dict:
+    return {key: len(rules) for key, rules in RULE_CATALOG.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=10_000)
+    parser.add_argument("--organizations", type=int, default=1_000)
+    parser.add_argument("--window", type=int, default=1_000, help="Completions per timing window")
+    parser.add_argument("--max-slowdown", type=float, default=1.5,
+                        help="Allowed ratio of the last window's mean time to the first's")
+    parser.add_argument("--db", help="SQLite file to use (default: a temporary file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="kpi99_bench_"), "bench.db")
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _scratch_pragmas(dbapi_connection, _):
+        # Scratch data: commit cost should not drown out generation cost
+        dbapi_connection.execute("PRAGMA synchronous=OFF")
+
+    print(f"Seeding {args.assessments} assessments across {args.organizations} organizations in {path}...")
+    started = time.perf_counter()
+    scores = seed(engine, args.assessments, args.organizations)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    sizes_before = catalog_sizes()
+    service = RecommendationService()
+    db = sessionmaker(bind=engine)()
+    durations = []
+    failures = []
+    try:
+        for assessment_id, dimension_scores in scores.items():
+            expected = sum(
+                sizes_before[(dimension, score_band(score))] for dimension, score in dimension_scores.items()
+            )
+            started = time.perf_counter()
+            generated = len(service.generate_recommendations(assessment_id, db))
+            durations.append(time.perf_counter() - started)
+            # Each completion starts from a clean session, like a completion job
+            db.expunge_all()
+            if generated != expected and len(failures) < 10:
+                failures.append(f"assessment {assessment_id}: {generated} recommendations, expected {expected}")
+        total_rows = db.query(models.Recommendation).count()
+    finally:
+        db.close()
+
+    expected_rows = sum(
+        sizes_before[(dimension, score_band(score))]
+        for dimension_scores in scores.values()
+        for dimension, score in dimension_scores.items()
+    )
+    if total_rows != expected_rows:
+        failures.append(f"{total_rows} recommendation rows stored, expected {expected_rows}")
+    if catalog_sizes() != sizes_before:
+        failures.append("rule catalog changed size during the run")
+
+    window = min(args.window, len(durations))
+    windows = [durations[start:start + window] for start in range(0, len(durations) - window + 1, window)]
+    means = [sum(chunk) * 1000.0 / len(chunk) for chunk in windows]
+    print(f"\n{'completions':>14}  {'mean ms':>8}")
+    for index, mean in enumerate(means):
+        print(f"{index * window + 1:>6}-{(index + 1) * window:<7}  {mean:8.3f}")
+    slowdown = means[-1] / means[0] if means and means[0] > 0 else 1.0
+    if slowdown > args.max_slowdown:
+        failures.append(f"last window is {slowdown:.2f}x the first (allowed {args.max_slowdown:.2f}x)")
+
+    print(f"\nGenerated {total_rows} recommendations for {len(durations)} assessments in {sum(durations):.1f}s")
+    if failures:
+        for failure in failures:
+            print(f"✗ {failure}")
+        sys.exit(1)
+    print(f"✓ Constant per-completion cost (last/first window: {slowdown:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
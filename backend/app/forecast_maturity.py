@@ -0,0 +1,43 @@
+"""
+Fit maturity forecasts for every organization in one pass and write them as JSON lines.
+Fills the forecast cache, which is shared with the API when a shared cache backend is configured.
+Run: python -m app.forecast_maturity [--organization-id 1 --organization-id 2] [--output forecasts.jsonl]
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.database import Base, SessionLocal, engine
+from app.services.forecasting import ForecastService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--organization-id", type=int, action="append", dest="organization_ids",
+                        help="Organization to forecast (repeatable; default: all)")
+    parser.add_argument("--output", help="File for one JSON forecast per line (default: stdout)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        forecasts = ForecastService.forecast_all(db, args.organization_ids)
+        output = open(args.output, "w") if args.output else sys.stdout
+        try:
+            for forecast in forecasts.values():
+                output.write(json.dumps(forecast) + "\n")
+        finally:
+            if args.output:
+                output.close()
+        print(f"✓ Forecast {len(forecasts)} organizations in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    except Exception as e:
+        print(f"Forecast error: {e}", file=sys.stderr)
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,38 @@ except Exception as e:
     import logging
     logging.warning("Industry migration skipped or failed: %s", e)
 
+# Ensure the unique answer index exists (idempotent; answer upserts depend on it)
+try:
+    from app.migrate_add_answer_unique_index import migrate as migrate_answer_index
+    migrate_answer_index()
+except Exception as e:
+    import logging
+    logging.warning("Answer index migration skipped or failed: %s", e)
+
+# Ensure foreign-key and analytics indexes exist (idempotent)
+try:
+    from app.migrate_add_foreign_key_indexes import migrate as migrate_foreign_key_indexes
+    migrate_foreign_key_indexes()
+except Exception as e:
+    import logging
+    logging.warning("Foreign-key index migration skipped or failed: %s", e)
+
+# Ensure the assessment cursor pagination indexes exist (idempotent)
+try:
+    from app.migrate_add_assessment_cursor_indexes import migrate as migrate_cursor_indexes
+    migrate_cursor_indexes()
+except Exception as e:
+    import logging
+    logging.warning("Cursor index migration skipped or failed: %s", e)
+
+# Ensure the assessment full-text search index exists (idempotent)
+try:
+    from app.migrate_add_assessment_search import migrate as migrate_assessment_search
+    migrate_assessment_search()
+except Exception as e:
+    import logging
+    logging.warning("Search index migration skipped or failed: %s", e)
+
 # Seed questions if the database has none (idempotent)
 try:
     from app.init_questions import init_questions
@@ -80,6 +112,18 @@ os.makedirs("reports", exist_ok=True)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 app.mount("/reports", StaticFiles(directory="reports"), name="reports")
 
+@app.on_event("shutdown")
+def shutdown_workers():
+    """Stop accepting background completion jobs, stop report render workers and release cache connections"""
+    from app.services.completion import completion_pipeline
+    from app.services.cache import cache
+    from app.services.report_cache import report_cache
+    from app.services.report_prerender import report_prerenderer
+    completion_pipeline.shutdown()
+    report_prerenderer.shutdown()
+    report_cache.shutdown()
+    cache.close()
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,43 @@
+"""
+Migration script to enforce one answer per (assessment_id, question_id).
+Removes duplicate answer rows (keeping the newest) and adds the unique index
+answer upserts rely on.
+Run once: python -m app.migrate_add_answer_unique_index
+"""
+from sqlalchemy import text, inspect
+from app.database import engine, SessionLocal
+
+INDEX_NAME = "ux_answers_assessment_question"
+
+
+def migrate():
+    """Deduplicate answers and create the unique (assessment_id, question_id) index if missing."""
+    db = SessionLocal()
+    try:
+        inspector = inspect(engine)
+        existing_indexes = [idx["name"] for idx in inspector.get_indexes("answers")]
+        if INDEX_NAME in existing_indexes:
+            print("Answer unique index already exists")
+            return
+
+        result = db.execute(text(
+            "DELETE FROM answers WHERE id NOT IN ("
+            "SELECT MAX(id) FROM answers GROUP BY assessment_id, question_id)"
+        ))
+        if result.rowcount:
+            print(f"✓ Removed {result.rowcount} duplicate answers")
+        db.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON answers(assessment_id, question_id)"
+        ))
+        db.commit()
+        print("✓ Added unique (assessment_id, question_id) index to answers")
+    except Exception as e:
+        db.rollback()
+        print(f"Migration error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
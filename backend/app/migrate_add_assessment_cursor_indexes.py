@@ -0,0 +1,41 @@
+"""
+Migration script to add the (created_at, id) indexes behind keyset pagination of assessments.
+Replaces ix_assessments_organization_id_created_at, which the new organization index covers.
+Run once: python -m app.migrate_add_assessment_cursor_indexes
+"""
+from sqlalchemy import text, inspect
+from app.database import engine
+
+# (index name, columns) - names match the Index declarations on Assessment in app/models.py
+INDEXES = [
+    ("ix_assessments_organization_id_created_at_id", ["organization_id", "created_at", "id"]),
+    ("ix_assessments_created_at_id", ["created_at", "id"]),
+]
+SUPERSEDED = "ix_assessments_organization_id_created_at"
+
+
+def migrate():
+    """Create the cursor pagination indexes if missing and drop the superseded one."""
+    try:
+        existing = {idx["name"] for idx in inspect(engine).get_indexes("assessments")}
+        changed = False
+        with engine.begin() as conn:
+            for name, columns in INDEXES:
+                if name in existing:
+                    continue
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON assessments({', '.join(columns)})"))
+                print(f"✓ Added index {name}")
+                changed = True
+            if SUPERSEDED in existing:
+                conn.execute(text(f"DROP INDEX IF EXISTS {SUPERSEDED}"))
+                print(f"✓ Dropped superseded index {SUPERSEDED}")
+                changed = True
+        if not changed:
+            print("Assessment cursor indexes already exist")
+    except Exception as e:
+        print(f"Migration error: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,30 @@
+"""
+Migration script to create and backfill the assessment full-text search index
+(FTS5 table on SQLite, tsvector table with a GIN index on Postgres).
+Run once: python -m app.migrate_add_assessment_search
+"""
+from app.database import SessionLocal
+from app.services.search import search_service
+
+
+def migrate():
+    """Create the search index for the current database if missing."""
+    db = SessionLocal()
+    try:
+        created = search_service.ensure(db)
+        db.commit()
+        backend = search_service.backend(db).name
+        if created:
+            print(f"✓ Built assessment search index ({backend})")
+        else:
+            print(f"Assessment search index already exists ({backend})")
+    except Exception as e:
+        db.rollback()
+        print(f"Migration error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,58 @@
+"""
+Migration script to index assessment child tables and the assessment columns analytics filter on.
+Safe on SQLite and Postgres; every index is created only if missing.
+Run once: python -m app.migrate_add_foreign_key_indexes
+"""
+from sqlalchemy import text, inspect
+from app.database import engine
+
+# (index name, table, columns) - names match the Index/index=True declarations in app/models.py
+INDEXES = [
+    ("ix_scores_assessment_id", "scores", ["assessment_id"]),
+    ("ix_findings_assessment_id", "findings", ["assessment_id"]),
+    ("ix_recommendations_assessment_id_status", "recommendations", ["assessment_id", "status"]),
+    ("ix_artifacts_assessment_id", "artifacts", ["assessment_id"]),
+    ("ix_telemetry_uploads_assessment_id", "telemetry_uploads", ["assessment_id"]),
+    ("ix_notifications_assessment_id", "notifications", ["assessment_id"]),
+    ("ix_notifications_organization_id_is_read", "notifications", ["organization_id", "is_read"]),
+    ("ix_notifications_organization_id_created_at", "notifications", ["organization_id", "created_at"]),
+    ("ix_assessments_status", "assessments", ["status"]),
+    ("ix_assessments_organization_id_status_completed_at", "assessments", ["organization_id", "status", "completed_at"]),
+]
+
+
+def create_missing_indexes(bind) -> list:
+    """Create every index in INDEXES that does not exist yet; returns the names created."""
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    existing = {}
+    created = []
+    with bind.begin() as conn:
+        for name, table, columns in INDEXES:
+            if table not in tables:
+                continue
+            if table not in existing:
+                existing[table] = {idx["name"] for idx in inspector.get_indexes(table)}
+            if name in existing[table]:
+                continue
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})"))
+            existing[table].add(name)
+            created.append(name)
+    return created
+
+
+def migrate():
+    """Add foreign-key and analytics indexes if missing."""
+    try:
+        created = create_missing_indexes(engine)
+    except Exception as e:
+        print(f"Migration error: {e}")
+        raise
+    for name in created:
+        print(f"✓ Added index {name}")
+    if not created:
+        print("Foreign-key indexes already exist")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -1,7 +1,7 @@
 """
 Database models for KPI99 PPI-F Digital Diagnostic Tool
 """
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, JSON, Enum
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -44,7 +44,7 @@ class Assessment(Base):
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
     name = Column(String(255), nullable=False)
     version = Column(String(50), default="1.0")
-    status = Column(String(50), default="draft")  # draft, in_progress, completed
+    status = Column(String(50), default="draft", index=True)  # draft, in_progress, completed
     notes = Column(Text, nullable=True)  # Assessment notes/comments
     tags = Column(JSON, nullable=True)  # Custom tags for categorization
     custom_fields = Column(JSON, nullable=True)  # Custom key-value fields
@@ -59,6 +59,18 @@ class Assessment(Base):
     recommendations = relationship("Recommendation", back_populates="assessment", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="assessment")
     telemetry_uploads = relationship("TelemetryUpload", back_populates="assessment", cascade="all, delete-orphan")
+    score_accumulators = relationship("ScoreAccumulator", back_populates="assessment", cascade="all, delete-orphan")
+    summary = relationship("AssessmentSummary", back_populates="assessment", uselist=False, cascade="all, delete-orphan")
+    anomalies = relationship("ScoreAnomaly", back_populates="assessment", cascade="all, delete-orphan")
+    anomaly_scan = relationship("AnomalyScan", back_populates="assessment", uselist=False, cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Analytics: completed assessments of an organization ordered by completion date
+        Index("ix_assessments_organization_id_status_completed_at", "organization_id", "status", "completed_at"),
+        # Assessment lists newest first, per organization and overall; id breaks ties for cursors
+        Index("ix_assessments_organization_id_created_at_id", "organization_id", "created_at", "id"),
+        Index("ix_assessments_created_at_id", "created_at", "id"),
+    )
 
 class Question(Base):
     __tablename__ = "questions"
@@ -89,12 +101,17 @@ class Answer(Base):
     
     assessment = relationship("Assessment", back_populates="answers")
     question = relationship("Question", back_populates="answers")
+    
+    __table_args__ = (
+        # One answer per question per assessment; also the conflict target for answer upserts
+        Index("ux_answers_assessment_question", "assessment_id", "question_id", unique=True),
+    )
 
 class Score(Base):
     __tablename__ = "scores"
     
     id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False, index=True)
     dimension = Column(Enum(Dimension), nullable=False)
     maturity_score = Column(Float, nullable=False)  # 0-5
     weighted_score = Column(Float, nullable=False)
@@ -104,11 +121,88 @@ class Score(Base):
     
     assessment = relationship("Assessment", back_populates="scores")
 
+class ScoreAccumulator(Base):
+    """Running per-dimension totals, kept current on every answer write"""
+    __tablename__ = "score_accumulators"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    dimension = Column(Enum(Dimension), nullable=False)
+    weighted_sum = Column(Float, nullable=False, default=0.0)  # sum(maturity_score * weight) of scored answers
+    total_weight = Column(Float, nullable=False, default=0.0)  # sum(weight) of scored answers
+    critical_blockers = Column(Integer, nullable=False, default=0)  # critical answers scoring below 2.0
+    answer_count = Column(Integer, nullable=False, default=0)  # answer rows folded in, scored or not
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    assessment = relationship("Assessment", back_populates="score_accumulators")
+    
+    __table_args__ = (
+        Index("ux_score_accumulators_assessment_dimension", "assessment_id", "dimension", unique=True),
+    )
+
+class ScoreAnomaly(Base):
+    """Anomaly flagged by the batch scan against an assessment's score history"""
+    __tablename__ = "score_anomalies"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    type = Column(String(50), nullable=False)  # regression, unusual_improvement, dimension_imbalance
+    dimension = Column(String(50), nullable=False)  # dimension value, or "all"
+    severity = Column(String(20), nullable=False)  # low, medium, high
+    message = Column(Text, nullable=False)
+    recommendation = Column(Text)
+    confidence = Column(Float)
+    z_score = Column(Float)  # against the rolling window; None for imbalance
+    detected_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    assessment = relationship("Assessment", back_populates="anomalies")
+
+class AnomalyScan(Base):
+    """Marks an assessment as covered by the last anomaly scan, with or without findings"""
+    __tablename__ = "anomaly_scans"
+    
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), primary_key=True)
+    anomaly_count = Column(Integer, nullable=False, default=0)
+    scanned_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    assessment = relationship("Assessment", back_populates="anomaly_scan")
+
+class AssessmentSummary(Base):
+    """Denormalized scores, findings, recommendations and derived figures of one assessment"""
+    __tablename__ = "assessment_summaries"
+    
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), primary_key=True)
+    payload = Column(JSON, nullable=False)  # see AssessmentSummaryService.build_payload
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    assessment = relationship("Assessment", back_populates="summary")
+
+class OrgMetricsRollup(Base):
+    """Materialized organization metrics; a missing row is rebuilt from the source tables"""
+    __tablename__ = "org_metrics_rollup"
+    
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    total_assessments = Column(Integer, nullable=False, default=0)
+    completed_assessments = Column(Integer, nullable=False, default=0)
+    maturity_sum = Column(Float, nullable=False, default=0.0)  # sum of overall maturity of scored completions
+    maturity_count = Column(Integer, nullable=False, default=0)
+    dimension_sums = Column(JSON, nullable=False, default=dict)  # {dimension: sum of maturity scores}
+    dimension_counts = Column(JSON, nullable=False, default=dict)  # {dimension: number of scores}
+    # Recommendations of completed assessments; NULL status counts as pending
+    recommendations_total = Column(Integer, nullable=False, default=0)
+    recommendations_pending = Column(Integer, nullable=False, default=0)
+    recommendations_in_progress = Column(Integer, nullable=False, default=0)
+    recommendations_completed = Column(Integer, nullable=False, default=0)
+    recommendations_skipped = Column(Integer, nullable=False, default=0)
+    latest_completed_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class Finding(Base):
     __tablename__ = "findings"
     
     id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False, index=True)
     dimension = Column(Enum(Dimension), nullable=False)
     severity = Column(String(50))  # critical, high, medium, low
     title = Column(String(255), nullable=False)
@@ -136,12 +230,17 @@ class Recommendation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     assessment = relationship("Assessment", back_populates="recommendations")
+    
+    __table_args__ = (
+        # Also serves plain assessment_id lookups (leftmost prefix)
+        Index("ix_recommendations_assessment_id_status", "assessment_id", "status"),
+    )
 
 class Artifact(Base):
     __tablename__ = "artifacts"
 
     id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False, index=True)
     filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_type = Column(String(100))
@@ -154,7 +253,7 @@ class TelemetryUpload(Base):
     __tablename__ = "telemetry_uploads"
 
     id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False, index=True)
     source_type = Column(String(50), nullable=False, default="csv")  # csv, future: prometheus, datadog, etc.
     filename = Column(String(255), nullable=False)
     row_count = Column(Integer, default=0)
@@ -184,7 +283,7 @@ class Notification(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True)
-    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=True)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=True, index=True)
     type = Column(String(50), nullable=False)  # assessment_completed, recommendation_updated, etc.
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
@@ -193,4 +292,9 @@ class Notification(Base):
     
     organization = relationship("Organization", back_populates="notifications")
     assessment = relationship("Assessment", back_populates="notifications")
+    
+    __table_args__ = (
+        Index("ix_notifications_organization_id_is_read", "organization_id", "is_read"),
+        Index("ix_notifications_organization_id_created_at", "organization_id", "created_at"),
+    )
 
@@ -0,0 +1,34 @@
+"""
+Rebuild materialized organization metrics (org_metrics_rollup) from the source tables.
+Use after backfills or manual data fixes; rows are otherwise maintained incrementally.
+Run: python -m app.rebuild_org_metrics [--organization-id 1 --organization-id 2]
+"""
+import argparse
+import time
+
+from app.database import Base, SessionLocal, engine
+from app.services.org_metrics import OrgMetricsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--organization-id", type=int, action="append", dest="organization_ids",
+                        help="Organization to rebuild (repeatable; default: all)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = OrgMetricsService.rebuild_all(db, args.organization_ids)
+        print(f"✓ Rebuilt metrics for {count} organizations in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"Rebuild error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,13 @@ Analytics router for data analysis and trends
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
 from app.database import get_db
 from app import models
+from app.services.org_metrics import OrgMetricsService
+from app.services.summaries import AssessmentSummaryService
 from app.industry_benchmarks import get_industry_baseline, get_industry_label, list_industries
 
 router = APIRouter()
@@ -20,15 +22,84 @@ def get_industries():
     return list_industries()
 
 
+# Downsampling periods accepted by the trends endpoint
+TREND_BUCKETS = ("day", "week", "month", "quarter", "year")
+
+
+def _bucket_start(moment: datetime, bucket: str) -> datetime:
+    """Start of the period containing moment"""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "quarter":
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day.replace(month=1, day=1)
+
+
+def _bucket_trends(trends: List[Dict[str, Any]], bucket: str) -> List[Dict[str, Any]]:
+    """Average per-assessment points into one point per period"""
+    buckets: Dict[datetime, List[Dict[str, Any]]] = {}
+    for point in trends:
+        buckets.setdefault(_bucket_start(point["_completed_at"], bucket), []).append(point)
+    
+    series = []
+    for period_start, points in buckets.items():
+        dimension_totals: Dict[str, List[float]] = {}
+        for point in points:
+            for dimension, score in point["dimension_scores"].items():
+                dimension_totals.setdefault(dimension, []).append(score)
+        series.append({
+            "period_start": period_start.isoformat(),
+            "assessment_count": len(points),
+            "assessment_ids": [point["assessment_id"] for point in points],
+            "latest_completed_at": points[-1]["completed_at"],
+            "overall_maturity": sum(point["overall_maturity"] for point in points) / len(points),
+            "dimension_scores": {
+                dimension: sum(scores) / len(scores) for dimension, scores in dimension_totals.items()
+            }
+        })
+    return series
+
+
 @router.get("/organization/{organization_id}/trends")
-def get_organization_trends(organization_id: int, db: Session = Depends(get_db)):
-    """Get maturity trends for an organization over time"""
-    assessments = db.query(models.Assessment).filter(
+def get_organization_trends(
+    organization_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get maturity trends for an organization over time, optionally limited to completions
+    in [since, until] and averaged into day/week/month/quarter/year buckets
+    """
+    if bucket is not None and bucket not in TREND_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of: {', '.join(TREND_BUCKETS)}")
+    
+    # One joined query for every completed assessment's scores, in completion order
+    query = db.query(
+        models.Assessment.id,
+        models.Assessment.name,
+        models.Assessment.completed_at,
+        models.Score.dimension,
+        models.Score.maturity_score
+    ).join(
+        models.Score, models.Score.assessment_id == models.Assessment.id
+    ).filter(
         models.Assessment.organization_id == organization_id,
         models.Assessment.status == "completed"
-    ).order_by(models.Assessment.completed_at).all()
+    )
+    if since is not None:
+        query = query.filter(models.Assessment.completed_at >= since)
+    if until is not None:
+        query = query.filter(models.Assessment.completed_at <= until)
+    rows = query.order_by(models.Assessment.completed_at, models.Assessment.id, models.Score.id).all()
     
-    if not assessments:
+    if not rows:
         return {
             "organization_id": organization_id,
             "trends": [],
@@ -36,98 +107,53 @@ def get_organization_trends(organization_id: int, db: Session = Depends(get_db))
         }
     
     trends = []
-    for assessment in assessments:
-        scores = db.query(models.Score).filter(
-            models.Score.assessment_id == assessment.id
-        ).all()
-        
-        if scores:
-            overall_maturity = sum(s.maturity_score for s in scores) / len(scores)
-            trends.append({
-                "assessment_id": assessment.id,
-                "assessment_name": assessment.name,
-                "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
-                "overall_maturity": overall_maturity,
-                "dimension_scores": {
-                    str(s.dimension.value): s.maturity_score for s in scores
-                }
-            })
-    
-    return {
-        "organization_id": organization_id,
-        "trends": trends,
-        "total_assessments": len(trends)
-    }
-
-@router.get("/organization/{organization_id}/metrics")
-def get_organization_metrics(organization_id: int, db: Session = Depends(get_db)):
-    """Get aggregated metrics for an organization"""
-    assessments = db.query(models.Assessment).filter(
-        models.Assessment.organization_id == organization_id
-    ).all()
+    current = None
+    for assessment_id, name, completed_at, dimension, maturity_score in rows:
+        if current is None or current["assessment_id"] != assessment_id:
+            current = {
+                "assessment_id": assessment_id,
+                "assessment_name": name,
+                "completed_at": completed_at.isoformat() if completed_at else None,
+                "_completed_at": completed_at,
+                "dimension_scores": {}
+            }
+            trends.append(current)
+        current["dimension_scores"][str(dimension.value)] = maturity_score
     
-    completed_assessments = [a for a in assessments if a.status == "completed"]
+    for point in trends:
+        scores = point["dimension_scores"].values()
+        point["overall_maturity"] = sum(scores) / len(scores)
     
-    if not completed_assessments:
+    if bucket is not None:
+        # Completions without a date cannot be placed in a period
+        series = _bucket_trends([point for point in trends if point["_completed_at"]], bucket)
         return {
             "organization_id": organization_id,
-            "total_assessments": len(assessments),
-            "completed_assessments": 0,
-            "average_maturity": 0.0,
-            "total_recommendations": 0,
-            "completed_recommendations": 0,
-            "dimension_averages": {}
+            "bucket": bucket,
+            "trends": series,
+            "total_assessments": len(trends)
         }
     
-    # Calculate average maturity
-    all_maturities = []
-    dimension_totals = {}
-    dimension_counts = {}
-    
-    total_recommendations = 0
-    completed_recommendations = 0
-    
-    for assessment in completed_assessments:
-        scores = db.query(models.Score).filter(
-            models.Score.assessment_id == assessment.id
-        ).all()
-        
-        if scores:
-            overall = sum(s.maturity_score for s in scores) / len(scores)
-            all_maturities.append(overall)
-            
-            for score in scores:
-                dim_key = str(score.dimension.value)
-                if dim_key not in dimension_totals:
-                    dimension_totals[dim_key] = 0
-                    dimension_counts[dim_key] = 0
-                dimension_totals[dim_key] += score.maturity_score
-                dimension_counts[dim_key] += 1
-        
-        # Count recommendations
-        recommendations = db.query(models.Recommendation).filter(
-            models.Recommendation.assessment_id == assessment.id
-        ).all()
-        total_recommendations += len(recommendations)
-        completed_recommendations += len([r for r in recommendations if r.status == "completed"])
-    
-    dimension_averages = {
-        dim: dimension_totals[dim] / dimension_counts[dim]
-        for dim in dimension_totals
-    }
-    
     return {
         "organization_id": organization_id,
-        "total_assessments": len(assessments),
-        "completed_assessments": len(completed_assessments),
-        "average_maturity": sum(all_maturities) / len(all_maturities) if all_maturities else 0.0,
-        "total_recommendations": total_recommendations,
-        "completed_recommendations": completed_recommendations,
-        "recommendation_completion_rate": (completed_recommendations / total_recommendations * 100) if total_recommendations > 0 else 0.0,
-        "dimension_averages": dimension_averages,
-        "latest_assessment_date": max([a.completed_at for a in completed_assessments if a.completed_at]).isoformat() if completed_assessments and any(a.completed_at for a in completed_assessments) else None
+        "trends": [
+            {
+                "assessment_id": point["assessment_id"],
+                "assessment_name": point["assessment_name"],
+                "completed_at": point["completed_at"],
+                "overall_maturity": point["overall_maturity"],
+                "dimension_scores": point["dimension_scores"]
+            }
+            for point in trends
+        ],
+        "total_assessments": len(trends)
     }
 
+@router.get("/organization/{organization_id}/metrics")
+def get_organization_metrics(organization_id: int, db: Session = Depends(get_db)):
+    """Get aggregated metrics for an organization from its materialized rollup"""
+    return OrgMetricsService.to_metrics(OrgMetricsService.get(organization_id, db))
+
 @router.get("/organization/{organization_id}/benchmark")
 def get_organization_benchmark(organization_id: int, db: Session = Depends(get_db)):
     """Get benchmark comparison for an organization, normalized by industry when set."""
@@ -183,50 +209,32 @@ def get_organization_benchmark(organization_id: int, db: Session = Depends(get_d
 @router.get("/assessment/{assessment_id}/insights")
 def get_assessment_insights(assessment_id: int, db: Session = Depends(get_db)):
     """Get insights and analytics for a specific assessment"""
-    assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
-    if not assessment:
+    rows = AssessmentSummaryService.with_assessments([assessment_id], db)
+    if not rows:
         raise HTTPException(status_code=404, detail="Assessment not found")
+    _, summary = rows[0]
     
-    scores = db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
-    findings = db.query(models.Finding).filter(models.Finding.assessment_id == assessment_id).all()
-    recommendations = db.query(models.Recommendation).filter(
-        models.Recommendation.assessment_id == assessment_id
-    ).all()
-    
-    overall_maturity = sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0
-    
-    # Calculate insights
-    critical_findings = len([f for f in findings if f.severity == "critical"])
-    high_priority_recs = len([r for r in recommendations if r.priority >= 8])
-    quick_wins = len([r for r in recommendations if r.effort == "low" and r.impact == "high"])
-    
-    # Dimension strengths and weaknesses
-    dimension_scores = {str(s.dimension.value): s.maturity_score for s in scores}
-    strongest_dimension = max(dimension_scores.items(), key=lambda x: x[1]) if dimension_scores else None
-    weakest_dimension = min(dimension_scores.items(), key=lambda x: x[1]) if dimension_scores else None
+    dimension_scores = summary["dimension_scores"]
+    strongest_dimension = summary["strongest_dimension"]
+    weakest_dimension = summary["weakest_dimension"]
     
     return {
         "assessment_id": assessment_id,
-        "overall_maturity": overall_maturity,
-        "total_findings": len(findings),
-        "critical_findings": critical_findings,
-        "total_recommendations": len(recommendations),
-        "high_priority_recommendations": high_priority_recs,
-        "quick_wins": quick_wins,
+        "overall_maturity": summary["overall_maturity"],
+        "total_findings": summary["total_findings"],
+        "critical_findings": summary["critical_findings"],
+        "total_recommendations": summary["total_recommendations"],
+        "high_priority_recommendations": summary["high_priority_recommendations"],
+        "quick_wins": summary["quick_wins"],
         "strongest_dimension": {
-            "dimension": strongest_dimension[0] if strongest_dimension else None,
-            "score": strongest_dimension[1] if strongest_dimension else None
+            "dimension": strongest_dimension,
+            "score": dimension_scores[strongest_dimension] if strongest_dimension else None
         },
         "weakest_dimension": {
-            "dimension": weakest_dimension[0] if weakest_dimension else None,
-            "score": weakest_dimension[1] if weakest_dimension else None
+            "dimension": weakest_dimension,
+            "score": dimension_scores[weakest_dimension] if weakest_dimension else None
         },
-        "recommendation_status_breakdown": {
-            "pending": len([r for r in recommendations if (r.status or "pending") == "pending"]),
-            "in_progress": len([r for r in recommendations if r.status == "in_progress"]),
-            "completed": len([r for r in recommendations if r.status == "completed"]),
-            "skipped": len([r for r in recommendations if r.status == "skipped"])
-        }
+        "recommendation_status_breakdown": dict(summary["recommendation_status_breakdown"])
     }
 
 
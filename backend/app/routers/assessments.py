@@ -1,22 +1,57 @@
 """
 Assessment router
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Union
+import json
 
 from app.database import get_db
 from app import models, schemas
+from app.services.question_catalog import question_catalog
+from app.services.answers import AnswerService
+from app.services.pagination import InvalidCursor, keyset_page
+from app.services.search import search_service
+from app.services.org_metrics import OrgMetricsService
+from app.services.summaries import AssessmentSummaryService
 from app.services.scoring import ScoringService
-from app.services.recommendations import RecommendationService
-from app.services.cache import cache
-from app.services.webhooks import WebhookService
+from app.services.score_accumulators import ScoreAccumulatorService
+from app.services.cache import (
+    cache,
+    assessment_cache_key,
+    assessment_list_cache_key,
+    invalidate_assessment_cache,
+)
+from app.services.completion import completion_pipeline
 from app.services.ai_diagnostics import AIDiagnosticsService
+from app.services.score_history import ScoreHistoryService
 
 router = APIRouter()
 
 
+# Validates a page of assessments straight to JSON bytes
+_assessment_list_adapter = TypeAdapter(List[schemas.Assessment])
+
+
+def _decode_json_field(value):
+    """SQLAlchemy JSON columns may come back as raw strings from older rows"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _assessment_schema(assessment: models.Assessment) -> schemas.Assessment:
+    """Detached, validated response payload for an assessment row"""
+    data = {name: getattr(assessment, name) for name in schemas.Assessment.model_fields}
+    data["tags"] = _decode_json_field(data["tags"])
+    data["custom_fields"] = _decode_json_field(data["custom_fields"])
+    return schemas.Assessment.model_validate(data)
+
+
 @router.post("", response_model=schemas.Assessment)
 @router.post("/", response_model=schemas.Assessment)
 def create_assessment(
@@ -42,8 +77,12 @@ def create_assessment(
             custom_fields=custom_fields,
         )
         db.add(db_assessment)
+        db.flush()
+        search_service.index([db_assessment.id], db)
+        OrgMetricsService.add_assessments(db_assessment.organization_id, 1, db)
         db.commit()
         db.refresh(db_assessment)
+        invalidate_assessment_cache(organization_id=db_assessment.organization_id)
         return db_assessment
     except HTTPException:
         raise
@@ -54,22 +93,29 @@ def create_assessment(
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-@router.get("/", response_model=List[schemas.Assessment])
+@router.get("/", response_model=Union[List[schemas.Assessment], schemas.AssessmentPage])
 def list_assessments(
     organization_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """List assessments with advanced filtering"""
+    """
+    List assessments with advanced filtering. Passing cursor (empty for the first page)
+    switches to keyset pagination and returns {items, next_cursor}; skip is ignored then.
+    search matches word prefixes in name, tags, notes and custom field values, best first.
+    """
+    if cursor is not None and search:
+        raise HTTPException(status_code=400, detail="cursor pagination cannot be combined with search")
     try:
-        # Temporarily disable cache to avoid serialization issues
-        # cache_key = f"assessments:org_{organization_id}:skip_{skip}:limit_{limit}:status_{status}:search_{search}"
-        # cached = cache.get(cache_key)
-        # if cached:
-        #     return cached
+        # Cached as serialized JSON: a hit touches neither the session nor the ORM
+        cache_key = assessment_list_cache_key(organization_id, skip, limit, status, search, cursor)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
         
         query = db.query(models.Assessment)
         
@@ -80,29 +126,29 @@ def list_assessments(
             query = query.filter(models.Assessment.status == status)
         
         if search:
-            query = query.filter(models.Assessment.name.ilike(f"%{search}%"))
-        
-        assessments = query.order_by(models.Assessment.created_at.desc()).offset(skip).limit(limit).all()
+            query = search_service.apply(query, search, db)
         
-        # Ensure JSON fields are properly serialized for all assessments
-        import json
-        for assessment in assessments:
-            if assessment.tags is not None and isinstance(assessment.tags, str):
-                try:
-                    assessment.tags = json.loads(assessment.tags)
-                except:
-                    assessment.tags = None
-            
-            if assessment.custom_fields is not None and isinstance(assessment.custom_fields, str):
-                try:
-                    assessment.custom_fields = json.loads(assessment.custom_fields)
-                except:
-                    assessment.custom_fields = None
+        if cursor is not None:
+            try:
+                assessments, next_cursor = keyset_page(query, db, cursor, limit)
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            payload = schemas.AssessmentPage(
+                items=[_assessment_schema(a) for a in assessments],
+                next_cursor=next_cursor
+            ).model_dump_json().encode("utf-8")
+        else:
+            assessments = query.order_by(
+                models.Assessment.created_at.desc(), models.Assessment.id.desc()
+            ).offset(skip).limit(limit).all()
+            payload = _assessment_list_adapter.dump_json([_assessment_schema(a) for a in assessments])
         
-        # Cache for 60 seconds - disabled temporarily
-        # cache.set(cache_key, assessments, ttl_seconds=60)
+        # Cache for 60 seconds
+        cache.set(cache_key, payload, ttl_seconds=60)
         
-        return assessments
+        return Response(content=payload, media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"Error listing assessments: {str(e)}")
@@ -113,40 +159,21 @@ def list_assessments(
 def get_assessment(assessment_id: int, db: Session = Depends(get_db)):
     """Get assessment by ID with caching"""
     try:
-        # Temporarily disable cache to avoid serialization issues
-        # cache_key = f"assessment:{assessment_id}"
-        # cached = cache.get(cache_key)
-        # if cached:
-        #     return cached
+        cache_key = assessment_cache_key(assessment_id)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
         
         assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
         if not assessment:
             raise HTTPException(status_code=404, detail="Assessment not found")
         
-        # Ensure JSON fields are properly serialized
-        # SQLAlchemy JSON columns might return different types
-        if assessment.tags is None:
-            assessment.tags = None
-        elif isinstance(assessment.tags, str):
-            import json
-            try:
-                assessment.tags = json.loads(assessment.tags)
-            except:
-                assessment.tags = None
+        payload = _assessment_schema(assessment).model_dump_json().encode("utf-8")
         
-        if assessment.custom_fields is None:
-            assessment.custom_fields = None
-        elif isinstance(assessment.custom_fields, str):
-            import json
-            try:
-                assessment.custom_fields = json.loads(assessment.custom_fields)
-            except:
-                assessment.custom_fields = None
+        # Cache for 120 seconds
+        cache.set(cache_key, payload, ttl_seconds=120)
         
-        # Cache for 120 seconds - disabled temporarily
-        # cache.set(cache_key, assessment, ttl_seconds=120)
-        
-        return assessment
+        return Response(content=payload, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -169,12 +196,12 @@ def update_assessment_notes(
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     assessment.notes = notes
+    search_service.index([assessment_id], db)
     db.commit()
     db.refresh(assessment)
     
     # Invalidate cache
-    cache.delete(f"assessment:{assessment_id}")
-    cache.invalidate_pattern(f"assessments:org_{assessment.organization_id}")
+    invalidate_assessment_cache(assessment_id, assessment.organization_id)
     
     return {"message": "Notes updated successfully", "notes": assessment.notes}
 
@@ -190,11 +217,12 @@ def update_assessment_tags(
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     assessment.tags = tags
+    search_service.index([assessment_id], db)
     db.commit()
     db.refresh(assessment)
     
     # Invalidate cache
-    cache.delete(f"assessment:{assessment_id}")
+    invalidate_assessment_cache(assessment_id, assessment.organization_id)
     
     return {"message": "Tags updated successfully", "tags": assessment.tags}
 
@@ -210,11 +238,12 @@ def update_assessment_custom_fields(
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     assessment.custom_fields = custom_fields
+    search_service.index([assessment_id], db)
     db.commit()
     db.refresh(assessment)
     
     # Invalidate cache
-    cache.delete(f"assessment:{assessment_id}")
+    invalidate_assessment_cache(assessment_id, assessment.organization_id)
     
     return {"message": "Custom fields updated successfully", "custom_fields": assessment.custom_fields}
 
@@ -230,118 +259,162 @@ def submit_answer(
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    # Update assessment status to in_progress if it's draft
-    if assessment.status == "draft":
-        assessment.status = "in_progress"
-        db.commit()
-        db.refresh(assessment)
-    
     # Verify question exists
-    question = db.query(models.Question).filter(models.Question.id == answer.question_id).first()
-    if not question:
+    plan = question_catalog.get(answer.question_id, db)
+    if not plan:
         raise HTTPException(status_code=404, detail="Question not found")
     
     # Calculate maturity score
-    scoring_service = ScoringService()
-    maturity_score = scoring_service.calculate_maturity_score(question, answer.answer_value)
+    maturity_score = plan.score(answer.answer_value)
     
-    # Check if answer already exists, update it
-    existing_answer = db.query(models.Answer).filter(
-        models.Answer.assessment_id == assessment_id,
-        models.Answer.question_id == answer.question_id
-    ).first()
+    # Update assessment status to in_progress if it's draft
+    status_changed = assessment.status == "draft"
+    if status_changed:
+        assessment.status = "in_progress"
     
-    if existing_answer:
-        existing_answer.answer_value = answer.answer_value
-        existing_answer.maturity_score = maturity_score
-        db.commit()
-        db.refresh(existing_answer)
-        return existing_answer
-    else:
-        db_answer = models.Answer(
-            assessment_id=assessment_id,
-            question_id=answer.question_id,
-            answer_value=answer.answer_value,
-            maturity_score=maturity_score
-        )
-        db.add(db_answer)
-        db.commit()
-        db.refresh(db_answer)
-        return db_answer
+    # Insert or update through the unique (assessment_id, question_id) index
+    db_answer = AnswerService.upsert_answer(
+        assessment_id,
+        {"plan": plan, "answer_value": answer.answer_value, "maturity_score": maturity_score},
+        db
+    )
+    db.commit()
+    if status_changed:
+        invalidate_assessment_cache(assessment_id, assessment.organization_id)
+    return db_answer
 
-@router.post("/{assessment_id}/complete")
-def complete_assessment(assessment_id: int, db: Session = Depends(get_db)):
-    """Complete an assessment and generate scores, findings, and recommendations"""
+@router.post("/{assessment_id}/answers:batch", response_model=schemas.AnswerBatchResult)
+def submit_answers_batch(
+    assessment_id: int,
+    batch: schemas.AnswerBatchCreate,
+    db: Session = Depends(get_db)
+):
+    """Submit many answers at once, scored in memory and upserted in one transaction"""
     assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    # Calculate scores
-    scoring_service = ScoringService()
-    scores = scoring_service.calculate_all_scores(assessment_id, db)
+    # The last answer for a question wins within a batch
+    last_index = {item.question_id: index for index, item in enumerate(batch.answers)}
     
-    # Generate findings
-    findings = scoring_service.generate_findings(assessment_id, db)
+    # One IN query validates every question id (none when the catalog is warm)
+    plans = question_catalog.get_many(last_index.keys(), db)
     
-    # Generate recommendations
-    recommendation_service = RecommendationService()
-    recommendations = recommendation_service.generate_recommendations(assessment_id, db)
-    
-    # Update assessment status
-    assessment.status = "completed"
-    assessment.completed_at = datetime.utcnow()
-    db.commit()
-    
-    # Trigger webhook event (async, non-blocking)
-    try:
-        import asyncio
-        webhook_payload = {
-            "assessment_id": assessment_id,
-            "organization_id": assessment.organization_id,
-            "status": "completed",
-            "overall_maturity": sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0,
-            "scores_count": len(scores),
-            "findings_count": len(findings),
-            "recommendations_count": len(recommendations)
+    rows = [
+        {
+            "plan": plans[item.question_id],
+            "answer_value": item.answer_value,
+            "maturity_score": plans[item.question_id].score(item.answer_value)
         }
-        # Run async webhook trigger in background
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.create_task(WebhookService.trigger_event(
-                assessment.organization_id,
-                "assessment.completed",
-                webhook_payload,
-                db
+        for index, item in enumerate(batch.answers)
+        if last_index[item.question_id] == index and item.question_id in plans
+    ]
+    
+    created = {}
+    if rows:
+        try:
+            # Update assessment status to in_progress if it's draft
+            status_changed = assessment.status == "draft"
+            if status_changed:
+                assessment.status = "in_progress"
+            created = AnswerService.upsert_answers(assessment_id, rows, db)
+            db.commit()
+            if status_changed:
+                invalidate_assessment_cache(assessment_id, assessment.organization_id)
+        except Exception as e:
+            db.rollback()
+            import traceback
+            print(f"Error saving answer batch for assessment {assessment_id}: {str(e)}")
+            print(traceback.format_exc())
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    
+    scored = {row["plan"].question_id: row["maturity_score"] for row in rows}
+    results = []
+    for index, item in enumerate(batch.answers):
+        if last_index[item.question_id] != index:
+            results.append(schemas.AnswerBatchItemResult(
+                question_id=item.question_id,
+                status="skipped",
+                detail="Superseded by a later answer to the same question"
+            ))
+        elif item.question_id not in plans:
+            results.append(schemas.AnswerBatchItemResult(
+                question_id=item.question_id,
+                status="error",
+                detail="Question not found"
             ))
         else:
-            loop.run_until_complete(WebhookService.trigger_event(
-                assessment.organization_id,
-                "assessment.completed",
-                webhook_payload,
-                db
+            results.append(schemas.AnswerBatchItemResult(
+                question_id=item.question_id,
+                status="created" if created[item.question_id] else "updated",
+                maturity_score=scored[item.question_id]
             ))
-    except Exception as e:
-        # Don't fail the request if webhook fails
-        print(f"Webhook trigger failed: {e}")
     
-    # Create notification
-    notification = models.Notification(
-        organization_id=assessment.organization_id,
+    return schemas.AnswerBatchResult(
         assessment_id=assessment_id,
-        type="assessment_completed",
-        title="Assessment Completed",
-        message=f"Assessment '{assessment.name}' has been completed with {len(recommendations)} recommendations."
+        created=sum(1 for r in results if r.status == "created"),
+        updated=sum(1 for r in results if r.status == "updated"),
+        failed=sum(1 for r in results if r.status == "error"),
+        results=results
     )
-    db.add(notification)
-    db.commit()
+
+@router.get("/{assessment_id}/scores/live", response_model=schemas.LiveScores)
+def get_live_scores(assessment_id: int, db: Session = Depends(get_db)):
+    """Current per-dimension maturity from the running accumulators, available before completion"""
+    accumulators = ScoreAccumulatorService.get(assessment_id, db)
+    if not accumulators:
+        assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
+        if not assessment:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        # Answered before accumulators existed: build them once
+        accumulators = ScoreAccumulatorService.rebuild(assessment_id, db)
+        db.commit()
+    
+    scoring_service = ScoringService()
+    scores = []
+    for acc in sorted(accumulators, key=lambda a: list(models.Dimension).index(a.dimension)):
+        score = scoring_service.build_dimension_score(assessment_id, acc)
+        if score is not None:
+            scores.append(schemas.LiveDimensionScore(
+                dimension=score.dimension,
+                maturity_score=score.maturity_score,
+                weighted_score=score.weighted_score,
+                max_possible_score=score.max_possible_score,
+                percentage=score.percentage,
+                answered=acc.answer_count,
+                critical_blocker=acc.critical_blockers > 0
+            ))
+    
+    return schemas.LiveScores(
+        assessment_id=assessment_id,
+        overall_maturity=sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0,
+        scores=scores
+    )
+
+@router.post("/{assessment_id}/complete", status_code=202)
+def complete_assessment(assessment_id: int, db: Session = Depends(get_db)):
+    """Queue completion: scores, findings, recommendations, webhooks and notification run in the background"""
+    assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
+    if not assessment:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    job = completion_pipeline.submit(assessment_id)
     
     return {
-        "message": "Assessment completed",
-        "scores": len(scores),
-        "findings": len(findings),
-        "recommendations": len(recommendations)
+        "message": "Assessment completion queued",
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/assessments/{assessment_id}/complete/status?job_id={job.job_id}"
     }
 
+@router.get("/{assessment_id}/complete/status")
+def get_completion_status(assessment_id: int, job_id: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get per-stage progress and timings of an assessment's completion job (latest job by default)"""
+    status = completion_pipeline.status(assessment_id, job_id, db)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return status
+
 @router.get("/{assessment_id}/answers", response_model=List[schemas.Answer])
 def get_assessment_answers(assessment_id: int, db: Session = Depends(get_db)):
     """Get all answers for an assessment"""
@@ -396,22 +469,28 @@ def clone_assessment(
             maturity_score=source_answer.maturity_score
         )
         db.add(new_answer)
+    ScoreAccumulatorService.copy(assessment_id, new_assessment.id, db)
+    search_service.index([new_assessment.id], db)
+    OrgMetricsService.add_assessments(new_assessment.organization_id, 1, db)
     
     db.commit()
     db.refresh(new_assessment)
+    invalidate_assessment_cache(organization_id=new_assessment.organization_id)
     return new_assessment
 
 @router.get("/{assessment_id}/compare/{compare_id}")
 def compare_assessments(assessment_id: int, compare_id: int, db: Session = Depends(get_db)):
     """Compare two assessments"""
-    assessment1 = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
-    assessment2 = db.query(models.Assessment).filter(models.Assessment.id == compare_id).first()
-    
-    if not assessment1 or not assessment2:
+    pairs = dict(
+        (assessment.id, (assessment, summary))
+        for assessment, summary in AssessmentSummaryService.with_assessments([assessment_id, compare_id], db)
+    )
+    if assessment_id not in pairs or compare_id not in pairs:
         raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    scores1 = db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
-    scores2 = db.query(models.Score).filter(models.Score.assessment_id == compare_id).all()
+    assessment1, summary1 = pairs[assessment_id]
+    assessment2, summary2 = pairs[compare_id]
+    scores1 = summary1["dimension_scores"]
+    scores2 = summary2["dimension_scores"]
     
     # Create comparison data
     comparison = {
@@ -419,28 +498,27 @@ def compare_assessments(assessment_id: int, compare_id: int, db: Session = Depen
             "id": assessment1.id,
             "name": assessment1.name,
             "completed_at": assessment1.completed_at.isoformat() if assessment1.completed_at else None,
-            "scores": {str(s.dimension.value): s.maturity_score for s in scores1}
+            "scores": dict(scores1)
         },
         "assessment2": {
             "id": assessment2.id,
             "name": assessment2.name,
             "completed_at": assessment2.completed_at.isoformat() if assessment2.completed_at else None,
-            "scores": {str(s.dimension.value): s.maturity_score for s in scores2}
+            "scores": dict(scores2)
         },
         "differences": {}
     }
     
     # Calculate differences
-    for score1 in scores1:
-        score2 = next((s for s in scores2 if s.dimension == score1.dimension), None)
-        if score2:
-            dim_key = str(score1.dimension.value)
+    for dim_key, score1 in scores1.items():
+        score2 = scores2.get(dim_key)
+        if score2 is not None:
             comparison["differences"][dim_key] = {
                 "dimension": dim_key,
-                "score1": score1.maturity_score,
-                "score2": score2.maturity_score,
-                "difference": score2.maturity_score - score1.maturity_score,
-                "percentage_change": ((score2.maturity_score - score1.maturity_score) / score1.maturity_score * 100) if score1.maturity_score > 0 else 0
+                "score1": score1,
+                "score2": score2,
+                "difference": score2 - score1,
+                "percentage_change": ((score2 - score1) / score1 * 100) if score1 > 0 else 0
             }
     
     return comparison
@@ -448,38 +526,35 @@ def compare_assessments(assessment_id: int, compare_id: int, db: Session = Depen
 @router.get("/{assessment_id}/summary", response_model=schemas.AssessmentSummary)
 def get_assessment_summary(assessment_id: int, db: Session = Depends(get_db)):
     """Get complete assessment summary with scores, findings, and recommendations"""
-    assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
-    if not assessment:
+    rows = AssessmentSummaryService.with_assessments([assessment_id], db)
+    if not rows:
         raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    scores = db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
-    findings = db.query(models.Finding).filter(models.Finding.assessment_id == assessment_id).all()
-    recommendations = db.query(models.Recommendation).filter(
-        models.Recommendation.assessment_id == assessment_id
-    ).all()
-    
-    # Calculate overall maturity
-    overall_maturity = sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0
-    
-    # Determine risk level
-    if overall_maturity < 2.0:
-        risk_level = "critical"
-    elif overall_maturity < 3.0:
-        risk_level = "high"
-    elif overall_maturity < 4.0:
-        risk_level = "medium"
-    else:
-        risk_level = "low"
+    assessment, summary = rows[0]
     
     return schemas.AssessmentSummary(
         assessment=assessment,
-        scores=scores,
-        findings=findings,
-        recommendations=recommendations,
-        overall_maturity=overall_maturity,
-        risk_level=risk_level
+        scores=summary["scores"],
+        findings=summary["findings"],
+        recommendations=summary["recommendations"],
+        overall_maturity=summary["overall_maturity"],
+        risk_level=summary["risk_level"]
     )
 
+@router.get("/{assessment_id}/ai")
+def get_ai_diagnostics(assessment_id: int, db: Session = Depends(get_db)):
+    """Get anomalies, predictive insights and workload insights from one shared score history"""
+    try:
+        history = ScoreHistoryService.get_for_assessment(assessment_id, db)
+        if history is None:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        return AIDiagnosticsService(db).diagnostics(assessment_id, history)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error generating AI diagnostics: {str(e)}")
+
 @router.get("/{assessment_id}/ai/anomalies")
 def get_ai_anomalies(assessment_id: int, db: Session = Depends(get_db)):
     """Get AI-detected anomalies in assessment results"""
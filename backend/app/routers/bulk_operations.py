@@ -2,12 +2,15 @@
 Bulk operations router for batch processing
 """
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterator, List
 from pydantic import BaseModel
+import json
 
-from app.database import get_db
-from app import models
+from app.database import get_db, SessionLocal
+from app.services.bulk_operations import BulkOperationsService
+from app.services.summaries import AssessmentSummaryService
 
 router = APIRouter()
 
@@ -18,6 +21,12 @@ class BulkStatusUpdate(BaseModel):
 class BulkDeleteRequest(BaseModel):
     assessment_ids: List[int]
 
+class BulkSummaryRequest(BaseModel):
+    assessment_ids: List[int]
+
+# Ids per IN query; stays below SQLite's default bound-parameter limit
+SUMMARY_CHUNK_SIZE = 500
+
 @router.post("/recommendations/bulk-status")
 def bulk_update_recommendation_status(
     update: BulkStatusUpdate,
@@ -27,16 +36,9 @@ def bulk_update_recommendation_status(
     if update.status not in ["pending", "in_progress", "completed", "skipped"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    updated_count = 0
-    for rec_id in update.recommendation_ids:
-        recommendation = db.query(models.Recommendation).filter(
-            models.Recommendation.id == rec_id
-        ).first()
-        
-        if recommendation:
-            recommendation.status = update.status
-            updated_count += 1
-    
+    updated_count = BulkOperationsService.update_recommendation_status(
+        update.recommendation_ids, update.status, db
+    )
     db.commit()
     
     return {
@@ -51,17 +53,9 @@ def bulk_delete_assessments(
     db: Session = Depends(get_db)
 ):
     """Bulk delete assessments"""
-    deleted_count = 0
-    for assessment_id in request.assessment_ids:
-        assessment = db.query(models.Assessment).filter(
-            models.Assessment.id == assessment_id
-        ).first()
-        
-        if assessment:
-            db.delete(assessment)
-            deleted_count += 1
-    
+    deleted_count, deleted = BulkOperationsService.delete_assessments(request.assessment_ids, db)
     db.commit()
+    BulkOperationsService.invalidate_deleted(deleted)
     
     return {
         "message": f"Deleted {deleted_count} assessments",
@@ -80,27 +74,14 @@ def get_bulk_assessment_summary(
     if not ids:
         raise HTTPException(status_code=400, detail="No valid assessment IDs provided")
     
-    assessments = db.query(models.Assessment).filter(
-        models.Assessment.id.in_(ids)
-    ).all()
-    
     summaries = []
-    for assessment in assessments:
-        scores = db.query(models.Score).filter(
-            models.Score.assessment_id == assessment.id
-        ).all()
-        
-        overall_maturity = sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0
-        recommendations = db.query(models.Recommendation).filter(
-            models.Recommendation.assessment_id == assessment.id
-        ).all()
-        
+    for assessment, summary in AssessmentSummaryService.with_assessments(sorted(set(ids)), db):
         summaries.append({
             "assessment_id": assessment.id,
             "name": assessment.name,
             "status": assessment.status,
-            "overall_maturity": overall_maturity,
-            "total_recommendations": len(recommendations),
+            "overall_maturity": summary["overall_maturity"],
+            "total_recommendations": summary["total_recommendations"],
             "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None
         })
     
@@ -109,6 +90,36 @@ def get_bulk_assessment_summary(
         "count": len(summaries)
     }
 
+def _stream_summaries(assessment_ids: List[int]) -> Iterator[bytes]:
+    """NDJSON summary lines from stored summaries, one joined query per chunk of ids, with a session of its own"""
+    db = SessionLocal()
+    try:
+        for start in range(0, len(assessment_ids), SUMMARY_CHUNK_SIZE):
+            lines = [
+                json.dumps({
+                    "assessment_id": assessment.id,
+                    "name": assessment.name,
+                    "status": assessment.status,
+                    "overall_maturity": summary["overall_maturity"],
+                    "total_recommendations": summary["total_recommendations"],
+                    "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None
+                }) + "\n"
+                for assessment, summary in AssessmentSummaryService.with_assessments(
+                    assessment_ids[start:start + SUMMARY_CHUNK_SIZE], db
+                )
+            ]
+            # Release the chunk's read transaction before the client consumes the lines
+            db.rollback()
+            if lines:
+                yield "".join(lines).encode("utf-8")
+    finally:
+        db.close()
 
-
-
+@router.post("/assessments/bulk-summary")
+def stream_bulk_assessment_summary(request: BulkSummaryRequest):
+    """Stream summaries for large sets of assessments as NDJSON, one object per line in request order"""
+    ids = list(dict.fromkeys(request.assessment_ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No valid assessment IDs provided")
+    
+    return StreamingResponse(_stream_summaries(ids), media_type="application/x-ndjson")
@@ -8,6 +8,7 @@ from typing import List
 from app.database import get_db
 from app import models, schemas
 from app.models import Dimension
+from app.services.question_catalog import question_catalog
 
 router = APIRouter()
 
@@ -42,6 +43,9 @@ def create_question(question: schemas.QuestionCreate, db: Session = Depends(get_
     db.add(db_question)
     db.commit()
     db.refresh(db_question)
+    
+    # Compiled scoring plans are stale once the question set changes
+    question_catalog.invalidate()
     return db_question
 
 
@@ -7,6 +7,8 @@ from typing import List
 
 from app.database import get_db
 from app import models, schemas
+from app.services.org_metrics import OrgMetricsService
+from app.services.summaries import AssessmentSummaryService
 
 router = APIRouter()
 
@@ -27,6 +29,12 @@ def update_recommendation_status(
     if status_update.status not in ["pending", "in_progress", "completed", "skipped"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
+    OrgMetricsService.apply_recommendation_status(
+        [(recommendation.assessment_id, recommendation.status, status_update.status)], db
+    )
+    AssessmentSummaryService.apply_recommendation_status(
+        [(recommendation.assessment_id, recommendation.id, status_update.status)], db
+    )
     recommendation.status = status_update.status
     db.commit()
     db.refresh(recommendation)
@@ -2,7 +2,7 @@
 Reports router for generating PDF, JSON, and CSV exports
 """
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -30,45 +30,60 @@ def generate_pdf_report(assessment_id: int, report_type: str = "full", db: Sessi
 
 @router.get("/{assessment_id}/json")
 def generate_json_report(assessment_id: int, db: Session = Depends(get_db)):
-    """Generate JSON export for assessment"""
+    """Generate JSON export for assessment, streamed as it is built"""
     assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     generator = ReportGenerator()
-    data = generator.generate_json(assessment_id, db)
-    
-    return JSONResponse(content=data)
+    return StreamingResponse(generator.stream_json(assessment_id), media_type="application/json")
 
 @router.get("/{assessment_id}/csv")
-def generate_csv_backlog(assessment_id: int, db: Session = Depends(get_db)):
-    """Generate CSV backlog export for recommendations"""
+def generate_csv_backlog(assessment_id: int, cache: bool = False, db: Session = Depends(get_db)):
+    """Generate CSV backlog export for recommendations; streamed unless cache is set"""
     assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     generator = ReportGenerator()
+    filename = f"kpi99_backlog_{assessment_id}.csv"
+    if not cache:
+        return StreamingResponse(
+            generator.stream_csv(assessment_id),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    # Served from (and stored in) the report cache, where completed assessments are pre-rendered
     file_path = generator.generate_csv(assessment_id, db)
     
     return FileResponse(
         file_path,
         media_type="text/csv",
-        filename=f"kpi99_backlog_{assessment_id}.csv"
+        filename=filename
     )
 
 @router.get("/{assessment_id}/excel")
-def generate_excel_report(assessment_id: int, db: Session = Depends(get_db)):
-    """Generate Excel-compatible export for assessment"""
+def generate_excel_report(assessment_id: int, cache: bool = False, db: Session = Depends(get_db)):
+    """Generate Excel-compatible export for assessment; streamed unless cache is set"""
     assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     generator = ReportGenerator()
+    filename = f"kpi99_assessment_{assessment_id}.csv"
+    if not cache:
+        return StreamingResponse(
+            generator.stream_excel(assessment_id),
+            media_type="application/vnd.ms-excel",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    # Served from (and stored in) the report cache, where completed assessments are pre-rendered
     file_path = generator.generate_excel(assessment_id, db)
     
     return FileResponse(
         file_path,
         media_type="application/vnd.ms-excel",
-        filename=f"kpi99_assessment_{assessment_id}.csv"
+        filename=filename
     )
-
@@ -0,0 +1,35 @@
+"""
+Scan score histories for anomalies and store the results served by /api/assessments/{id}/ai/anomalies.
+Meant to run nightly; completions rescan their own organization as they happen.
+Run: python -m app.scan_anomalies [--organization-id 1 --organization-id 2]
+"""
+import argparse
+import time
+
+from app.database import Base, SessionLocal, engine
+from app.services.anomalies import AnomalyService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--organization-id", type=int, action="append", dest="organization_ids",
+                        help="Organization to scan (repeatable; default: all)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        scanned, flagged = AnomalyService.scan(db, args.organization_ids)
+        db.commit()
+        print(f"✓ Scanned {scanned} assessments, flagged {flagged} anomalies in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"Scan error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
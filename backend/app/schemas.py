@@ -51,6 +51,10 @@ class Assessment(AssessmentBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class AssessmentPage(BaseModel):
+    items: List[Assessment]
+    next_cursor: Optional[str] = None
+
 class QuestionBase(BaseModel):
     dimension: Dimension
     question_type: QuestionType
@@ -86,6 +90,26 @@ class Answer(AnswerBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class AnswerBatchItem(BaseModel):
+    question_id: int
+    answer_value: str
+
+class AnswerBatchCreate(BaseModel):
+    answers: List[AnswerBatchItem]
+
+class AnswerBatchItemResult(BaseModel):
+    question_id: int
+    status: str  # created, updated, skipped, error
+    maturity_score: Optional[float] = None
+    detail: Optional[str] = None
+
+class AnswerBatchResult(BaseModel):
+    assessment_id: int
+    created: int
+    updated: int
+    failed: int
+    results: List[AnswerBatchItemResult]
+
 class ScoreBase(BaseModel):
     dimension: Dimension
     maturity_score: float
@@ -100,6 +124,15 @@ class Score(ScoreBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class LiveDimensionScore(ScoreBase):
+    answered: int
+    critical_blocker: bool
+
+class LiveScores(BaseModel):
+    assessment_id: int
+    overall_maturity: float
+    scores: List[LiveDimensionScore]
+
 class FindingBase(BaseModel):
     dimension: Dimension
     severity: str
@@ -2,13 +2,46 @@
 AI-Enhanced Diagnostics Service
 Implements AI-Augmented Performance Engineering capabilities per KPI99 AI Integration Guidance
 """
+from sqlalchemy import exists, func, or_
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime, timedelta
 from app import models
 from app.models import Dimension
-import statistics
+from app.services.anomalies import AnomalyService
+from app.services.forecasting import ForecastService
+from app.services.score_history import OrgScoreHistory, ScoreHistoryService
 import math
+import numpy as np
+
+
+IMPACT_SCORES = {"low": 1, "medium": 2, "high": 3}
+EFFORT_SCORES = {"low": 3, "medium": 2, "high": 1}
+DIMENSION_VALUES = [dimension.value for dimension in Dimension]
+DIMENSION_CODES = {value: code for code, value in enumerate(DIMENSION_VALUES)}
+# Answer text that indicates distributed systems
+DISTRIBUTED_SYSTEM_KEYWORDS = ["spark", "emr", "eks", "kubernetes", "distributed", "cluster", "executor"]
+
+
+@dataclass
+class RecommendationCandidates:
+    """Candidate recommendations as parallel arrays, one element per candidate"""
+    impact_scores: np.ndarray
+    effort_scores: np.ndarray
+    dimension_codes: np.ndarray  # index into DIMENSION_VALUES
+    base_priorities: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Optional[str], Optional[str], int]]) -> "RecommendationCandidates":
+        """From (dimension value, impact, effort, base priority) tuples"""
+        records = list(records)
+        return cls(
+            impact_scores=np.array([IMPACT_SCORES.get(impact, 1) for _, impact, _, _ in records], dtype=float),
+            effort_scores=np.array([EFFORT_SCORES.get(effort, 2) for _, _, effort, _ in records], dtype=float),
+            dimension_codes=np.array([DIMENSION_CODES[dimension] for dimension, _, _, _ in records], dtype=np.int64),
+            base_priorities=np.array([priority for _, _, _, priority in records], dtype=float),
+        )
 
 
 class AIDiagnosticsService:
@@ -20,168 +53,80 @@ class AIDiagnosticsService:
     def __init__(self, db: Session):
         self.db = db
     
-    def detect_anomalies(self, assessment_id: int) -> List[Dict[str, Any]]:
+    def _history(self, assessment_id: int, history: Optional[OrgScoreHistory]) -> Optional[OrgScoreHistory]:
+        """The given organization history, or the cached one of the assessment's organization"""
+        if history is not None:
+            return history
+        return ScoreHistoryService.get_for_assessment(assessment_id, self.db)
+    
+    def detect_anomalies(self, assessment_id: int, history: Optional[OrgScoreHistory] = None) -> List[Dict[str, Any]]:
         """
         Detect anomalies in assessment results using statistical analysis
-        Identifies unusual patterns, regressions, and outliers
+        Identifies unusual patterns, regressions, and outliers; served from the batch scan
         """
-        anomalies = []
-        
-        # Get current assessment scores
-        current_scores = self.db.query(models.Score).filter(
-            models.Score.assessment_id == assessment_id
-        ).all()
-        
-        if not current_scores:
-            return anomalies
-        
-        # Get historical scores for the same organization
-        assessment = self.db.query(models.Assessment).filter(
-            models.Assessment.id == assessment_id
-        ).first()
-        
-        if not assessment:
-            return anomalies
-        
-        # Get previous assessments for comparison
-        previous_assessments = self.db.query(models.Assessment).filter(
-            models.Assessment.organization_id == assessment.organization_id,
-            models.Assessment.id != assessment_id,
-            models.Assessment.status == 'completed'
-        ).order_by(models.Assessment.created_at.desc()).limit(5).all()
-        
-        # Build score history
-        score_history = {}
-        for prev_assessment in previous_assessments:
-            prev_scores = self.db.query(models.Score).filter(
-                models.Score.assessment_id == prev_assessment.id
-            ).all()
-            for score in prev_scores:
-                dim_key = score.dimension.value
-                if dim_key not in score_history:
-                    score_history[dim_key] = []
-                score_history[dim_key].append(score.maturity_score)
-        
-        # Detect anomalies for each dimension
-        for current_score in current_scores:
-            dim_key = current_score.dimension.value
-            current_value = current_score.maturity_score
-            
-            if dim_key in score_history and len(score_history[dim_key]) >= 2:
-                historical_values = score_history[dim_key]
-                mean = statistics.mean(historical_values)
-                stdev = statistics.stdev(historical_values) if len(historical_values) > 1 else 0
-                
-                # Detect significant regression (>2 standard deviations below mean)
-                if current_value < mean - (2 * stdev) and stdev > 0:
-                    anomalies.append({
-                        "type": "regression",
-                        "dimension": dim_key,
-                        "severity": "high" if current_value < mean - (3 * stdev) else "medium",
-                        "message": f"Significant regression detected in {dim_key}. Current score ({current_value:.2f}) is {((mean - current_value) / mean * 100):.1f}% below historical average ({mean:.2f}).",
-                        "recommendation": "Immediate investigation recommended. Review recent changes and operational incidents.",
-                        "confidence": min(0.95, 0.7 + (abs(mean - current_value) / (stdev + 0.1)) * 0.1)
-                    })
-                
-                # Detect unusual improvement (potential data quality issue)
-                elif current_value > mean + (2 * stdev) and stdev > 0:
-                    anomalies.append({
-                        "type": "unusual_improvement",
-                        "dimension": dim_key,
-                        "severity": "low",
-                        "message": f"Unusually large improvement in {dim_key}. Current score ({current_value:.2f}) is {((current_value - mean) / mean * 100):.1f}% above historical average ({mean:.2f}).",
-                        "recommendation": "Verify assessment accuracy. Such rapid improvements may indicate assessment inconsistencies.",
-                        "confidence": 0.6
-                    })
-        
-        # Detect dimension imbalance anomalies
-        dimension_scores = {s.dimension.value: s.maturity_score for s in current_scores}
-        if len(dimension_scores) >= 2:
-            scores_list = list(dimension_scores.values())
-            max_score = max(scores_list)
-            min_score = min(scores_list)
-            
-            # Detect severe imbalance (>2.0 point difference)
-            if max_score - min_score > 2.0:
-                anomalies.append({
-                    "type": "dimension_imbalance",
-                    "dimension": "all",
-                    "severity": "medium",
-                    "message": f"Significant dimension imbalance detected. Score range: {min_score:.2f} - {max_score:.2f} (difference: {max_score - min_score:.2f}).",
-                    "recommendation": "Focus on bringing weaker dimensions to parity with stronger ones for balanced engineering maturity.",
-                    "confidence": 0.85
-                })
-        
-        return anomalies
+        return AnomalyService.for_assessment(assessment_id, self.db, history)
     
-    def generate_predictive_insights(self, assessment_id: int) -> Dict[str, Any]:
+    def generate_predictive_insights(self, assessment_id: int, history: Optional[OrgScoreHistory] = None) -> Dict[str, Any]:
         """
         Generate predictive insights based on current assessment and historical patterns
         Forecasts capacity curves, cost trajectories, and maturity progression
         """
-        assessment = self.db.query(models.Assessment).filter(
-            models.Assessment.id == assessment_id
-        ).first()
+        history = self._history(assessment_id, history)
+        assessment = history.get(assessment_id) if history else None
         
         if not assessment:
             return {}
         
         # Get current scores
-        current_scores = self.db.query(models.Score).filter(
-            models.Score.assessment_id == assessment_id
-        ).all()
+        current_scores = assessment.scores
         
         if not current_scores:
             return {}
         
-        # Get historical assessments
-        historical_assessments = self.db.query(models.Assessment).filter(
-            models.Assessment.organization_id == assessment.organization_id,
-            models.Assessment.status == 'completed'
-        ).order_by(models.Assessment.created_at.asc()).all()
-        
         insights = {
             "maturity_projection": {},
+            "dimension_projections": {},
             "risk_forecast": {},
             "capacity_insights": [],
             "cost_insights": []
         }
         
-        # Calculate maturity progression trends
-        if len(historical_assessments) >= 2:
-            historical_overall = []
-            for hist_assessment in historical_assessments:
-                hist_scores = self.db.query(models.Score).filter(
-                    models.Score.assessment_id == hist_assessment.id
-                ).all()
-                if hist_scores:
-                    overall = sum(s.maturity_score for s in hist_scores) / len(hist_scores)
-                    historical_overall.append({
-                        "date": hist_assessment.created_at,
-                        "score": overall
-                    })
-            
-            if len(historical_overall) >= 2:
-                # Calculate trend
-                recent_trend = historical_overall[-1]["score"] - historical_overall[-2]["score"]
-                current_overall = sum(s.maturity_score for s in current_scores) / len(current_scores)
-                
-                # Project 6 months ahead
-                projected_score = current_overall + (recent_trend * 3)  # 3 assessment cycles
-                projected_score = max(0, min(5.0, projected_score))
-                
-                insights["maturity_projection"] = {
-                    "current": round(current_overall, 2),
-                    "projected_6mo": round(projected_score, 2),
-                    "trend": "improving" if recent_trend > 0 else "declining" if recent_trend < 0 else "stable",
-                    "velocity": round(recent_trend, 2),
-                    "confidence": min(0.85, 0.5 + (len(historical_overall) * 0.05))
+        # Least-squares fit over every completed assessment, spaced by completion date
+        forecast = ForecastService.get(history)
+        overall = forecast["overall"]
+        if overall:
+            if overall["projected"] is None:
+                # Completions too close together to show a trend
+                velocity, trend = None, "insufficient_data"
+            else:
+                velocity = round(overall["slope_per_month"], 2)
+                trend = "improving" if velocity > 0 else "declining" if velocity < 0 else "stable"
+            insights["maturity_projection"] = {
+                "current": round(assessment.overall_maturity, 2),
+                "projected_6mo": round(overall["projected"], 2) if overall["projected"] is not None else None,
+                "lower_6mo": round(overall["lower"], 2) if overall["lower"] is not None else None,
+                "upper_6mo": round(overall["upper"], 2) if overall["upper"] is not None else None,
+                "interval_level": forecast["interval_level"],
+                "trend": trend,
+                "velocity": velocity,
+                "r_squared": round(overall["r_squared"], 2) if overall["r_squared"] is not None else None,
+                "data_points": overall["points"]
+            }
+            insights["dimension_projections"] = {
+                dimension: {
+                    "current": round(current_scores[dimension], 2) if dimension in current_scores else None,
+                    "projected_6mo": round(projection["projected"], 2) if projection["projected"] is not None else None,
+                    "lower_6mo": round(projection["lower"], 2) if projection["lower"] is not None else None,
+                    "upper_6mo": round(projection["upper"], 2) if projection["upper"] is not None else None,
+                    "velocity": round(projection["slope_per_month"], 2) if projection["slope_per_month"] is not None else None
                 }
+                for dimension, projection in forecast["dimensions"].items()
+            }
         
         # Generate dimension-specific capacity insights
-        for score in current_scores:
-            if score.dimension == Dimension.INFRASTRUCTURE_EFFICIENCY:
-                if score.maturity_score < 3.0:
+        for dimension, maturity_score in current_scores.items():
+            if dimension == Dimension.INFRASTRUCTURE_EFFICIENCY.value:
+                if maturity_score < 3.0:
                     insights["capacity_insights"].append({
                         "dimension": "infrastructure_efficiency",
                         "type": "capacity_risk",
@@ -190,8 +135,8 @@ class AIDiagnosticsService:
                         "priority": "high"
                     })
             
-            elif score.dimension == Dimension.PERFORMANCE:
-                if score.maturity_score < 2.5:
+            elif dimension == Dimension.PERFORMANCE.value:
+                if maturity_score < 2.5:
                     insights["capacity_insights"].append({
                         "dimension": "performance",
                         "type": "workload_modeling",
@@ -201,9 +146,8 @@ class AIDiagnosticsService:
                     })
         
         # Cost trajectory insights
-        if any(s.dimension == Dimension.INFRASTRUCTURE_EFFICIENCY for s in current_scores):
-            infra_score = next(s for s in current_scores if s.dimension == Dimension.INFRASTRUCTURE_EFFICIENCY)
-            if infra_score.maturity_score < 3.0:
+        if Dimension.INFRASTRUCTURE_EFFICIENCY.value in current_scores:
+            if current_scores[Dimension.INFRASTRUCTURE_EFFICIENCY.value] < 3.0:
                 insights["cost_insights"].append({
                     "type": "cost_optimization",
                     "message": "Infrastructure efficiency gaps suggest significant cost optimization opportunities.",
@@ -214,7 +158,23 @@ class AIDiagnosticsService:
         
         return insights
     
-    def prioritize_recommendations_ai(self, assessment_id: int, recommendations: List[models.Recommendation]) -> List[models.Recommendation]:
+    @staticmethod
+    def prioritize_candidates(candidates: RecommendationCandidates, dimension_scores: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        AI-powered prioritization of candidate recommendations in one vectorized pass.
+        Returns each candidate's final priority (lower comes first) and the indices ordering them.
+        """
+        # Score per dimension code; dimensions without a score count as 0
+        scores_by_code = np.array([dimension_scores.get(value, 0.0) for value in DIMENSION_VALUES], dtype=float)
+        dim_scores = scores_by_code[candidates.dimension_codes]
+        
+        # AI score = impact/effort ratio weighted by dimension criticality
+        ai_scores = (candidates.impact_scores / candidates.effort_scores) * (3.0 - dim_scores)
+        # int() semantics: truncate toward zero
+        priorities = np.trunc(candidates.base_priorities - ai_scores * 5).astype(np.int64)
+        return priorities, np.argsort(priorities, kind="stable")
+    
+    def prioritize_recommendations_ai(self, assessment_id: int, recommendations: List[models.Recommendation], history: Optional[OrgScoreHistory] = None) -> List[models.Recommendation]:
         """
         AI-powered recommendation prioritization based on workload patterns and impact analysis
         """
@@ -222,81 +182,61 @@ class AIDiagnosticsService:
             return recommendations
         
         # Get assessment context
-        assessment = self.db.query(models.Assessment).filter(
-            models.Assessment.id == assessment_id
-        ).first()
+        history = self._history(assessment_id, history)
+        assessment = history.get(assessment_id) if history else None
         
         if not assessment:
             return recommendations
         
-        # Get scores for context
-        scores = self.db.query(models.Score).filter(
-            models.Score.assessment_id == assessment_id
-        ).all()
-        score_map = {s.dimension: s.maturity_score for s in scores}
-        
-        # Get historical data for pattern analysis
-        historical_assessments = self.db.query(models.Assessment).filter(
-            models.Assessment.organization_id == assessment.organization_id,
-            models.Assessment.status == 'completed'
-        ).order_by(models.Assessment.created_at.desc()).limit(3).all()
-        
-        # AI-enhanced prioritization scoring
-        for rec in recommendations:
-            base_priority = rec.priority
-            
-            # Adjust priority based on dimension maturity
-            dim_score = score_map.get(rec.dimension, 0)
-            
-            # Critical dimensions get higher priority
-            if dim_score < 2.0:
-                rec.priority = base_priority - 10  # Higher priority (lower number)
-            elif dim_score < 2.5:
-                rec.priority = base_priority - 5
-            
-            # Impact-effort optimization
-            impact_score = {"low": 1, "medium": 2, "high": 3}.get(rec.impact, 1)
-            effort_score = {"low": 3, "medium": 2, "high": 1}.get(rec.effort, 2)
-            
-            # AI score = impact/effort ratio weighted by dimension criticality
-            ai_score = (impact_score / effort_score) * (3.0 - dim_score)
-            rec.priority = int(base_priority - (ai_score * 5))
-        
-        # Sort by priority
-        recommendations.sort(key=lambda r: r.priority)
-        
-        return recommendations
+        priorities, order = self.prioritize_candidates(
+            RecommendationCandidates.from_records(
+                (rec.dimension.value, rec.impact, rec.effort, rec.priority) for rec in recommendations
+            ),
+            assessment.scores
+        )
+        for rec, priority in zip(recommendations, priorities.tolist()):
+            rec.priority = priority
+        return [recommendations[index] for index in order.tolist()]
     
-    def generate_workload_insights(self, assessment_id: int) -> List[Dict[str, Any]]:
+    @staticmethod
+    def distributed_systems_clause(assessment_id: int):
+        """EXISTS over the assessment's answers for distributed systems indicators"""
+        answer_text = func.lower(models.Answer.answer_value)
+        return exists().where(
+            models.Answer.assessment_id == assessment_id,
+            or_(*[answer_text.contains(keyword, autoescape=True) for keyword in DISTRIBUTED_SYSTEM_KEYWORDS])
+        )
+    
+    def diagnostics(self, assessment_id: int, history: OrgScoreHistory) -> Dict[str, Any]:
+        """Anomalies, predictive insights and workload insights; one query besides the history"""
+        stored, has_distributed_systems = AnomalyService.stored_with(
+            assessment_id, self.distributed_systems_clause(assessment_id), self.db
+        )
+        anomalies = AnomalyService.for_assessment(assessment_id, self.db, history, stored=stored)
+        workload = self.generate_workload_insights(assessment_id, history, bool(has_distributed_systems))
+        return {
+            "anomalies": {"anomalies": anomalies, "count": len(anomalies)},
+            "insights": self.generate_predictive_insights(assessment_id, history),
+            "workload": {"insights": workload, "count": len(workload)}
+        }
+    
+    def generate_workload_insights(self, assessment_id: int, history: Optional[OrgScoreHistory] = None,
+                                   has_distributed_systems: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Generate workload behavior modeling insights
         Identifies patterns in distributed systems (Spark, EMR, JVM platforms)
         """
         insights = []
         
-        assessment = self.db.query(models.Assessment).filter(
-            models.Assessment.id == assessment_id
-        ).first()
+        history = self._history(assessment_id, history)
+        assessment = history.get(assessment_id) if history else None
         
         if not assessment:
             return insights
         
-        # Get answers to identify workload characteristics
-        answers = self.db.query(models.Answer).filter(
-            models.Answer.assessment_id == assessment_id
-        ).all()
-        
-        # Check for distributed systems indicators
-        distributed_system_questions = [
-            "spark", "emr", "eks", "kubernetes", "distributed", "cluster", "executor"
-        ]
-        
-        has_distributed_systems = False
-        for answer in answers:
-            answer_text = (answer.answer_value or "").lower()
-            if any(keyword in answer_text for keyword in distributed_system_questions):
-                has_distributed_systems = True
-                break
+        # Check the answers for distributed systems indicators, unless the caller already did
+        if has_distributed_systems is None:
+            has_distributed_systems = self.db.query(self.distributed_systems_clause(assessment_id)).scalar()
         
         if has_distributed_systems:
             insights.append({
@@ -309,12 +249,9 @@ class AIDiagnosticsService:
             })
         
         # Performance dimension insights
-        perf_score = self.db.query(models.Score).filter(
-            models.Score.assessment_id == assessment_id,
-            models.Score.dimension == Dimension.PERFORMANCE
-        ).first()
+        perf_score = assessment.scores.get(Dimension.PERFORMANCE.value)
         
-        if perf_score and perf_score.maturity_score < 3.0:
+        if perf_score is not None and perf_score < 3.0:
             insights.append({
                 "type": "anomaly_detection",
                 "title": "ML-Based Anomaly Detection Recommended",
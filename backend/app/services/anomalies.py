@@ -0,0 +1,269 @@
+"""
+Batch anomaly detection over organization score histories (pandas), with persisted results
+"""
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app import models
+from app.models import Dimension
+from app.services.score_history import OrgScoreHistory
+
+# Previous completed assessments each score is compared against
+HISTORY_WINDOW = 5
+# Scores a dimension needs in the window before it is judged
+MIN_HISTORY = 2
+# Standard deviations below this count as no spread
+STDEV_EPSILON = 1e-9
+# Maturity points between strongest and weakest dimension that count as an imbalance
+IMBALANCE_THRESHOLD = 2.0
+# Ids per IN clause when replacing stored results
+CHUNK_SIZE = 500
+
+DIMENSIONS = [dimension.value for dimension in Dimension]
+# for_assessment() default: read the stored anomalies itself
+_NOT_READ = object()
+
+
+def _regression(dimension: str, current: float, mean: float, stdev: float, z_score: float) -> Dict[str, Any]:
+    return {
+        "type": "regression",
+        "dimension": dimension,
+        "severity": "high" if current < mean - (3 * stdev) else "medium",
+        "message": f"Significant regression detected in {dimension}. Current score ({current:.2f}) is {((mean - current) / mean * 100):.1f}% below historical average ({mean:.2f}).",
+        "recommendation": "Immediate investigation recommended. Review recent changes and operational incidents.",
+        "confidence": min(0.95, 0.7 + (abs(mean - current) / (stdev + 0.1)) * 0.1),
+        "z_score": z_score,
+    }
+
+
+def _unusual_improvement(dimension: str, current: float, mean: float, stdev: float, z_score: float) -> Dict[str, Any]:
+    return {
+        "type": "unusual_improvement",
+        "dimension": dimension,
+        "severity": "low",
+        "message": f"Unusually large improvement in {dimension}. Current score ({current:.2f}) is {((current - mean) / mean * 100):.1f}% above historical average ({mean:.2f}).",
+        "recommendation": "Verify assessment accuracy. Such rapid improvements may indicate assessment inconsistencies.",
+        "confidence": 0.6,
+        "z_score": z_score,
+    }
+
+
+def _dimension_imbalance(min_score: float, max_score: float) -> Dict[str, Any]:
+    return {
+        "type": "dimension_imbalance",
+        "dimension": "all",
+        "severity": "medium",
+        "message": f"Significant dimension imbalance detected. Score range: {min_score:.2f} - {max_score:.2f} (difference: {max_score - min_score:.2f}).",
+        "recommendation": "Focus on bringing weaker dimensions to parity with stronger ones for balanced engineering maturity.",
+        "confidence": 0.85,
+        "z_score": None,
+    }
+
+
+class AnomalyService:
+    """Scans score histories for regressions, unusual improvements and dimension imbalance"""
+
+    @staticmethod
+    def load_scores(db: Session, organization_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """
+        Scores of completed assessments in one query, as a frame indexed by
+        (organization_id, created_at, assessment_id) with one column per dimension
+        """
+        statement = select(
+            models.Assessment.organization_id,
+            models.Assessment.created_at,
+            models.Assessment.id,
+            models.Score.dimension,
+            models.Score.maturity_score
+        ).join(models.Score, models.Score.assessment_id == models.Assessment.id).where(
+            models.Assessment.status == "completed"
+        )
+        if organization_ids is not None:
+            statement = statement.where(models.Assessment.organization_id.in_(list(organization_ids)))
+
+        frame = pd.DataFrame(
+            db.execute(statement).all(),
+            columns=["organization_id", "created_at", "assessment_id", "dimension", "maturity_score"]
+        )
+        wide = frame.pivot_table(
+            index=["organization_id", "created_at", "assessment_id"],
+            columns="dimension",
+            values="maturity_score",
+            aggfunc="last"
+        ).reindex(columns=list(Dimension))
+        wide.columns = DIMENSIONS
+        return wide.sort_index()
+
+    @staticmethod
+    def detect(scores: pd.DataFrame) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Anomalies per assessment id (every assessment in the frame gets an entry). Each score is
+        compared with the same dimension's mean and sample stdev over the organization's
+        HISTORY_WINDOW preceding assessments.
+        """
+        if scores.empty:
+            return {}
+
+        current = scores.to_numpy(dtype=float)
+        organizations = scores.index.get_level_values("organization_id").to_numpy()
+        rows = len(current)
+
+        # history[lag - 1, i] holds the scores of the assessment lag rows before i in the same
+        # organization; rows are sorted by (organization_id, created_at, assessment_id)
+        history = np.full((HISTORY_WINDOW,) + current.shape, np.nan)
+        for lag in range(1, min(HISTORY_WINDOW, rows - 1) + 1):
+            same_organization = organizations[lag:] == organizations[:-lag]
+            history[lag - 1, lag:][same_organization] = current[:-lag][same_organization]
+
+        observed = ~np.isnan(history)
+        counts = observed.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_values = np.where(observed, history, 0.0).sum(axis=0) / counts
+            deviations = np.where(observed, history - mean_values, 0.0)
+            stdev_values = np.sqrt((deviations ** 2).sum(axis=0) / (counts - 1))
+            judged = counts >= MIN_HISTORY
+            mean_values = np.where(judged, mean_values, np.nan)
+            stdev_values = np.where(judged, stdev_values, np.nan)
+
+            spread = stdev_values > STDEV_EPSILON
+            regression = spread & (current < mean_values - 2 * stdev_values)
+            improvement = spread & ~regression & (current > mean_values + 2 * stdev_values)
+            z_scores = (current - mean_values) / stdev_values
+
+        present = ~np.isnan(current)
+        dimension_counts = present.sum(axis=1)
+        max_scores = np.where(present, current, -np.inf).max(axis=1)
+        min_scores = np.where(present, current, np.inf).min(axis=1)
+        imbalance = (dimension_counts >= 2) & (max_scores - min_scores > IMBALANCE_THRESHOLD)
+
+        assessment_ids = scores.index.get_level_values("assessment_id")
+        results: Dict[int, List[Dict[str, Any]]] = {int(assessment_id): [] for assessment_id in assessment_ids}
+        # Only flagged cells are formatted; everything above is vectorized
+        for row, column in zip(*np.nonzero(regression | improvement)):
+            build = _regression if regression[row, column] else _unusual_improvement
+            results[int(assessment_ids[row])].append(build(
+                DIMENSIONS[column],
+                float(current[row, column]),
+                float(mean_values[row, column]),
+                float(stdev_values[row, column]),
+                float(z_scores[row, column])
+            ))
+        for row in np.nonzero(imbalance)[0]:
+            results[int(assessment_ids[row])].append(
+                _dimension_imbalance(float(min_scores[row]), float(max_scores[row]))
+            )
+        return results
+
+    @staticmethod
+    def scan(db: Session, organization_ids: Optional[Iterable[int]] = None) -> Tuple[int, int]:
+        """
+        Detect anomalies for every completed assessment of the given organizations (default: all)
+        and replace their stored results (not committed). Returns (assessments scanned, anomalies flagged).
+        """
+        scores = AnomalyService.load_scores(db, organization_ids)
+        results = AnomalyService.detect(scores)
+        organizations = {
+            int(assessment_id): int(organization_id)
+            for organization_id, _, assessment_id in scores.index
+        }
+
+        assessment_ids = list(results)
+        for start in range(0, len(assessment_ids), CHUNK_SIZE):
+            chunk = assessment_ids[start:start + CHUNK_SIZE]
+            db.query(models.ScoreAnomaly).filter(models.ScoreAnomaly.assessment_id.in_(chunk)).delete(synchronize_session=False)
+            db.query(models.AnomalyScan).filter(models.AnomalyScan.assessment_id.in_(chunk)).delete(synchronize_session=False)
+
+        anomalies = [
+            dict(anomaly, assessment_id=assessment_id, organization_id=organizations[assessment_id])
+            for assessment_id, flagged in results.items()
+            for anomaly in flagged
+        ]
+        # Core executemany; ORM bulk inserts fall back to row-at-a-time for these tables
+        if anomalies:
+            db.execute(models.ScoreAnomaly.__table__.insert(), anomalies)
+        if results:
+            db.execute(models.AnomalyScan.__table__.insert(), [
+                {"assessment_id": assessment_id, "anomaly_count": len(flagged)}
+                for assessment_id, flagged in results.items()
+            ])
+        return len(results), len(anomalies)
+
+    @staticmethod
+    def invalidate(organization_ids: Iterable[int], db: Session):
+        """Mark the organizations' assessments unscanned so the next read rescans them"""
+        organization_ids = list(set(organization_ids))
+        if organization_ids:
+            db.query(models.AnomalyScan).filter(models.AnomalyScan.assessment_id.in_(
+                db.query(models.Assessment.id).filter(models.Assessment.organization_id.in_(organization_ids))
+            )).delete(synchronize_session=False)
+
+    @staticmethod
+    def for_assessment(assessment_id: int, db: Session, history: Optional[OrgScoreHistory] = None,
+                       stored: Any = _NOT_READ) -> List[Dict[str, Any]]:
+        """
+        Stored anomalies of an assessment with one query (none when the caller passes what
+        stored_with() read); its organization is scanned first if it never was. The
+        organization's score history, when given, saves the assessment lookup.
+        """
+        rows = AnomalyService._stored(assessment_id, db) if stored is _NOT_READ else stored
+        if rows is None:
+            if history is not None:
+                entry = history.get(assessment_id)
+                organization_id, status = history.organization_id, entry.status if entry else None
+            else:
+                assessment = db.get(models.Assessment, assessment_id)
+                organization_id, status = (assessment.organization_id, assessment.status) if assessment else (None, None)
+            if status != "completed":
+                return []
+            try:
+                AnomalyService.scan(db, [organization_id])
+                db.commit()
+            except IntegrityError:
+                # A concurrent scan stored the organization's results first
+                db.rollback()
+            rows = AnomalyService._stored(assessment_id, db) or []
+
+        return [
+            {
+                "type": anomaly.type,
+                "dimension": anomaly.dimension,
+                "severity": anomaly.severity,
+                "message": anomaly.message,
+                "recommendation": anomaly.recommendation,
+                "confidence": anomaly.confidence,
+            }
+            for anomaly in rows
+        ]
+
+    @staticmethod
+    def stored_with(assessment_id: int, column, db: Session) -> Tuple[Optional[List[models.ScoreAnomaly]], Any]:
+        """
+        The assessment's stored anomalies (None if never scanned) and the value of a scalar
+        column about the assessment, read in one query
+        """
+        Scan, Anomaly = models.AnomalyScan, models.ScoreAnomaly
+        rows = db.query(Scan.assessment_id, Anomaly, column).select_from(models.Assessment).outerjoin(
+            Scan, Scan.assessment_id == models.Assessment.id
+        ).outerjoin(
+            Anomaly, Anomaly.assessment_id == Scan.assessment_id
+        ).filter(models.Assessment.id == assessment_id).order_by(Anomaly.id).all()
+        if not rows:
+            return None, None
+        value = rows[0][2]
+        if rows[0][0] is None:
+            return None, value
+        return [anomaly for _, anomaly, _ in rows if anomaly is not None], value
+
+    @staticmethod
+    def _stored(assessment_id: int, db: Session) -> Optional[List[models.ScoreAnomaly]]:
+        """The assessment's stored anomalies, or None if it was never scanned"""
+        rows = db.query(models.AnomalyScan.assessment_id, models.ScoreAnomaly).outerjoin(
+            models.ScoreAnomaly, models.ScoreAnomaly.assessment_id == models.AnomalyScan.assessment_id
+        ).filter(models.AnomalyScan.assessment_id == assessment_id).order_by(models.ScoreAnomaly.id).all()
+        if not rows:
+            return None
+        return [anomaly for _, anomaly in rows if anomaly is not None]
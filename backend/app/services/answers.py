@@ -0,0 +1,143 @@
+"""
+Answer persistence service with dialect-native upserts
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from typing import Any, Dict, List
+
+from app import models
+from app.database import dialect_insert
+from app.services.score_accumulators import ScoreAccumulatorService
+
+
+class AnswerService:
+    """Service for writing answers keyed by (assessment_id, question_id)"""
+
+    # Rows per INSERT statement; keeps bound parameters well under driver limits
+    UPSERT_CHUNK_SIZE = 500
+
+    @staticmethod
+    def upsert_answers(assessment_id: int, rows: List[Dict[str, Any]], db: Session) -> Dict[int, bool]:
+        """
+        Insert or update answers for an assessment inside the caller's transaction and fold
+        them into the score accumulators. Each row needs plan (the question's ScoringPlan),
+        answer_value and maturity_score; questions must be unique.
+        Returns question_id -> True when the answer was created, False when updated.
+        """
+        if not rows:
+            return {}
+
+        ScoreAccumulatorService.lock(assessment_id, db)
+        previous = AnswerService._previous_scores(assessment_id, [row["plan"].question_id for row in rows], db)
+
+        insert = dialect_insert(db)
+        if insert is None:
+            AnswerService._upsert_answers_orm(assessment_id, rows, db)
+        else:
+            for start in range(0, len(rows), AnswerService.UPSERT_CHUNK_SIZE):
+                chunk = rows[start:start + AnswerService.UPSERT_CHUNK_SIZE]
+                db.execute(AnswerService._upsert_statement(insert, assessment_id, chunk))
+
+        AnswerService._track_scores(assessment_id, rows, previous, db)
+        return {row["plan"].question_id: row["plan"].question_id not in previous for row in rows}
+
+    @staticmethod
+    def upsert_answer(
+        assessment_id: int,
+        row: Dict[str, Any],
+        db: Session
+    ) -> models.Answer:
+        """
+        Insert or update a single answer through the unique (assessment_id, question_id)
+        index and return the stored row. Does not commit.
+        """
+        question_id = row["plan"].question_id
+        insert = dialect_insert(db)
+        if insert is None or not db.get_bind().dialect.insert_returning:
+            AnswerService.upsert_answers(assessment_id, [row], db)
+            return db.query(models.Answer).filter(
+                models.Answer.assessment_id == assessment_id,
+                models.Answer.question_id == question_id
+            ).one()
+
+        ScoreAccumulatorService.lock(assessment_id, db)
+        previous = AnswerService._previous_scores(assessment_id, [question_id], db)
+        stmt = AnswerService._upsert_statement(insert, assessment_id, [row]).returning(models.Answer)
+        answer = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+        AnswerService._track_scores(assessment_id, [row], previous, db)
+        return answer
+
+    @staticmethod
+    def _previous_scores(assessment_id: int, question_ids: List[int], db: Session) -> Dict[int, Any]:
+        """Maturity scores currently stored for the given questions (indexed lookup); callers hold ScoreAccumulatorService.lock"""
+        return {
+            question_id: maturity_score
+            for question_id, maturity_score in db.query(
+                models.Answer.question_id, models.Answer.maturity_score
+            ).filter(
+                models.Answer.assessment_id == assessment_id,
+                models.Answer.question_id.in_(question_ids)
+            ).all()
+        }
+
+    @staticmethod
+    def _track_scores(assessment_id: int, rows: List[Dict[str, Any]], previous: Dict[int, Any], db: Session) -> None:
+        ScoreAccumulatorService.apply_changes(
+            assessment_id,
+            [
+                (
+                    row["plan"],
+                    row["plan"].question_id not in previous,
+                    previous.get(row["plan"].question_id),
+                    row["maturity_score"]
+                )
+                for row in rows
+            ],
+            db
+        )
+
+    @staticmethod
+    def _upsert_statement(insert, assessment_id: int, rows: List[Dict[str, Any]]):
+        """Build INSERT ... ON CONFLICT (assessment_id, question_id) DO UPDATE for rows"""
+        stmt = insert(models.Answer).values([
+            {
+                "assessment_id": assessment_id,
+                "question_id": row["plan"].question_id,
+                "answer_value": row["answer_value"],
+                "maturity_score": row["maturity_score"],
+            }
+            for row in rows
+        ])
+        return stmt.on_conflict_do_update(
+            index_elements=[models.Answer.assessment_id, models.Answer.question_id],
+            set_={
+                "answer_value": stmt.excluded.answer_value,
+                "maturity_score": stmt.excluded.maturity_score,
+                "updated_at": func.now(),
+            }
+        )
+
+    @staticmethod
+    def _upsert_answers_orm(assessment_id: int, rows: List[Dict[str, Any]], db: Session) -> None:
+        """Portable fallback for dialects without ON CONFLICT"""
+        question_ids = [row["plan"].question_id for row in rows]
+        existing = {
+            answer.question_id: answer
+            for answer in db.query(models.Answer).filter(
+                models.Answer.assessment_id == assessment_id,
+                models.Answer.question_id.in_(question_ids)
+            ).all()
+        }
+        for row in rows:
+            answer = existing.get(row["plan"].question_id)
+            if answer:
+                answer.answer_value = row["answer_value"]
+                answer.maturity_score = row["maturity_score"]
+            else:
+                db.add(models.Answer(
+                    assessment_id=assessment_id,
+                    question_id=row["plan"].question_id,
+                    answer_value=row["answer_value"],
+                    maturity_score=row["maturity_score"]
+                ))
+        db.flush()
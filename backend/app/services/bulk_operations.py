@@ -0,0 +1,103 @@
+"""
+Set-based bulk updates and deletes for recommendations and assessments
+"""
+from sqlalchemy.orm import Session
+from typing import Iterable, Iterator, List, Tuple
+
+from app import models
+from app.services.anomalies import AnomalyService
+from app.services.cache import invalidate_assessments_cache
+from app.services.org_metrics import OrgMetricsService
+from app.services.search import search_service
+from app.services.summaries import AssessmentSummaryService
+
+# Ids per IN clause; stays below SQLite's default bound-parameter limit
+CHUNK_SIZE = 500
+
+# Rows owned by an assessment, deleted before it
+ASSESSMENT_CHILD_MODELS = (
+    models.Answer,
+    models.Score,
+    models.Finding,
+    models.Recommendation,
+    models.ScoreAccumulator,
+    models.AssessmentSummary,
+    models.ScoreAnomaly,
+    models.AnomalyScan,
+    models.TelemetryUpload,
+    models.Artifact,
+)
+
+
+def _chunks(ids: Iterable[int]) -> Iterator[List[int]]:
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+class BulkOperationsService:
+    """Bulk operations as a few statements per chunk of ids instead of one round trip per row"""
+
+    @staticmethod
+    def update_recommendation_status(recommendation_ids: Iterable[int], status: str, db: Session) -> int:
+        """Set the status of the given recommendations; returns the number of rows the database updated"""
+        Recommendation = models.Recommendation
+        updated_count = 0
+        for chunk in _chunks(recommendation_ids):
+            # Previous statuses feed the incremental rollup and summary updates
+            rows = db.query(Recommendation.id, Recommendation.assessment_id, Recommendation.status).filter(
+                Recommendation.id.in_(chunk)
+            ).with_for_update().all()
+            if not rows:
+                continue
+            updated_count += db.query(Recommendation).filter(Recommendation.id.in_(chunk)).update(
+                {Recommendation.status: status}, synchronize_session=False
+            )
+            OrgMetricsService.apply_recommendation_status(
+                [(assessment_id, old_status, status) for _, assessment_id, old_status in rows], db
+            )
+            AssessmentSummaryService.apply_recommendation_status(
+                [(assessment_id, recommendation_id, status) for recommendation_id, assessment_id, _ in rows], db
+            )
+        return updated_count
+
+    @staticmethod
+    def delete_assessments(assessment_ids: Iterable[int], db: Session) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Delete assessments with their child rows and search documents (not committed).
+        Returns the number of assessments the database deleted and their (id, organization_id) pairs.
+        """
+        Assessment = models.Assessment
+        deleted_count = 0
+        deleted: List[Tuple[int, int]] = []
+        for chunk in _chunks(assessment_ids):
+            rows = db.query(Assessment.id, Assessment.organization_id).filter(Assessment.id.in_(chunk)).all()
+            if not rows:
+                continue
+            found = [assessment_id for assessment_id, _ in rows]
+            # Notifications belong to the organization and outlive the assessment
+            db.query(models.Notification).filter(models.Notification.assessment_id.in_(found)).update(
+                {models.Notification.assessment_id: None}, synchronize_session=False
+            )
+            for model in ASSESSMENT_CHILD_MODELS:
+                db.query(model).filter(model.assessment_id.in_(found)).delete(synchronize_session=False)
+            deleted_count += db.query(Assessment).filter(Assessment.id.in_(found)).delete(synchronize_session=False)
+            search_service.remove(found, db)
+            deleted.extend((assessment_id, organization_id) for assessment_id, organization_id in rows)
+
+        organization_ids = [organization_id for _, organization_id in deleted]
+        OrgMetricsService.invalidate(organization_ids, db)
+        # Remaining assessments lost history; their anomalies are rescanned on next read
+        AnomalyService.invalidate(organization_ids, db)
+        # Deleted rows may still sit in the session's identity map
+        db.expire_all()
+        return deleted_count, deleted
+
+    @staticmethod
+    def invalidate_deleted(deleted: List[Tuple[int, int]]):
+        """Drop cached responses for deleted assessments, after the deletion committed"""
+        if deleted:
+            invalidate_assessments_cache(
+                [assessment_id for assessment_id, _ in deleted],
+                [organization_id for _, organization_id in deleted]
+            )
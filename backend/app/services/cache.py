@@ -1,57 +1,198 @@
 """
-Simple in-memory cache service for performance optimization
+Two-level cache service for performance optimization: a bounded in-process LRU in front of
+an optional shared backend, kept coherent across workers by broadcast invalidations
 """
-from typing import Any, Optional
-from datetime import datetime, timedelta
-import json
+from typing import Any, Dict, Iterable, Optional
+import os
+import uuid
+
+from app.services.cache_backends import (
+    KEY_SEPARATOR,
+    MemoryBackend,
+    RedisBackend,
+    SQLiteBackend,
+    pack_value,
+    unpack_value,
+)
+
 
 class CacheService:
-    """Simple in-memory cache with TTL support"""
-    
-    def __init__(self):
-        self._cache: dict = {}
-        self._ttl: dict = {}
-    
+    """Cache with TTL, LRU budgets and prefix/tag invalidation shared by every worker"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        shared=None,
+        local_ttl: Optional[int] = None
+    ):
+        self._local = MemoryBackend(
+            max_entries or int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+            max_bytes or int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        )
+        self._shared = shared
+        # Upper bound on how long a worker keeps a shared entry locally, should a broadcast be lost
+        self._local_ttl = local_ttl if local_ttl is not None else int(os.getenv("CACHE_LOCAL_TTL", "30"))
+        self._origin = uuid.uuid4().hex
+        self.shared_hits = 0
+
+    @property
+    def backend(self) -> str:
+        return self._shared.name if self._shared is not None else self._local.name
+
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
-        if key not in self._cache:
-            return None
+        self._sync()
+        value = self._local.get(key)
+        if value is not None or self._shared is None:
+            return value
         
-        # Check if expired
-        if key in self._ttl:
-            if datetime.now() > self._ttl[key]:
-                self.delete(key)
-                return None
-        
-        return self._cache[key]
-    
-    def set(self, key: str, value: Any, ttl_seconds: int = 300):
-        """Set value in cache with TTL"""
-        self._cache[key] = value
-        if ttl_seconds > 0:
-            self._ttl[key] = datetime.now() + timedelta(seconds=ttl_seconds)
-        else:
-            self._ttl.pop(key, None)
-    
+        data = self._shared.get_raw(key)
+        if data is None:
+            return None
+        value, tags, remaining = unpack_value(data)
+        if remaining is not None and remaining <= 0:
+            return None
+        self.shared_hits += 1
+        ttl = self._local_ttl if remaining is None else min(self._local_ttl, remaining)
+        self._local.set(key, value, ttl_seconds=ttl, tags=tags)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 300, tags: Optional[Iterable[str]] = None):
+        """Set value in cache with TTL (0 or less never expires) and optional invalidation tags"""
+        tags = tuple(tags or ())
+        self._local.set(key, value, ttl_seconds=ttl_seconds, tags=tags)
+        if self._shared is None:
+            return
+        try:
+            data = pack_value(value, tags, ttl_seconds)
+        except TypeError:
+            # Not JSON-representable: usable by this worker only
+            return
+        self._shared.set_raw(key, data, ttl_seconds, tags)
+
     def delete(self, key: str):
         """Delete key from cache"""
-        self._cache.pop(key, None)
-        self._ttl.pop(key, None)
-    
+        self._local.delete(key)
+        self._broadcast("key", key)
+
     def clear(self):
         """Clear all cache"""
-        self._cache.clear()
-        self._ttl.clear()
-    
+        self._local.clear()
+        self._broadcast("all", None)
+
     def invalidate_pattern(self, pattern: str):
-        """Invalidate all keys matching pattern"""
-        keys_to_delete = [key for key in self._cache.keys() if pattern in key]
-        for key in keys_to_delete:
-            self.delete(key)
+        """
+        Invalidate all keys under a ':'-segment prefix, e.g. "assessments:org_1" drops
+        "assessments:org_1" and "assessments:org_1:..." but not "assessments:org_12"
+        """
+        prefix = pattern.rstrip(KEY_SEPARATOR)
+        self._local.invalidate_pattern(prefix)
+        self._broadcast("prefix", prefix)
+
+    def invalidate_tag(self, tag: str):
+        """Invalidate all keys stored with the given tag"""
+        self._local.invalidate_tag(tag)
+        self._broadcast("tag", tag)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current usage"""
+        stats = self._local.stats()
+        stats["backend"] = self.backend
+        stats["shared_hits"] = self.shared_hits
+        return stats
+
+    def close(self):
+        if self._shared is not None:
+            self._shared.close()
+
+    def _broadcast(self, kind: str, arg: Optional[str]):
+        if self._shared is not None:
+            self._shared.invalidate(kind, arg, self._origin)
+
+    def _sync(self):
+        """Apply invalidations other workers published since the last call"""
+        if self._shared is None:
+            return
+        for origin, kind, arg in self._shared.poll():
+            if origin == self._origin:
+                continue
+            if kind == "key":
+                self._local.delete(arg)
+            elif kind == "prefix":
+                self._local.invalidate_pattern(arg)
+            elif kind == "tag":
+                self._local.invalidate_tag(arg)
+            elif kind == "all":
+                self._local.clear()
+
+
+def create_cache() -> CacheService:
+    """
+    Build the cache from CACHE_BACKEND (memory, sqlite or redis) and CACHE_URL
+    (a file path or sqlite:/// URL for sqlite, a redis:// URL for redis)
+    """
+    backend = os.getenv("CACHE_BACKEND", "memory").lower()
+    url = os.getenv("CACHE_URL", "")
+    if backend == "memory":
+        return CacheService()
+    if backend == "sqlite":
+        path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else (url or "./kpi99_cache.db")
+        return CacheService(shared=SQLiteBackend(path, int(os.getenv("CACHE_MAX_ENTRIES", "10000"))))
+    if backend == "redis":
+        return CacheService(shared=RedisBackend(url or "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}' (expected memory, sqlite or redis)")
 
 # Global cache instance
-cache = CacheService()
+cache = create_cache()
+
+
+def assessment_cache_key(assessment_id: int) -> str:
+    return f"assessment:{assessment_id}"
+
+
+def assessment_list_cache_key(
+    organization_id: Optional[int],
+    skip: int,
+    limit: int,
+    status: Optional[str],
+    search: Optional[str],
+    cursor: Optional[str] = None
+) -> str:
+    # Search text goes last: it may contain the key separator (cursors never do)
+    page = f"skip_{skip}" if cursor is None else f"cursor_{cursor}"
+    return f"assessments:org_{organization_id}:{page}:limit_{limit}:status_{status}:search_{search}"
+
+
+def score_history_cache_key(organization_id: int) -> str:
+    # Values derived from the history (forecasts) extend this key and are invalidated with it
+    return f"score_history:org_{organization_id}"
+
+
+def completion_job_cache_key(job_id: str) -> str:
+    return f"completion_job:{job_id}"
+
+
+def latest_completion_job_cache_key(assessment_id: int) -> str:
+    return f"completion_job:assessment_{assessment_id}"
 
 
+def invalidate_assessment_cache(assessment_id: Optional[int] = None, organization_id: Optional[int] = None):
+    """Drop the cached assessment response, every list page that could contain it and the organization's score history"""
+    if assessment_id is not None:
+        cache.delete(assessment_cache_key(assessment_id))
+    if organization_id is not None:
+        cache.invalidate_pattern(f"assessments:org_{organization_id}")
+        cache.invalidate_pattern(score_history_cache_key(organization_id))
+    # Unfiltered listings span all organizations
+    cache.invalidate_pattern("assessments:org_None")
 
 
+def invalidate_assessments_cache(assessment_ids: Iterable[int], organization_ids: Iterable[int]):
+    """invalidate_assessment_cache for many assessments, touching each organization's pages once"""
+    for assessment_id in set(assessment_ids):
+        cache.delete(assessment_cache_key(assessment_id))
+    for organization_id in set(organization_ids):
+        cache.invalidate_pattern(f"assessments:org_{organization_id}")
+        cache.invalidate_pattern(score_history_cache_key(organization_id))
+    cache.invalidate_pattern("assessments:org_None")
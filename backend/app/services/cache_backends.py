@@ -0,0 +1,469 @@
+"""
+Cache storage backends: a bounded in-process store and shared stores (SQLite file, Redis)
+that let several worker processes see the same entries and invalidations
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict
+import heapq
+import itertools
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+# Keys are namespaced with ':' (e.g. "assessments:org_1:skip_0"); every segment prefix is indexed
+KEY_SEPARATOR = ":"
+
+
+def key_prefixes(key: str) -> List[str]:
+    """Every ':'-segment prefix of a key, shortest first"""
+    parts = key.split(KEY_SEPARATOR)
+    return [KEY_SEPARATOR.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate retained bytes of a cached value"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "ignore")) if not value.isascii() else len(value)
+    size = sys.getsizeof(value, 64)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(_estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, _depth + 1) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += _estimate_size(vars(value), _depth + 1)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int, tags: Tuple[str, ...]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class MemoryBackend:
+    """In-process LRU store with TTL, entry/byte budgets and indexed invalidation"""
+
+    # Expired entries are swept every SWEEP_INTERVAL operations, at most SWEEP_BATCH at a time
+    SWEEP_INTERVAL = 64
+    SWEEP_BATCH = 256
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()  # least recently used first
+        self._expiry: List[Tuple[float, int, str]] = []  # heap of (expires_at, seq, key)
+        self._seq = itertools.count()
+        self._prefixes: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._ops = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from cache if not expired"""
+        with self._lock:
+            self._tick()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 300, tags: Optional[Iterable[str]] = None):
+        """Set value in cache with TTL (0 or less never expires) and optional invalidation tags"""
+        size = _estimate_size(key) + _estimate_size(value)
+        with self._lock:
+            self._tick()
+            self._remove(key)
+            if size > self.max_bytes:
+                # Never worth flushing the whole cache for one oversized value
+                return
+            expires_at = time.monotonic() + ttl_seconds if ttl_seconds > 0 else None
+            entry = _Entry(value, expires_at, size, tuple(tags or ()))
+            self._entries[key] = entry
+            self._bytes += size
+            for prefix in key_prefixes(key):
+                self._prefixes.setdefault(prefix, set()).add(key)
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            if expires_at is not None:
+                heapq.heappush(self._expiry, (expires_at, next(self._seq), key))
+            self._evict()
+
+    def delete(self, key: str):
+        """Delete key from cache"""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """Clear all cache"""
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+            self._prefixes.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def invalidate_pattern(self, pattern: str):
+        """
+        Invalidate all keys under a ':'-segment prefix, e.g. "assessments:org_1" drops
+        "assessments:org_1" and "assessments:org_1:..." but not "assessments:org_12"
+        """
+        with self._lock:
+            for key in list(self._prefixes.get(pattern.rstrip(KEY_SEPARATOR), ())):
+                self._remove(key)
+
+    def invalidate_tag(self, tag: str):
+        """Invalidate all keys stored with the given tag"""
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def _remove(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._bytes -= entry.size
+        for prefix in key_prefixes(key):
+            keys = self._prefixes.get(prefix)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._prefixes[prefix]
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        # The expiry heap is cleaned lazily: stale heap items are skipped by the sweeper
+        return entry
+
+    def _evict(self):
+        """Drop least recently used entries until both budgets hold"""
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _tick(self):
+        self._ops += 1
+        if self._ops % self.SWEEP_INTERVAL == 0:
+            self._sweep()
+
+    def _sweep(self):
+        """Remove a bounded batch of expired entries and compact the heap when mostly stale"""
+        now = time.monotonic()
+        for _ in range(self.SWEEP_BATCH):
+            if not self._expiry or self._expiry[0][0] > now:
+                break
+            expires_at, _, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expirations += 1
+        if len(self._expiry) > 2 * len(self._entries) + self.SWEEP_BATCH:
+            self._expiry = [
+                item for item in self._expiry
+                if item[2] in self._entries and self._entries[item[2]].expires_at == item[0]
+            ]
+            heapq.heapify(self._expiry)
+
+
+def pack_value(value: Any, tags: Iterable[str], ttl_seconds: int) -> bytes:
+    """
+    Serialize a value for a shared backend. bytes are stored as-is, anything else as JSON;
+    raises TypeError for values JSON cannot represent
+    """
+    header = json.dumps({
+        "tags": list(tags),
+        "expires_at": time.time() + ttl_seconds if ttl_seconds > 0 else None
+    }).encode("utf-8")
+    if isinstance(value, (bytes, bytearray)):
+        return header + b"\nb" + bytes(value)
+    return header + b"\nj" + json.dumps(value).encode("utf-8")
+
+
+def unpack_value(data: bytes) -> Tuple[Any, List[str], Optional[float]]:
+    """Inverse of pack_value: (value, tags, remaining ttl in seconds or None)"""
+    header, _, body = bytes(data).partition(b"\n")
+    meta = json.loads(header)
+    value = body[1:] if body[:1] == b"b" else json.loads(body[1:])
+    remaining = meta["expires_at"] - time.time() if meta["expires_at"] is not None else None
+    return value, meta["tags"], remaining
+
+
+class SQLiteBackend:
+    """
+    Shared store in a SQLite file, for several workers on one host and for tests.
+    Invalidations are appended to an event log that every process polls.
+    """
+
+    name = "sqlite"
+
+    # Housekeeping (expired rows, entry budget, old events) runs every TRIM_INTERVAL writes
+    TRIM_INTERVAL = 64
+    EVENT_RETENTION_SECONDS = 600
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            expires_at REAL,
+            stored_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at ON cache_entries(stored_at);
+        CREATE TABLE IF NOT EXISTS cache_tags (
+            tag TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (tag, key)
+        );
+        CREATE TABLE IF NOT EXISTS cache_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            arg TEXT,
+            created_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+        self._event_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+        # Only invalidations published after startup concern this process
+        self._last_event = conn.execute("SELECT COALESCE(MAX(id), 0) FROM cache_events").fetchone()[0]
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set_raw(self, key: str, data: bytes, ttl_seconds: int, tags: Iterable[str]):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (key, data, now + ttl_seconds if ttl_seconds > 0 else None, now)
+            )
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.executemany("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if next(self._writes) % self.TRIM_INTERVAL == 0:
+            self._trim()
+
+    def invalidate(self, kind: str, arg: Optional[str], origin: str):
+        """Apply an invalidation ("key", "prefix", "tag" or "all") and publish it to other workers"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if kind == "key":
+                conn.execute("DELETE FROM cache_entries WHERE key = ?", (arg,))
+            elif kind == "prefix":
+                # Range scan on the primary key: the prefix itself and everything under "prefix:"
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key = ? OR (key >= ? AND key < ?)",
+                    (arg, arg + KEY_SEPARATOR, arg + chr(ord(KEY_SEPARATOR) + 1))
+                )
+            elif kind == "tag":
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_tags WHERE tag = ?)", (arg,)
+                )
+                conn.execute("DELETE FROM cache_tags WHERE tag = ?", (arg,))
+            elif kind == "all":
+                conn.execute("DELETE FROM cache_entries")
+                conn.execute("DELETE FROM cache_tags")
+            conn.execute(
+                "INSERT INTO cache_events (origin, kind, arg, created_at) VALUES (?, ?, ?, ?)",
+                (origin, kind, arg, time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def poll(self) -> List[Tuple[str, str, Optional[str]]]:
+        """Invalidations published since the last poll, as (origin, kind, arg)"""
+        with self._event_lock:
+            rows = self._conn().execute(
+                "SELECT id, origin, kind, arg FROM cache_events WHERE id > ? ORDER BY id", (self._last_event,)
+            ).fetchall()
+            if rows:
+                self._last_event = rows[-1][0]
+        return [(origin, kind, arg) for _, origin, kind, arg in rows]
+
+    def _trim(self):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        conn.execute("DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)")
+        conn.execute("DELETE FROM cache_events WHERE created_at < ?", (now - self.EVENT_RETENTION_SECONDS,))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RedisBackend:
+    """
+    Shared store on a Redis server (requires the optional redis package).
+    Invalidations are broadcast over pub/sub and queued for the owning cache to apply.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, namespace: str = "kpi99:cache"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self._redis = redis.Redis.from_url(url)
+        self._namespace = namespace
+        self._channel = f"{namespace}:invalidations"
+        self._events: "queue.SimpleQueue[Tuple[str, str, Optional[str]]]" = queue.SimpleQueue()
+        # Index sets must outlive their members: they expire after twice the longest TTL seen
+        self._index_ttl: Optional[int] = 0
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self._channel: self._on_message})
+        self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _key(self, key: str) -> str:
+        return f"{self._namespace}:entry:{key}"
+
+    def _prefix_index(self, prefix: str) -> str:
+        return f"{self._namespace}:prefix:{prefix}"
+
+    def _tag_index(self, tag: str) -> str:
+        return f"{self._namespace}:tag:{tag}"
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        return self._redis.get(self._key(key))
+
+    def set_raw(self, key: str, data: bytes, ttl_seconds: int, tags: Iterable[str]):
+        if ttl_seconds <= 0:
+            self._index_ttl = None
+        elif self._index_ttl is not None:
+            self._index_ttl = max(self._index_ttl, 2 * int(ttl_seconds))
+        indexes = [self._prefix_index(prefix) for prefix in key_prefixes(key)] + \
+            [self._tag_index(tag) for tag in tags]
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(key), data, ex=int(ttl_seconds) if ttl_seconds > 0 else None)
+        for index in indexes:
+            pipe.sadd(index, key)
+            if self._index_ttl is None:
+                pipe.persist(index)
+            else:
+                pipe.expire(index, self._index_ttl)
+        pipe.execute()
+
+    def invalidate(self, kind: str, arg: Optional[str], origin: str):
+        """Apply an invalidation ("key", "prefix", "tag" or "all") and publish it to other workers"""
+        if kind == "key":
+            self._redis.delete(self._key(arg))
+        elif kind in ("prefix", "tag"):
+            index = self._prefix_index(arg) if kind == "prefix" else self._tag_index(arg)
+            keys = [member.decode("utf-8") for member in self._redis.smembers(index)]
+            pipe = self._redis.pipeline()
+            for start in range(0, len(keys), 500):
+                pipe.delete(*[self._key(key) for key in keys[start:start + 500]])
+            pipe.delete(index)
+            pipe.execute()
+        elif kind == "all":
+            batch = []
+            for name in self._redis.scan_iter(match=f"{self._namespace}:*", count=1000):
+                batch.append(name)
+                if len(batch) >= 500:
+                    self._redis.delete(*batch)
+                    batch = []
+            if batch:
+                self._redis.delete(*batch)
+        self._redis.publish(self._channel, json.dumps({"origin": origin, "kind": kind, "arg": arg}))
+
+    def _on_message(self, message):
+        try:
+            event = json.loads(message["data"])
+            self._events.put((event["origin"], event["kind"], event["arg"]))
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    def poll(self) -> List[Tuple[str, str, Optional[str]]]:
+        """Invalidations received since the last poll, as (origin, kind, arg)"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        self._listener.stop()
+        self._pubsub.close()
+        self._redis.close()
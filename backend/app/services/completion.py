@@ -0,0 +1,368 @@
+"""
+Asynchronous assessment completion pipeline
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from app.database import SessionLocal
+from app import models
+from app.services.scoring import ScoringService
+from app.services.recommendations import RecommendationService
+from app.services.webhooks import WebhookService
+from app.services.cache import (
+    cache,
+    completion_job_cache_key,
+    invalidate_assessment_cache,
+    latest_completion_job_cache_key,
+)
+from app.services.org_metrics import OrgMetricsService
+from app.services.summaries import AssessmentSummaryService
+from app.services.anomalies import AnomalyService
+from app.services.report_prerender import report_prerenderer
+
+# Stages run in order; the side-effect stages after "finalize" run concurrently
+CORE_STAGES = ["scores", "findings", "recommendations", "finalize"]
+FANOUT_STAGES = ["webhooks", "notification", "anomalies", "reports"]
+# How long job progress stays readable from the shared cache
+JOB_STATE_TTL_SECONDS = int(os.getenv("COMPLETION_JOB_TTL", "86400"))
+
+
+class StageStatus:
+    """Progress and timing of one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"  # pending, running, completed, failed, skipped
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_ms": round(self.duration_ms, 2) if self.duration_ms is not None else None,
+            "error": self.error
+        }
+
+
+class CompletionJob:
+    """A queued or running completion of one assessment"""
+
+    def __init__(self, assessment_id: int):
+        self.job_id = uuid.uuid4().hex
+        self.assessment_id = assessment_id
+        self.status = "queued"  # queued, running, completed, completed_with_errors, failed
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.stages: Dict[str, StageStatus] = OrderedDict(
+            (name, StageStatus(name)) for name in CORE_STAGES + FANOUT_STAGES
+        )
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "assessment_id": self.assessment_id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            "result": dict(self.result),
+            "stages": [stage.to_dict() for stage in self.stages.values()]
+        }
+
+
+class CompletionPipeline:
+    """
+    Runs assessment completion on a local worker pool and tracks job progress. Progress is also
+    published to the cache, so any worker sharing its backend can report it
+    """
+
+    MAX_TRACKED_JOBS = 1000
+
+    def __init__(self, max_workers: Optional[int] = None):
+        max_workers = max_workers or int(os.getenv("COMPLETION_WORKERS", "4"))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="completion")
+        # Separate pool so fan-out stages never wait on a slot held by their own job
+        self._fanout_executor = ThreadPoolExecutor(
+            max_workers=max_workers * len(FANOUT_STAGES), thread_name_prefix="completion-fanout"
+        )
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, CompletionJob]" = OrderedDict()
+        self._latest: Dict[int, str] = {}
+
+    def submit(self, assessment_id: int) -> CompletionJob:
+        """Queue completion of an assessment; an already active job is returned as-is"""
+        with self._lock:
+            current = self._jobs.get(self._latest.get(assessment_id, ""))
+            if current and current.is_active:
+                return current
+            job = CompletionJob(assessment_id)
+            self._jobs[job.job_id] = job
+            self._latest[assessment_id] = job.job_id
+            self._prune()
+        self._publish(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[CompletionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_for(self, assessment_id: int) -> Optional[CompletionJob]:
+        with self._lock:
+            return self._jobs.get(self._latest.get(assessment_id, ""))
+
+    def status(self, assessment_id: int, job_id: Optional[str], db) -> Optional[Dict[str, Any]]:
+        """
+        Progress of a completion job (the latest by default): tracked here, published by another
+        worker, or, for jobs no worker knows about any more, derived from the assessment's status.
+        None if the assessment does not exist.
+        """
+        job = self.get(job_id) if job_id else self.latest_for(assessment_id)
+        if job and job.assessment_id == assessment_id:
+            return job.to_dict()
+
+        job_id = job_id or cache.get(latest_completion_job_cache_key(assessment_id))
+        state = cache.get(completion_job_cache_key(job_id)) if job_id else None
+        if state and state["assessment_id"] == assessment_id:
+            return state
+
+        assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
+        if not assessment:
+            return None
+        completed = assessment.status == "completed"
+        return {
+            "job_id": job_id,
+            "assessment_id": assessment_id,
+            # unknown: queued on another worker without a shared cache, or lost in a restart
+            "status": "completed" if completed else "unknown",
+            "created_at": None,
+            "started_at": None,
+            "finished_at": assessment.completed_at.isoformat() if completed and assessment.completed_at else None,
+            "error": None,
+            "result": {},
+            "stages": []
+        }
+
+    @staticmethod
+    def _publish(job: CompletionJob):
+        try:
+            cache.set(completion_job_cache_key(job.job_id), job.to_dict(), ttl_seconds=JOB_STATE_TTL_SECONDS)
+            cache.set(latest_completion_job_cache_key(job.assessment_id), job.job_id, ttl_seconds=JOB_STATE_TTL_SECONDS)
+        except Exception as e:
+            # Progress stays readable from this worker
+            print(f"Could not publish completion job {job.job_id}: {e}")
+
+    def shutdown(self, wait_for_jobs: bool = False):
+        self._executor.shutdown(wait=wait_for_jobs)
+        self._fanout_executor.shutdown(wait=wait_for_jobs)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond MAX_TRACKED_JOBS"""
+        for job_id in list(self._jobs.keys()):
+            if len(self._jobs) <= self.MAX_TRACKED_JOBS:
+                break
+            job = self._jobs[job_id]
+            if job.is_active:
+                continue
+            del self._jobs[job_id]
+            if self._latest.get(job.assessment_id) == job_id:
+                del self._latest[job.assessment_id]
+
+    def _run_stage(self, job: CompletionJob, name: str, func: Callable[[], Any]) -> bool:
+        stage = job.stages[name]
+        stage.status = "running"
+        stage.started_at = datetime.utcnow()
+        self._publish(job)
+        started = time.monotonic()
+        try:
+            func()
+            stage.status = "completed"
+            return True
+        except Exception as e:
+            stage.status = "failed"
+            stage.error = str(e)
+            print(f"Completion stage '{name}' failed for assessment {job.assessment_id}: {e}")
+            print(traceback.format_exc())
+            return False
+        finally:
+            stage.duration_ms = (time.monotonic() - started) * 1000.0
+            stage.finished_at = datetime.utcnow()
+            self._publish(job)
+
+    def _run(self, job: CompletionJob):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db = SessionLocal()
+        context: Dict[str, Any] = {}
+        try:
+            assessment = db.query(models.Assessment).filter(models.Assessment.id == job.assessment_id).first()
+            if not assessment:
+                raise ValueError("Assessment not found")
+            context["organization_id"] = assessment.organization_id
+            context["name"] = assessment.name
+            context["was_completed"] = assessment.status == "completed"
+
+            scoring_service = ScoringService()
+
+            def calculate_scores():
+                context["scores"] = scoring_service.calculate_all_scores(job.assessment_id, db)
+
+            def generate_findings():
+                context["findings"] = scoring_service.generate_findings(job.assessment_id, db)
+
+            def generate_recommendations():
+                context["recommendations"] = RecommendationService().generate_recommendations(
+                    job.assessment_id, db, scores=context["scores"]
+                )
+
+            core = [
+                ("scores", calculate_scores),
+                ("findings", generate_findings),
+                ("recommendations", generate_recommendations),
+                ("finalize", lambda: self._finalize(job.assessment_id, context["was_completed"], db)),
+            ]
+            for name, func in core:
+                if not self._run_stage(job, name, func):
+                    db.rollback()
+                    self._skip_remaining(job)
+                    job.status = "failed"
+                    job.error = f"Stage '{name}' failed: {job.stages[name].error}"
+                    return
+
+            scores = context["scores"]
+            job.result = {
+                "scores": len(scores),
+                "findings": len(context["findings"]),
+                "recommendations": len(context["recommendations"]),
+                "overall_maturity": sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0
+            }
+
+            # Side effects do not depend on each other; run them side by side
+            fanout = [
+                self._fanout_executor.submit(self._run_stage, job, "webhooks",
+                                             lambda: self._deliver_webhooks(job, context)),
+                self._fanout_executor.submit(self._run_stage, job, "notification",
+                                             lambda: self._create_notification(job, context)),
+                self._fanout_executor.submit(self._run_stage, job, "anomalies",
+                                             lambda: self._scan_anomalies(context)),
+                self._fanout_executor.submit(self._run_stage, job, "reports",
+                                             lambda: self._schedule_reports(job)),
+            ]
+            wait(fanout)
+            # The assessment is completed either way; failed side effects are reported, not retried
+            failed = [name for name in FANOUT_STAGES if job.stages[name].status == "failed"]
+            if failed:
+                job.status = "completed_with_errors"
+                job.error = f"Stages failed: {', '.join(failed)}"
+            else:
+                job.status = "completed"
+        except Exception as e:
+            db.rollback()
+            self._skip_remaining(job)
+            job.status = "failed"
+            job.error = str(e)
+            print(f"Completion failed for assessment {job.assessment_id}: {e}")
+        finally:
+            db.close()
+            job.finished_at = datetime.utcnow()
+            self._publish(job)
+
+    @staticmethod
+    def _skip_remaining(job: CompletionJob):
+        for stage in job.stages.values():
+            if stage.status == "pending":
+                stage.status = "skipped"
+
+    @staticmethod
+    def _finalize(assessment_id: int, was_completed: bool, db):
+        assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
+        assessment.status = "completed"
+        assessment.completed_at = datetime.utcnow()
+        OrgMetricsService.apply_completion(assessment_id, assessment.organization_id, was_completed, db)
+        AssessmentSummaryService.refresh(assessment_id, db)
+        db.commit()
+        invalidate_assessment_cache(assessment_id, assessment.organization_id)
+
+    @staticmethod
+    def _deliver_webhooks(job: CompletionJob, context: Dict[str, Any]):
+        payload = {
+            "assessment_id": job.assessment_id,
+            "organization_id": context["organization_id"],
+            "status": "completed",
+            "overall_maturity": job.result["overall_maturity"],
+            "scores_count": job.result["scores"],
+            "findings_count": job.result["findings"],
+            "recommendations_count": job.result["recommendations"]
+        }
+        db = SessionLocal()
+        try:
+            asyncio.run(WebhookService.trigger_event(
+                context["organization_id"],
+                "assessment.completed",
+                payload,
+                db
+            ))
+        finally:
+            db.close()
+
+    @staticmethod
+    def _create_notification(job: CompletionJob, context: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            db.add(models.Notification(
+                organization_id=context["organization_id"],
+                assessment_id=job.assessment_id,
+                type="assessment_completed",
+                title="Assessment Completed",
+                message=f"Assessment '{context['name']}' has been completed with {job.result['recommendations']} recommendations."
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _scan_anomalies(context: Dict[str, Any]):
+        # New or replaced scores shift the history windows of the whole organization
+        db = SessionLocal()
+        try:
+            AnomalyService.scan(db, [context["organization_id"]])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _schedule_reports(job: CompletionJob):
+        # Rendering runs on the prerenderer's own bounded pool; the job does not wait for it
+        if not report_prerenderer.schedule(job.assessment_id):
+            print(f"Reports of assessment {job.assessment_id} not pre-rendered; they render on first download")
+
+
+# Global pipeline instance
+completion_pipeline = CompletionPipeline()
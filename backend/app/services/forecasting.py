@@ -0,0 +1,179 @@
+"""
+Least-squares maturity forecasts over full organization score histories (numpy), cached per organization
+"""
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+from app.models import Dimension
+from app.services.cache import cache, score_history_cache_key
+from app.services.score_history import HISTORY_TTL_SECONDS, OrgScoreHistory, ScoreHistoryService
+
+# Days past the latest completed assessment that projections are made for
+HORIZON_DAYS = 182.5
+DAYS_PER_MONTH = 30.44
+# Histories spanning less than this (imports, re-completions) carry no usable trend and get no projection
+MIN_SPAN_DAYS = 1.0
+INTERVAL_LEVEL = 0.95
+MATURITY_MIN = 0.0
+MATURITY_MAX = 5.0
+
+OVERALL = "overall"
+SERIES = [OVERALL] + [dimension.value for dimension in Dimension]
+
+# Two-sided 95% Student t quantiles for 1..30 degrees of freedom; beyond that interpolated in 1/df
+_T_TABLE = np.array([
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+])
+_T_TAIL_INVERSE_DF = np.array([0.0, 1 / 120, 1 / 60, 1 / 40, 1 / 30])
+_T_TAIL = np.array([1.960, 1.980, 2.000, 2.021, 2.042])
+
+
+def _t_critical(degrees_of_freedom: np.ndarray) -> np.ndarray:
+    df = np.maximum(degrees_of_freedom, 1)
+    tail = np.interp(1.0 / df, _T_TAIL_INVERSE_DF, _T_TAIL)
+    return np.where(df <= len(_T_TABLE), _T_TABLE[np.minimum(df, len(_T_TABLE)) - 1], tail)
+
+
+def _forecast_cache_key(organization_id: int) -> str:
+    # Under the score history key, so it is dropped whenever the history is
+    return f"{score_history_cache_key(organization_id)}:forecast"
+
+
+def fit(groups: np.ndarray, days: np.ndarray, values: np.ndarray, group_count: int) -> Dict[str, np.ndarray]:
+    """
+    Ordinary least squares value = intercept + slope * day for every group at once.
+    Returns per-group arrays; slope and projection need 2 points spanning MIN_SPAN_DAYS (NaN
+    otherwise), the interval 3.
+    """
+    counts = np.bincount(groups, minlength=group_count).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_day = np.bincount(groups, days, group_count) / counts
+        mean_value = np.bincount(groups, values, group_count) / counts
+        day_offsets = days - mean_day[groups]
+        value_offsets = values - mean_value[groups]
+        sxx = np.bincount(groups, day_offsets ** 2, group_count)
+        sxy = np.bincount(groups, day_offsets * value_offsets, group_count)
+        syy = np.bincount(groups, value_offsets ** 2, group_count)
+
+        first_day = np.full(group_count, np.inf)
+        last_day = np.full(group_count, -np.inf)
+        np.minimum.at(first_day, groups, days)
+        np.maximum.at(last_day, groups, days)
+        # Too short a span has no trend to extrapolate: the mean of such points is not a forecast
+        sufficient = last_day - first_day >= MIN_SPAN_DAYS
+        sxx = np.where(sufficient, sxx, 0.0)
+
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        residuals = value_offsets - slope[groups] * day_offsets
+        sse = np.bincount(groups, residuals ** 2, group_count)
+        r_squared = np.where((syy > 0) & (sxx > 0), 1.0 - sse / syy, np.nan)
+
+        target_day = last_day + HORIZON_DAYS
+        projected = mean_value + slope * (target_day - mean_day)
+
+        degrees_of_freedom = (counts - 2).astype(int)
+        residual_stdev = np.sqrt(sse / np.maximum(degrees_of_freedom, 1))
+        leverage = np.where(sxx > 0, (target_day - mean_day) ** 2 / sxx, 0.0)
+        margin = _t_critical(degrees_of_freedom) * residual_stdev * np.sqrt(1.0 + 1.0 / counts + leverage)
+        margin = np.where(degrees_of_freedom >= 1, margin, np.nan)
+
+    projected = np.where(sufficient, projected, np.nan)
+    return {
+        "points": counts,
+        "slope": np.where(sufficient, slope, np.nan),
+        "projected": projected,
+        "lower": projected - margin,
+        "upper": projected + margin,
+        "r_squared": np.where(sufficient, r_squared, np.nan),
+    }
+
+
+def _clamp(value: float) -> float:
+    return min(MATURITY_MAX, max(MATURITY_MIN, value))
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class ForecastService:
+    """Projects overall and per-dimension maturity HORIZON_DAYS ahead from every completed assessment"""
+
+    @staticmethod
+    def forecast_histories(histories: Iterable[OrgScoreHistory]) -> Dict[int, Dict[str, Any]]:
+        """Forecasts keyed by organization id, fitted for all organizations and series in one pass"""
+        histories = list(histories)
+        groups: List[int] = []
+        days: List[float] = []
+        values: List[float] = []
+        series_index = {series: index for index, series in enumerate(SERIES)}
+        for organization_index, history in enumerate(histories):
+            base = organization_index * len(SERIES)
+            for entry in history.completed:
+                if not entry.scores:
+                    continue
+                timestamp = entry.completed_at or entry.created_at
+                if timestamp is None:
+                    continue
+                day = timestamp.timestamp() / 86400.0
+                groups.append(base)
+                days.append(day)
+                values.append(entry.overall_maturity)
+                for dimension, score in entry.scores.items():
+                    groups.append(base + series_index[dimension])
+                    days.append(day)
+                    values.append(score)
+
+        group_count = len(histories) * len(SERIES)
+        fitted = fit(
+            np.array(groups, dtype=np.int64), np.array(days, dtype=float), np.array(values, dtype=float), group_count
+        ) if groups else None
+
+        forecasts = {}
+        for organization_index, history in enumerate(histories):
+            series_forecasts = {}
+            for index, series in enumerate(SERIES):
+                group = organization_index * len(SERIES) + index
+                if fitted is None or fitted["points"][group] < 2:
+                    continue
+                projected = _optional(fitted["projected"][group])
+                lower, upper = _optional(fitted["lower"][group]), _optional(fitted["upper"][group])
+                slope = _optional(fitted["slope"][group])
+                # projected (and everything fitted) is None when the points span too little time
+                series_forecasts[series] = {
+                    "points": int(fitted["points"][group]),
+                    "projected": _clamp(projected) if projected is not None else None,
+                    "lower": _clamp(lower) if lower is not None else None,
+                    "upper": _clamp(upper) if upper is not None else None,
+                    "slope_per_month": slope * DAYS_PER_MONTH if slope is not None else None,
+                    "r_squared": _optional(fitted["r_squared"][group]),
+                }
+            forecasts[history.organization_id] = {
+                "organization_id": history.organization_id,
+                "horizon_days": HORIZON_DAYS,
+                "interval_level": INTERVAL_LEVEL,
+                "overall": series_forecasts.pop(OVERALL, None),
+                "dimensions": series_forecasts,
+            }
+        return forecasts
+
+    @staticmethod
+    def forecast_all(db: Session, organization_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """Forecasts for the given organizations (default: all with assessments) with one query, cached as they go"""
+        forecasts = ForecastService.forecast_histories(ScoreHistoryService.load_all(db, organization_ids).values())
+        for organization_id, forecast in forecasts.items():
+            cache.set(_forecast_cache_key(organization_id), forecast, ttl_seconds=HISTORY_TTL_SECONDS)
+        return forecasts
+
+    @staticmethod
+    def get(history: OrgScoreHistory) -> Dict[str, Any]:
+        """The organization's forecast from cache, fitted from its history on a miss"""
+        key = _forecast_cache_key(history.organization_id)
+        forecast = cache.get(key)
+        if forecast is None:
+            forecast = ForecastService.forecast_histories([history])[history.organization_id]
+            cache.set(key, forecast, ttl_seconds=HISTORY_TTL_SECONDS)
+        return forecast
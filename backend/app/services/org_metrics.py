@@ -0,0 +1,275 @@
+"""
+Materialized organization metrics maintained incrementally on completion and recommendation updates
+"""
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app import models
+
+# Recommendation statuses with their own rollup counter
+RECOMMENDATION_STATUS_COLUMNS = {
+    "pending": "recommendations_pending",
+    "in_progress": "recommendations_in_progress",
+    "completed": "recommendations_completed",
+    "skipped": "recommendations_skipped",
+}
+
+
+def _status_key(status: Optional[str]) -> str:
+    return status or "pending"
+
+
+class OrgMetricsService:
+    """Reads, rebuilds and incrementally updates org_metrics_rollup rows"""
+
+    @staticmethod
+    def lock(organization_ids: Iterable[int], db: Session):
+        """
+        Lock organization rows (in id order) until the caller's transaction ends. Rebuilds and
+        incremental updates take it before touching a rollup, so an update is either in a
+        rebuild's aggregates or applied to the rebuilt row, never lost in between
+        """
+        organization_ids = sorted(set(organization_ids))
+        if organization_ids:
+            db.query(models.Organization.id).filter(
+                models.Organization.id.in_(organization_ids)
+            ).order_by(models.Organization.id).with_for_update().all()
+
+    @staticmethod
+    def get(organization_id: int, db: Session) -> models.OrgMetricsRollup:
+        """The organization's rollup: one primary-key read, rebuilt first if missing"""
+        rollup = db.get(models.OrgMetricsRollup, organization_id)
+        if rollup is not None:
+            return rollup
+        try:
+            rollup = OrgMetricsService.rebuild(organization_id, db)
+            db.commit()
+        except IntegrityError:
+            # A concurrent request rebuilt it first
+            db.rollback()
+            rollup = db.get(models.OrgMetricsRollup, organization_id)
+        return rollup
+
+    @staticmethod
+    def rebuild(organization_id: int, db: Session) -> models.OrgMetricsRollup:
+        """Recompute the rollup with aggregate queries and replace the stored row (not committed)"""
+        OrgMetricsService.lock([organization_id], db)
+        Assessment = models.Assessment
+        completed = select(Assessment.id).where(
+            Assessment.organization_id == organization_id,
+            Assessment.status == "completed"
+        )
+
+        total_assessments = db.query(func.count(Assessment.id)).filter(
+            Assessment.organization_id == organization_id
+        ).scalar()
+        completed_assessments, latest_completed_at = db.query(
+            func.count(Assessment.id), func.max(Assessment.completed_at)
+        ).filter(Assessment.id.in_(completed)).one()
+
+        overall = db.query(func.avg(models.Score.maturity_score).label("overall")).filter(
+            models.Score.assessment_id.in_(completed)
+        ).group_by(models.Score.assessment_id).subquery()
+        maturity_sum, maturity_count = db.query(
+            func.coalesce(func.sum(overall.c.overall), 0.0), func.count(overall.c.overall)
+        ).one()
+
+        dimension_totals = {
+            dimension: (score_sum, score_count)
+            for dimension, score_sum, score_count in db.query(
+                models.Score.dimension, func.sum(models.Score.maturity_score), func.count(models.Score.id)
+            ).filter(models.Score.assessment_id.in_(completed)).group_by(models.Score.dimension).all()
+        }
+        # Keep the dimensions in their declared order, like the scores themselves
+        dimension_sums = {}
+        dimension_counts = {}
+        for dimension in models.Dimension:
+            if dimension in dimension_totals:
+                dimension_sums[str(dimension.value)], dimension_counts[str(dimension.value)] = dimension_totals[dimension]
+
+        rollup = models.OrgMetricsRollup(
+            organization_id=organization_id,
+            total_assessments=total_assessments,
+            completed_assessments=completed_assessments,
+            maturity_sum=maturity_sum,
+            maturity_count=maturity_count,
+            dimension_sums=dimension_sums,
+            dimension_counts=dimension_counts,
+            recommendations_total=0,
+            latest_completed_at=latest_completed_at,
+            **{column: 0 for column in RECOMMENDATION_STATUS_COLUMNS.values()}
+        )
+        for status, count in db.query(
+            models.Recommendation.status, func.count(models.Recommendation.id)
+        ).filter(models.Recommendation.assessment_id.in_(completed)).group_by(models.Recommendation.status).all():
+            rollup.recommendations_total += count
+            column = RECOMMENDATION_STATUS_COLUMNS.get(_status_key(status))
+            if column:
+                setattr(rollup, column, getattr(rollup, column) + count)
+
+        db.query(models.OrgMetricsRollup).filter(
+            models.OrgMetricsRollup.organization_id == organization_id
+        ).delete()
+        db.add(rollup)
+        db.flush()
+        return rollup
+
+    @staticmethod
+    def invalidate(organization_ids: Iterable[int], db: Session):
+        """Drop rollups so the next read rebuilds them (for changes without an incremental path)"""
+        organization_ids = list(set(organization_ids))
+        if organization_ids:
+            OrgMetricsService.lock(organization_ids, db)
+            db.query(models.OrgMetricsRollup).filter(
+                models.OrgMetricsRollup.organization_id.in_(organization_ids)
+            ).delete(synchronize_session=False)
+
+    @staticmethod
+    def add_assessments(organization_id: int, count: int, db: Session):
+        """Count newly created assessments"""
+        OrgMetricsService.lock([organization_id], db)
+        Rollup = models.OrgMetricsRollup
+        db.query(Rollup).filter(Rollup.organization_id == organization_id).update(
+            {Rollup.total_assessments: Rollup.total_assessments + count}, synchronize_session=False
+        )
+
+    @staticmethod
+    def apply_completion(assessment_id: int, organization_id: int, was_completed: bool, db: Session):
+        """
+        Fold a newly completed assessment into its organization's rollup, in the caller's
+        transaction and after the assessment row was marked completed
+        """
+        OrgMetricsService.lock([organization_id], db)
+        if was_completed:
+            # Re-completion replaced scores and recommendations already counted
+            OrgMetricsService.invalidate([organization_id], db)
+            return
+
+        rollup = db.query(models.OrgMetricsRollup).filter(
+            models.OrgMetricsRollup.organization_id == organization_id
+        ).with_for_update().first()
+        if rollup is None:
+            return
+
+        db.flush()
+        scores = db.query(models.Score.dimension, models.Score.maturity_score).filter(
+            models.Score.assessment_id == assessment_id
+        ).all()
+        recommendation_counts = db.query(
+            models.Recommendation.status, func.count(models.Recommendation.id)
+        ).filter(models.Recommendation.assessment_id == assessment_id).group_by(models.Recommendation.status).all()
+
+        rollup.completed_assessments += 1
+        if scores:
+            rollup.maturity_sum += sum(score for _, score in scores) / len(scores)
+            rollup.maturity_count += 1
+            dimension_sums = dict(rollup.dimension_sums or {})
+            dimension_counts = dict(rollup.dimension_counts or {})
+            for dimension, score in scores:
+                key = str(dimension.value)
+                dimension_sums[key] = dimension_sums.get(key, 0.0) + score
+                dimension_counts[key] = dimension_counts.get(key, 0) + 1
+            # Reassign so the JSON columns are flagged dirty
+            rollup.dimension_sums = dimension_sums
+            rollup.dimension_counts = dimension_counts
+        for status, count in recommendation_counts:
+            rollup.recommendations_total += count
+            column = RECOMMENDATION_STATUS_COLUMNS.get(_status_key(status))
+            if column:
+                setattr(rollup, column, getattr(rollup, column) + count)
+        rollup.latest_completed_at = db.query(func.max(models.Assessment.completed_at)).filter(
+            models.Assessment.organization_id == organization_id,
+            models.Assessment.status == "completed"
+        ).scalar()
+
+    @staticmethod
+    def apply_recommendation_status(changes: Iterable[Tuple[int, Optional[str], str]], db: Session):
+        """
+        Move recommendation counts between status counters. changes are
+        (assessment_id, old status, new status); only completed assessments are counted.
+        """
+        changes = [
+            (assessment_id, _status_key(old), _status_key(new))
+            for assessment_id, old, new in changes
+            if _status_key(old) != _status_key(new)
+        ]
+        if not changes:
+            return
+
+        organizations = {
+            assessment_id: organization_id
+            for assessment_id, organization_id in db.query(
+                models.Assessment.id, models.Assessment.organization_id
+            ).filter(
+                models.Assessment.id.in_({assessment_id for assessment_id, _, _ in changes}),
+                models.Assessment.status == "completed"
+            ).all()
+        }
+
+        deltas: Dict[int, Dict[str, int]] = {}
+        for assessment_id, old, new in changes:
+            organization_id = organizations.get(assessment_id)
+            if organization_id is None:
+                continue
+            delta = deltas.setdefault(organization_id, {})
+            for status, step in ((old, -1), (new, 1)):
+                column = RECOMMENDATION_STATUS_COLUMNS.get(status)
+                if column:
+                    delta[column] = delta.get(column, 0) + step
+
+        OrgMetricsService.lock(deltas, db)
+        Rollup = models.OrgMetricsRollup
+        for organization_id, delta in deltas.items():
+            values = {
+                getattr(Rollup, column): getattr(Rollup, column) + step
+                for column, step in delta.items() if step
+            }
+            if values:
+                db.query(Rollup).filter(Rollup.organization_id == organization_id).update(
+                    values, synchronize_session=False
+                )
+
+    @staticmethod
+    def to_metrics(rollup: models.OrgMetricsRollup) -> Dict[str, Any]:
+        """Response body of GET /api/analytics/organization/{id}/metrics"""
+        if not rollup.completed_assessments:
+            return {
+                "organization_id": rollup.organization_id,
+                "total_assessments": rollup.total_assessments,
+                "completed_assessments": 0,
+                "average_maturity": 0.0,
+                "total_recommendations": 0,
+                "completed_recommendations": 0,
+                "dimension_averages": {}
+            }
+
+        dimension_counts = rollup.dimension_counts or {}
+        total_recommendations = rollup.recommendations_total
+        completed_recommendations = rollup.recommendations_completed
+        return {
+            "organization_id": rollup.organization_id,
+            "total_assessments": rollup.total_assessments,
+            "completed_assessments": rollup.completed_assessments,
+            "average_maturity": rollup.maturity_sum / rollup.maturity_count if rollup.maturity_count else 0.0,
+            "total_recommendations": total_recommendations,
+            "completed_recommendations": completed_recommendations,
+            "recommendation_completion_rate": (completed_recommendations / total_recommendations * 100) if total_recommendations > 0 else 0.0,
+            "dimension_averages": {
+                dimension: total / dimension_counts[dimension]
+                for dimension, total in (rollup.dimension_sums or {}).items()
+                if dimension_counts.get(dimension)
+            },
+            "latest_assessment_date": rollup.latest_completed_at.isoformat() if rollup.latest_completed_at else None
+        }
+
+    @staticmethod
+    def rebuild_all(db: Session, organization_ids: Optional[List[int]] = None) -> int:
+        """Rebuild rollups for the given organizations (default: all), committing each"""
+        if organization_ids is None:
+            organization_ids = [row[0] for row in db.query(models.Organization.id).order_by(models.Organization.id).all()]
+        for organization_id in organization_ids:
+            OrgMetricsService.rebuild(organization_id, db)
+            db.commit()
+        return len(organization_ids)
@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination over assessments ordered by (created_at desc, id desc)
+"""
+from sqlalchemy import String, and_, or_, type_coerce
+from sqlalchemy.orm import Query, Session
+from datetime import datetime
+from typing import List, Optional, Tuple
+import base64
+import json
+
+from app import models
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not produced by encode_cursor"""
+
+
+def _sort_column(db: Session):
+    """
+    created_at as the database stores it. SQLite keeps timestamps as text in two formats
+    (server defaults without fractional seconds, ORM writes with them), and text comparison
+    against a re-bound datetime would skip or repeat rows; the raw text compares exactly.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return type_coerce(models.Assessment.created_at, String)
+    return models.Assessment.created_at
+
+
+def encode_cursor(created_at, assessment_id: int) -> str:
+    if isinstance(created_at, datetime):
+        created_at = {"dt": created_at.isoformat()}
+    payload = json.dumps([created_at, assessment_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, assessment_id = json.loads(payload)
+        if isinstance(created_at, dict):
+            created_at = datetime.fromisoformat(created_at["dt"])
+        if not isinstance(assessment_id, int) or not isinstance(created_at, (str, datetime)):
+            raise ValueError("unexpected cursor contents")
+        return created_at, assessment_id
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_page(
+    query: Query,
+    db: Session,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[models.Assessment], Optional[str]]:
+    """
+    One page of the filtered assessment query after the given cursor (None or empty for
+    the first page) and the cursor of the next page, if any. Rows inserted while a client
+    pages never shift later pages.
+    """
+    sort_column = _sort_column(db)
+    if cursor:
+        created_at, assessment_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            sort_column < created_at,
+            and_(sort_column == created_at, models.Assessment.id < assessment_id)
+        ))
+
+    rows = query.add_columns(sort_column).order_by(
+        models.Assessment.created_at.desc(), models.Assessment.id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_created_at = rows[-1]
+        next_cursor = encode_cursor(last_created_at, last.id)
+    return [assessment for assessment, _ in rows], next_cursor
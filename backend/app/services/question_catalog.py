@@ -0,0 +1,184 @@
+"""
+Process-wide catalog of compiled question scoring plans
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+import json
+import threading
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.models import Dimension, QuestionType
+
+_EMPTY: Mapping = MappingProxyType({})
+
+
+def _to_float(value: object) -> Optional[float]:
+    """Convert a mapping score to float, None when it cannot be used"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    """Immutable scoring plan compiled once from a Question row"""
+    question_id: int
+    version: int
+    dimension: Dimension
+    question_type: QuestionType
+    weight: float
+    is_critical: bool
+    # maturity_mapping as answer -> score; None marks a key whose score is not numeric
+    mapping: Optional[Mapping[str, Optional[float]]]
+    # First index of every option, for select questions
+    option_index: Mapping[str, int]
+    option_count: int
+
+    @classmethod
+    def compile(cls, question: models.Question, version: int = 0) -> "ScoringPlan":
+        """Compile a Question into lookup tables"""
+        mapping = None
+        if question.maturity_mapping:
+            mapping = MappingProxyType({
+                str(key): _to_float(score) for key, score in question.maturity_mapping.items()
+            })
+
+        option_index: Dict[str, int] = {}
+        option_count = 0
+        options = question.options or {}
+        if isinstance(options, dict) and isinstance(options.get("options"), list) and options["options"]:
+            options_list = options["options"]
+            option_count = len(options_list)
+            for index, option in enumerate(options_list):
+                try:
+                    option_index.setdefault(option, index)
+                except TypeError:
+                    continue
+
+        return cls(
+            question_id=question.id,
+            version=version,
+            dimension=question.dimension,
+            question_type=question.question_type,
+            weight=question.weight if question.weight is not None else 1.0,
+            is_critical=bool(question.is_critical),
+            mapping=mapping,
+            option_index=MappingProxyType(option_index) if option_index else _EMPTY,
+            option_count=option_count,
+        )
+
+    def score(self, answer_value: str) -> float:
+        """Calculate maturity score (0-5) for a single answer"""
+        if self.mapping:
+            mapped = self._score_from_mapping(answer_value)
+            if mapped is not None:
+                return mapped
+
+        # Default scoring logic based on question type
+        if self.question_type == QuestionType.NUMERIC:
+            try:
+                value = float(answer_value)
+            except (TypeError, ValueError):
+                return 0.0
+            # Normalize to 0-5 scale (adjust based on expected ranges)
+            return min(5.0, max(0.0, value / 20.0 * 5.0))
+
+        if self.question_type in (QuestionType.SINGLE_SELECT, QuestionType.MULTI_SELECT):
+            # For select questions, assume higher index = higher maturity
+            if self.option_count:
+                try:
+                    answer_data = json.loads(answer_value) if answer_value.startswith('[') else [answer_value]
+                except (AttributeError, ValueError):
+                    answer_data = None
+                if isinstance(answer_data, list) and answer_data:
+                    try:
+                        index = self.option_index.get(answer_data[0])
+                    except TypeError:
+                        index = None
+                    if index is not None:
+                        return (index / self.option_count) * 5.0
+            return 2.5  # Default middle score
+
+        return 0.0
+
+    def _score_from_mapping(self, answer_value: str) -> Optional[float]:
+        """Look the answer up in the explicit mapping; None falls back to type scoring"""
+        try:
+            answer_data = json.loads(answer_value) if answer_value.startswith('{') else answer_value
+        except (AttributeError, ValueError):
+            return None
+
+        if isinstance(answer_data, dict):
+            # Structured answers: exact hit on one of the values first
+            for value in answer_data.values():
+                if isinstance(value, str) and value in self.mapping:
+                    return self.mapping[value]
+            # then the legacy containment match, in mapping order
+            text = str(answer_data)
+            for key, score in self.mapping.items():
+                if key in text:
+                    return score
+            return None
+
+        # Direct value mapping; unknown answers score 0
+        key = str(answer_data)
+        if key not in self.mapping:
+            return 0.0
+        return self.mapping[key]
+
+
+class QuestionCatalog:
+    """Thread-safe cache of ScoringPlans keyed by question id and catalog version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._plans: Dict[int, ScoringPlan] = {}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self):
+        """Drop every compiled plan; call whenever questions are created or changed"""
+        with self._lock:
+            self._version += 1
+            self._plans.clear()
+
+    def get(self, question_id: int, db: Session) -> Optional[ScoringPlan]:
+        """Get the plan for one question, compiling it on first use"""
+        return self.get_many([question_id], db).get(question_id)
+
+    def get_many(self, question_ids: Iterable[int], db: Session) -> Dict[int, ScoringPlan]:
+        """Get plans for several questions, loading every missing one with a single IN query"""
+        wanted = set(question_ids)
+        found, missing = self._lookup(wanted)
+        if missing:
+            version = self._version
+            questions = db.query(models.Question).filter(models.Question.id.in_(missing)).all()
+            compiled = {q.id: ScoringPlan.compile(q, version) for q in questions}
+            with self._lock:
+                if version == self._version:
+                    self._plans.update(compiled)
+            found.update(compiled)
+        return found
+
+    def _lookup(self, question_ids: Iterable[int]) -> Tuple[Dict[int, ScoringPlan], list]:
+        found = {}
+        missing = []
+        with self._lock:
+            for question_id in question_ids:
+                plan = self._plans.get(question_id)
+                if plan is not None:
+                    found[question_id] = plan
+                else:
+                    missing.append(question_id)
+        return found, missing
+
+
+# Global catalog instance
+question_catalog = QuestionCatalog()
@@ -1,15 +1,67 @@
 """
 Recommendation service for generating actionable recommendations
 """
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from app import models
 from app.models import Dimension
-from app.services.ai_diagnostics import AIDiagnosticsService
+from app.services.ai_diagnostics import AIDiagnosticsService, RecommendationCandidates
+from app.services.scoring import DimensionScore
+
+SCORE_BANDS = ("low", "medium", "high")
+
+
+def score_band(maturity_score: float) -> str:
+    if maturity_score < 2.5:
+        return "low"
+    if maturity_score < 3.5:
+        return "medium"
+    return "high"
+
+
+@dataclass(frozen=True)
+class RecommendationRule:
+    title: str
+    description: str
+    effort: str
+    impact: str
+    kpi: Optional[str]
+    timeline: str
+
+
+def compile_rules(rules: Dict[Dimension, Dict[str, List[Dict[str, Any]]]]) -> Mapping[Tuple[Dimension, str], Tuple[RecommendationRule, ...]]:
+    """
+    Resolve rule definitions into a read-only catalog keyed by (dimension, band). Medium and
+    high bands also carry the low-band rules; duplicates keep their first position.
+    """
+    catalog = {}
+    for dimension in Dimension:
+        dimension_rules = rules.get(dimension, {})
+        for band in SCORE_BANDS:
+            resolved = list(dimension_rules.get(band, []))
+            if band != "low":
+                resolved += dimension_rules.get("low", [])
+            catalog[(dimension, band)] = tuple(dict.fromkeys(
+                RecommendationRule(
+                    title=rule["title"],
+                    description=rule["description"],
+                    effort=rule["effort"],
+                    impact=rule["impact"],
+                    kpi=rule.get("kpi"),
+                    timeline=rule["timeline"],
+                )
+                for rule in resolved
+            ))
+    return MappingProxyType(catalog)
+
 
 class RecommendationService:
     """Service for generating recommendations based on scores"""
     
+    # Rule definitions; generation reads RULE_CATALOG, compiled from these at import
     RECOMMENDATION_RULES = {
         Dimension.PERFORMANCE: {
             "low": [
@@ -119,59 +171,65 @@ class RecommendationService:
         }
     }
     
-    def generate_recommendations(self, assessment_id: int, db: Session) -> List[models.Recommendation]:
-        """Generate recommendations based on assessment scores"""
+    def generate_recommendations(self, assessment_id: int, db: Session,
+                                 scores: Optional[List[DimensionScore]] = None) -> List[models.Recommendation]:
+        """
+        Generate recommendations based on assessment scores, stored with their final priorities.
+        scores are the assessment's current score values when the caller has them; else read here.
+        """
         # Delete existing recommendations
         db.query(models.Recommendation).filter(models.Recommendation.assessment_id == assessment_id).delete()
         
-        recommendations = []
-        scores = db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
+        if scores is None:
+            scores = db.query(models.Score.id, models.Score.dimension, models.Score.maturity_score).filter(
+                models.Score.assessment_id == assessment_id
+            ).all()
+        # Stored order, as generation order decides recommendation ids
+        scores = {score.dimension.value: score.maturity_score for score in sorted(scores, key=lambda s: s.id)}
         
-        for score in scores:
-            # Determine score band
-            if score.maturity_score < 2.5:
-                band = "low"
-            elif score.maturity_score < 3.5:
-                band = "medium"
-            else:
-                band = "high"
-            
-            # Get recommendations for this dimension and band
-            dimension_rules = self.RECOMMENDATION_RULES.get(score.dimension, {})
-            band_recommendations = dimension_rules.get(band, [])
-            
-            # Also include low-band recommendations if score is medium/high
-            if band != "low":
-                band_recommendations.extend(dimension_rules.get("low", []))
-            
-            priority = 0
-            for rec_data in band_recommendations:
-                rec = models.Recommendation(
-                    assessment_id=assessment_id,
-                    dimension=score.dimension,
-                    title=rec_data["title"],
-                    description=rec_data["description"],
-                    effort=rec_data["effort"],
-                    impact=rec_data["impact"],
-                    kpi=rec_data.get("kpi"),
-                    timeline=rec_data["timeline"],
-                    priority=priority,
-                    status="pending"
-                )
-                recommendations.append(rec)
-                db.add(rec)
-                priority += 1
+        # (dimension, rule, base priority) in generation order
+        candidates = []
+        for dimension_value, maturity_score in scores.items():
+            dimension = Dimension(dimension_value)
+            rules = RULE_CATALOG.get((dimension, score_band(maturity_score)), ())
+            candidates.extend((dimension, rule, priority) for priority, rule in enumerate(rules))
         
-        db.commit()
+        if not candidates:
+            db.commit()
+            return []
         
         # Apply AI-powered prioritization
-        ai_service = AIDiagnosticsService(db)
-        recommendations = ai_service.prioritize_recommendations_ai(assessment_id, recommendations)
+        priorities, order = AIDiagnosticsService.prioritize_candidates(
+            RecommendationCandidates.from_records(
+                (dimension.value, rule.impact, rule.effort, priority)
+                for dimension, rule, priority in candidates
+            ),
+            scores
+        )
         
-        # Update priorities in database
-        for rec in recommendations:
-            db.merge(rec)
+        # One executemany INSERT carrying final priorities, in generation order so ids are assigned
+        # as before (ordered RETURNING would run row by row on SQLite); read back with one query
+        db.execute(insert(models.Recommendation), [
+            {
+                "assessment_id": assessment_id,
+                "dimension": dimension,
+                "title": rule.title,
+                "description": rule.description,
+                "effort": rule.effort,
+                "impact": rule.impact,
+                "kpi": rule.kpi,
+                "timeline": rule.timeline,
+                "priority": priority,
+                "status": "pending"
+            }
+            for (dimension, rule, _), priority in zip(candidates, priorities.tolist())
+        ])
         db.commit()
         
-        return recommendations
+        recommendations = db.query(models.Recommendation).filter(
+            models.Recommendation.assessment_id == assessment_id
+        ).order_by(models.Recommendation.id).all()
+        return [recommendations[index] for index in order.tolist()]
+
 
+RULE_CATALOG = compile_rules(RecommendationService.RECOMMENDATION_RULES)
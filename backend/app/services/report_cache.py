@@ -0,0 +1,157 @@
+"""
+Content-addressed cache of rendered report files. A file is named by the hash of everything it
+renders, so it is served until its inputs change. Misses render in a process pool with one render
+per file in flight; old files are evicted least recently used first under a disk budget.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+
+from app.services.report_rendering import RENDER_VERSION
+
+REPORT_DIR = os.getenv("REPORT_DIR", "./reports")
+REPORT_CACHE_DIR = os.path.join(REPORT_DIR, "cache")
+
+Renderer = Callable[[Dict[str, Any], str], None]
+
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """Stable hash of a renderer's input"""
+    encoded = json.dumps([RENDER_VERSION, data], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+def _render_file(renderer: Renderer, data: Dict[str, Any], path: str):
+    """Render next to the target and rename into place, so readers never see a partial file"""
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        renderer(data, temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class ReportCache:
+    """Serves, renders and evicts cached report files"""
+
+    def __init__(self, directory: str = REPORT_CACHE_DIR, max_bytes: Optional[int] = None, max_workers: Optional[int] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("REPORT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        # 0 renders on the calling thread
+        self.max_workers = max_workers if max_workers is not None else int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def path_for(self, assessment_id: int, report_type: str, extension: str, data: Dict[str, Any]) -> str:
+        return os.path.join(self.directory, f"assessment_{assessment_id}_{report_type}_{content_hash(data)}.{extension}")
+
+    def get_or_render(self, assessment_id: int, report_type: str, extension: str, renderer: Renderer, data: Dict[str, Any]) -> str:
+        """Path of the report rendered from data, rendering it first unless cached or already rendering"""
+        path = self.path_for(assessment_id, report_type, extension, data)
+        if self._touch(path):
+            return path
+
+        with self._lock:
+            future = self._in_flight.get(path)
+            owner = future is None
+            if owner:
+                # A render may have finished between the first check and taking the lock
+                if self._touch(path):
+                    return path
+                future = self._in_flight[path] = Future()
+
+        if not owner:
+            future.result()
+            return path
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._render(renderer, data, path)
+            future.set_result(path)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(path, None)
+        self.evict(keep=path)
+        return path
+
+    def _render(self, renderer: Renderer, data: Dict[str, Any], path: str):
+        if self.max_workers <= 0:
+            _render_file(renderer, data, path)
+            return
+        try:
+            self._pool().submit(_render_file, renderer, data, path).result()
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next render
+            with self._lock:
+                self._executor = None
+            raise
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a threaded server can copy held locks into the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Mark a cached file as just used; False if it does not exist"""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used files until the cache fits max_bytes; returns the number deleted"""
+        try:
+            entries = [
+                entry for entry in os.scandir(self.directory)
+                if entry.is_file() and not entry.name.endswith(".tmp")
+            ]
+        except FileNotFoundError:
+            return 0
+        files = []
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        deleted = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            deleted += 1
+        return deleted
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+report_cache = ReportCache()
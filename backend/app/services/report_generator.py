@@ -1,391 +1,303 @@
 """
 Report generator service for PDF, JSON, CSV, and Excel exports
 """
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics.charts.lineplots import LinePlot
-from reportlab.graphics import renderPDF
-import json
-import csv
-import os
-from datetime import datetime
-from typing import Dict, Any, List
-import io
+from typing import Dict, Any, Iterator, List
 
 from app import models
-from app.models import Dimension
+from app.database import SessionLocal
+from app.services.report_cache import report_cache
+from app.services.report_rendering import (
+    csv_backlog_rows, csv_chunks, excel_rows, json_array_chunks, json_dumps,
+    render_csv_backlog, render_excel, render_pdf
+)
+from app.services.summaries import AssessmentSummaryService
+
+# Report artifacts that can be pre-rendered: PDF report types, the CSV backlog and the Excel export
+REPORT_ARTIFACTS = ("pdf:full", "pdf:executive", "pdf:engineering", "csv", "excel")
+# Rows fetched per round trip by the streaming exports
+STREAM_BATCH_SIZE = 500
 
-REPORT_DIR = os.getenv("REPORT_DIR", "./reports")
 
 class ReportGenerator:
     """Service for generating assessment reports"""
     
-    def __init__(self):
-        os.makedirs(REPORT_DIR, exist_ok=True)
-    
-    def generate_pdf(self, assessment_id: int, report_type: str, db: Session) -> str:
-        """Generate PDF report"""
-        assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
-        if not assessment:
+    @staticmethod
+    def _load(assessment_id: int, db: Session):
+        """The assessment and its precomputed summary payload"""
+        rows = AssessmentSummaryService.with_assessments([assessment_id], db)
+        if not rows:
             raise ValueError("Assessment not found")
-        
-        scores = db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
-        findings = db.query(models.Finding).filter(models.Finding.assessment_id == assessment_id).all()
-        recommendations = db.query(models.Recommendation).filter(
-            models.Recommendation.assessment_id == assessment_id
-        ).order_by(models.Recommendation.priority).all()
-        
-        filename = f"kpi99_assessment_{assessment_id}_{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        filepath = os.path.join(REPORT_DIR, filename)
-        
-        doc = SimpleDocTemplate(filepath, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=30
-        )
-        story.append(Paragraph("KPI99 PPI-F Engineering Maturity Report", title_style))
-        story.append(Paragraph("Performance failures are business risks — until they are engineered.", styles['Italic']))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Assessment Info
-        story.append(Paragraph(f"<b>Assessment:</b> {assessment.name}", styles['Normal']))
-        story.append(Paragraph(f"<b>Organization:</b> {assessment.organization.name}", styles['Normal']))
-        story.append(Paragraph(f"<b>Date:</b> {assessment.completed_at.strftime('%Y-%m-%d %H:%M') if assessment.completed_at else 'N/A'}", styles['Normal']))
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Executive Summary (if full or executive)
-        if report_type in ["full", "executive"]:
-            overall_maturity = sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0
-            story.append(Paragraph("<b>Executive Summary</b>", styles['Heading2']))
-            
-            # Enhanced executive summary with visual indicators
-            summary_data = [
-                ["Metric", "Value", "Status"],
-                ["PPI-F Overall Maturity Score", f"{overall_maturity:.2f}/5.0", 
-                 "Excellent" if overall_maturity >= 4.0 else "Good" if overall_maturity >= 3.0 else "Fair" if overall_maturity >= 2.0 else "Critical"],
-                ["Total Findings", str(len(findings)), 
-                 "Critical" if len([f for f in findings if f.severity == "critical"]) > 0 else "Normal"],
-                ["Total PPI-F Recommendations", str(len(recommendations)), "Action Required"],
-                ["Assessment Status", assessment.status.title(), "Completed" if assessment.status == "completed" else "In Progress"]
-            ]
-            
-            if overall_maturity < 2.0:
-                risk_level = "Critical"
-            elif overall_maturity < 3.0:
-                risk_level = "High"
-            elif overall_maturity < 4.0:
-                risk_level = "Medium"
-            else:
-                risk_level = "Low"
-            
-            summary_data.append(["Risk Level", risk_level, risk_level])
-            
-            summary_table = Table(summary_data)
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a237e')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-            ]))
-            story.append(summary_table)
-            story.append(Spacer(1, 0.3*inch))
-        
-        # Scores Heatmap (if full or engineering)
-        if report_type in ["full", "engineering"]:
-            story.append(Paragraph("<b>PPI-F Maturity Scores by Dimension</b>", styles['Heading2']))
-            
-            score_data = [["Dimension", "Maturity Score", "Percentage", "Status"]]
-            for score in scores:
-                status = "Critical" if score.maturity_score < 2.0 else "High" if score.maturity_score < 3.0 else "Medium" if score.maturity_score < 4.0 else "Good"
-                score_data.append([
-                    score.dimension.value.replace('_', ' ').title(),
-                    f"{score.maturity_score:.2f}/5.0",
-                    f"{score.percentage:.1f}%",
-                    status
-                ])
-            
-            score_table = Table(score_data)
-            score_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(score_table)
-            story.append(Spacer(1, 0.3*inch))
-        
-        # Findings (if full or engineering)
-        if report_type in ["full", "engineering"] and findings:
-            story.append(Paragraph("<b>PPI-F Key Findings</b>", styles['Heading2']))
-            for finding in findings[:10]:  # Limit to top 10
-                story.append(Paragraph(f"<b>{finding.severity.upper()}: {finding.title}</b>", styles['Normal']))
-                story.append(Paragraph(finding.description, styles['Normal']))
-                story.append(Spacer(1, 0.1*inch))
-            story.append(Spacer(1, 0.2*inch))
-        
-        # Recommendations (if full or engineering)
-        if report_type in ["full", "engineering"] and recommendations:
-            story.append(Paragraph("<b>PPI-F Engineering Recommendations & Roadmap</b>", styles['Heading2']))
-            
-            # Group by timeline
-            by_timeline = {}
-            for rec in recommendations:
-                timeline = rec.timeline
-                if timeline not in by_timeline:
-                    by_timeline[timeline] = []
-                by_timeline[timeline].append(rec)
-            
-            for timeline in ["30", "60", "90"]:
-                if timeline in by_timeline:
-                    story.append(Paragraph(f"<b>{timeline}-Day Roadmap</b>", styles['Heading3']))
-                    
-                    # Create recommendations table for better formatting
-                    rec_data = [["Title", "Effort", "Impact", "Status", "Priority"]]
-                    for rec in by_timeline[timeline]:
-                        rec_data.append([
-                            rec.title[:50] + "..." if len(rec.title) > 50 else rec.title,
-                            rec.effort.title(),
-                            rec.impact.title(),
-                            (rec.status or "pending").replace("_", " ").title(),
-                            str(rec.priority)
-                        ])
-                    
-                    rec_table = Table(rec_data, colWidths=[3*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.6*inch])
-                    rec_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('FONTSIZE', (0, 1), (-1, -1), 9),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ]))
-                    story.append(rec_table)
-                    story.append(Spacer(1, 0.2*inch))
-                    
-                    # Detailed descriptions
-                    for rec in by_timeline[timeline]:
-                        story.append(Paragraph(f"<b>{rec.title}</b>", styles['Normal']))
-                        story.append(Paragraph(rec.description, styles['Normal']))
-                        if rec.kpi:
-                            story.append(Paragraph(f"<i>KPI: {rec.kpi}</i>", styles['Italic']))
-                        story.append(Spacer(1, 0.1*inch))
-                    story.append(Spacer(1, 0.2*inch))
-        
-        doc.build(story)
-        return filepath
+        return rows[0]
     
-    def generate_json(self, assessment_id: int, db: Session) -> Dict[str, Any]:
-        """Generate JSON export"""
-        assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
-        if not assessment:
-            raise ValueError("Assessment not found")
-        
-        scores = db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
-        findings = db.query(models.Finding).filter(models.Finding.assessment_id == assessment_id).all()
-        recommendations = db.query(models.Recommendation).filter(
-            models.Recommendation.assessment_id == assessment_id
-        ).all()
-        answers = db.query(models.Answer).filter(models.Answer.assessment_id == assessment_id).all()
-        
-        overall_maturity = sum(s.maturity_score for s in scores) / len(scores) if scores else 0.0
-        
+    @staticmethod
+    def pdf_data(assessment: models.Assessment, summary: Dict[str, Any], report_type: str) -> Dict[str, Any]:
+        """Everything a PDF report renders, as plain data (also its cache key)"""
+        recommendations = sorted(summary["recommendations"], key=lambda r: r["priority"])
         return {
+            "report_type": report_type,
             "assessment": {
-                "id": assessment.id,
                 "name": assessment.name,
-                "version": assessment.version,
+                "organization_name": assessment.organization.name,
                 "status": assessment.status,
-                "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None
+                "completed_at": assessment.completed_at.strftime('%Y-%m-%d %H:%M') if assessment.completed_at else None,
             },
-            "organization": {
-                "id": assessment.organization.id,
-                "name": assessment.organization.name
-            },
-            "overall_maturity": overall_maturity,
+            "overall_maturity": summary["overall_maturity"],
+            "critical_findings": summary["critical_findings"],
             "scores": [
-                {
-                    "dimension": s.dimension.value,
-                    "maturity_score": s.maturity_score,
-                    "weighted_score": s.weighted_score,
-                    "percentage": s.percentage
-                }
-                for s in scores
+                {"dimension": s["dimension"], "maturity_score": s["maturity_score"], "percentage": s["percentage"]}
+                for s in summary["scores"]
             ],
             "findings": [
-                {
-                    "dimension": f.dimension.value,
-                    "severity": f.severity,
-                    "title": f.title,
-                    "description": f.description
-                }
-                for f in findings
+                {"severity": f["severity"], "title": f["title"], "description": f["description"]}
+                for f in summary["findings"]
             ],
             "recommendations": [
                 {
-                    "dimension": r.dimension.value,
-                    "title": r.title,
-                    "description": r.description,
-                    "effort": r.effort,
-                    "impact": r.impact,
-                    "kpi": r.kpi,
-                    "timeline": r.timeline,
-                    "priority": r.priority
+                    "title": r["title"],
+                    "description": r["description"],
+                    "effort": r["effort"],
+                    "impact": r["impact"],
+                    "status": r["status"],
+                    "priority": r["priority"],
+                    "kpi": r["kpi"],
+                    "timeline": r["timeline"],
                 }
                 for r in recommendations
             ],
-            "answers": [
+        }
+    
+    def generate_pdf(self, assessment_id: int, report_type: str, db: Session) -> str:
+        """PDF report path: the cached file while its contents are unchanged, rendered otherwise"""
+        assessment, summary = self._load(assessment_id, db)
+        return report_cache.get_or_render(
+            assessment_id, report_type, "pdf", render_pdf, self.pdf_data(assessment, summary, report_type)
+        )
+    
+    @staticmethod
+    def _recommendation_rows(summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Recommendations in backlog order (timeline, then priority) with the fields the exports show"""
+        _, _, recommendations = AssessmentSummaryService.records(summary)
+        recommendations.sort(key=lambda r: (r.timeline, r.priority))
+        return [
+            {
+                "title": rec.title,
+                "description": rec.description,
+                "dimension": rec.dimension.value,
+                "effort": rec.effort,
+                "impact": rec.impact,
+                "kpi": rec.kpi,
+                "timeline": rec.timeline,
+                "priority": rec.priority,
+                "status": rec.status,
+                "created_at": rec.created_at.strftime('%Y-%m-%d %H:%M:%S') if rec.created_at else None,
+            }
+            for rec in recommendations
+        ]
+    
+    @staticmethod
+    def csv_data(summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Everything the CSV backlog renders, as plain data (also its cache key)"""
+        return {"recommendations": ReportGenerator._recommendation_rows(summary)}
+    
+    @staticmethod
+    def excel_data(assessment: models.Assessment, summary: Dict[str, Any], answers: List[models.Answer]) -> Dict[str, Any]:
+        """Everything the Excel export renders, as plain data (also its cache key)"""
+        recommendations = ReportGenerator._recommendation_rows(summary)
+        for rec in recommendations:
+            # Not part of this export
+            del rec["created_at"]
+        return {
+            "assessment": {
+                "name": assessment.name,
+                "organization_name": assessment.organization.name,
+                "completed_at": assessment.completed_at.strftime('%Y-%m-%d %H:%M:%S') if assessment.completed_at else None,
+            },
+            "scores": [
                 {
-                    "question_id": a.question_id,
-                    "answer_value": a.answer_value,
-                    "maturity_score": a.maturity_score
+                    "dimension": s["dimension"],
+                    "maturity_score": s["maturity_score"],
+                    "weighted_score": s["weighted_score"],
+                    "max_possible_score": s["max_possible_score"],
+                    "percentage": s["percentage"],
                 }
+                for s in summary["scores"]
+            ],
+            "findings": [
+                {"severity": f["severity"], "dimension": f["dimension"], "title": f["title"], "description": f["description"]}
+                for f in summary["findings"]
+            ],
+            "recommendations": recommendations,
+            "answers": [
+                {"question_id": a.question_id, "answer_value": a.answer_value, "maturity_score": a.maturity_score}
                 for a in answers
-            ]
+            ],
         }
     
     def generate_csv(self, assessment_id: int, db: Session) -> str:
-        """Generate CSV backlog export with enhanced data"""
-        assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
-        if not assessment:
-            raise ValueError("Assessment not found")
-        
-        recommendations = db.query(models.Recommendation).filter(
-            models.Recommendation.assessment_id == assessment_id
-        ).order_by(models.Recommendation.timeline, models.Recommendation.priority).all()
-        
-        filename = f"kpi99_backlog_{assessment_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        filepath = os.path.join(REPORT_DIR, filename)
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                "Title", "Description", "Dimension", "Effort", "Impact", 
-                "KPI", "Timeline (days)", "Priority", "Status", "Created At"
-            ])
-            
-            for rec in recommendations:
-                writer.writerow([
-                    rec.title,
-                    rec.description,
-                    rec.dimension.value.replace('_', ' ').title(),
-                    rec.effort,
-                    rec.impact,
-                    rec.kpi or "",
-                    rec.timeline,
-                    rec.priority,
-                    rec.status or "pending",
-                    rec.created_at.strftime('%Y-%m-%d %H:%M:%S') if rec.created_at else ""
-                ])
-        
-        return filepath
+        """CSV backlog path: the cached file while its contents are unchanged, rendered otherwise"""
+        _, summary = self._load(assessment_id, db)
+        return report_cache.get_or_render(assessment_id, "backlog", "csv", render_csv_backlog, self.csv_data(summary))
     
     def generate_excel(self, assessment_id: int, db: Session) -> str:
-        """Generate Excel export using CSV format (Excel-compatible)"""
+        """Excel-compatible export path (CSV format): the cached file while its contents are unchanged, rendered otherwise"""
         # For now, we'll create an enhanced CSV that Excel can open
         # In production, you might want to use openpyxl or xlsxwriter
-        assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
+        assessment, summary = self._load(assessment_id, db)
+        answers = db.query(models.Answer).filter(
+            models.Answer.assessment_id == assessment_id
+        ).order_by(models.Answer.question_id).all()
+        return report_cache.get_or_render(
+            assessment_id, "excel", "csv", render_excel, self.excel_data(assessment, summary, answers)
+        )
+    
+    def render(self, assessment_id: int, report: str, db: Session) -> str:
+        """Render (or find cached) one of REPORT_ARTIFACTS; returns its path"""
+        if report == "csv":
+            return self.generate_csv(assessment_id, db)
+        if report == "excel":
+            return self.generate_excel(assessment_id, db)
+        if report.startswith("pdf:"):
+            return self.generate_pdf(assessment_id, report[len("pdf:"):], db)
+        raise ValueError(f"Unknown report artifact: {report}")
+    
+    @staticmethod
+    def _stream(statement, db: Session) -> Iterator[Dict[str, Any]]:
+        """Rows of a select as dicts, fetched STREAM_BATCH_SIZE at a time (a server-side cursor where the driver has one)"""
+        for row in db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE)).mappings():
+            yield dict(row)
+    
+    @staticmethod
+    def _assessment(assessment_id: int, db: Session) -> models.Assessment:
+        assessment = db.get(models.Assessment, assessment_id)
         if not assessment:
             raise ValueError("Assessment not found")
-        
-        scores = db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
-        findings = db.query(models.Finding).filter(models.Finding.assessment_id == assessment_id).all()
-        recommendations = db.query(models.Recommendation).filter(
-            models.Recommendation.assessment_id == assessment_id
-        ).order_by(models.Recommendation.timeline, models.Recommendation.priority).all()
-        answers = db.query(models.Answer).filter(models.Answer.assessment_id == assessment_id).all()
-        
-        filename = f"kpi99_assessment_{assessment_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        filepath = os.path.join(REPORT_DIR, filename)
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Assessment Info Sheet (simulated with headers)
-            writer.writerow(["KPI99 PPI-F Digital Diagnostic - Assessment Export"])
-            writer.writerow(["Assessment:", assessment.name])
-            writer.writerow(["Organization:", assessment.organization.name])
-            writer.writerow(["Completed:", assessment.completed_at.strftime('%Y-%m-%d %H:%M:%S') if assessment.completed_at else "N/A"])
-            writer.writerow([])
-            
-            # Scores Sheet
-            writer.writerow(["=== MATURITY SCORES ==="])
-            writer.writerow(["Dimension", "Maturity Score", "Weighted Score", "Max Possible", "Percentage"])
-            for score in scores:
-                writer.writerow([
-                    score.dimension.value.replace('_', ' ').title(),
-                    f"{score.maturity_score:.2f}",
-                    f"{score.weighted_score:.2f}",
-                    f"{score.max_possible_score:.2f}",
-                    f"{score.percentage:.1f}%"
-                ])
-            writer.writerow([])
-            
-            # Findings Sheet
-            writer.writerow(["=== KEY FINDINGS ==="])
-            writer.writerow(["Severity", "Dimension", "Title", "Description"])
-            for finding in findings:
-                writer.writerow([
-                    finding.severity,
-                    finding.dimension.value.replace('_', ' ').title(),
-                    finding.title,
-                    finding.description
-                ])
-            writer.writerow([])
+        return assessment
+    
+    @staticmethod
+    def _stream_scores(assessment_id: int, db: Session) -> Iterator[Dict[str, Any]]:
+        score = models.Score
+        for row in ReportGenerator._stream(
+            select(score.dimension, score.maturity_score, score.weighted_score, score.max_possible_score, score.percentage)
+            .where(score.assessment_id == assessment_id).order_by(score.id),
+            db
+        ):
+            row["dimension"] = row["dimension"].value
+            yield row
+    
+    @staticmethod
+    def _stream_findings(assessment_id: int, db: Session) -> Iterator[Dict[str, Any]]:
+        finding = models.Finding
+        for row in ReportGenerator._stream(
+            select(finding.dimension, finding.severity, finding.title, finding.description)
+            .where(finding.assessment_id == assessment_id).order_by(finding.id),
+            db
+        ):
+            row["dimension"] = row["dimension"].value
+            yield row
+    
+    @staticmethod
+    def _stream_recommendations(assessment_id: int, db: Session, backlog_order: bool = False) -> Iterator[Dict[str, Any]]:
+        """Recommendations in id order, or in backlog order (timeline, then priority)"""
+        rec = models.Recommendation
+        order = (rec.timeline, rec.priority, rec.id) if backlog_order else (rec.id,)
+        for row in ReportGenerator._stream(
+            select(
+                rec.dimension, rec.title, rec.description, rec.effort, rec.impact, rec.kpi,
+                rec.timeline, rec.priority, rec.status, rec.created_at
+            ).where(rec.assessment_id == assessment_id).order_by(*order),
+            db
+        ):
+            row["dimension"] = row["dimension"].value
+            row["created_at"] = row["created_at"].strftime('%Y-%m-%d %H:%M:%S') if row["created_at"] else None
+            yield row
+    
+    @staticmethod
+    def _stream_answers(assessment_id: int, db: Session) -> Iterator[Dict[str, Any]]:
+        answer = models.Answer
+        return ReportGenerator._stream(
+            select(answer.question_id, answer.answer_value, answer.maturity_score)
+            .where(answer.assessment_id == assessment_id).order_by(answer.question_id),
+            db
+        )
+    
+    def stream_csv(self, assessment_id: int) -> Iterator[str]:
+        """CSV backlog in chunks, written from a cursor over the recommendations without touching disk"""
+        db = SessionLocal()
+        try:
+            yield from csv_chunks(csv_backlog_rows(self._stream_recommendations(assessment_id, db, backlog_order=True)))
+        finally:
+            db.close()
+    
+    def stream_excel(self, assessment_id: int) -> Iterator[str]:
+        """Excel-compatible export (CSV format) in chunks, written from cursors without touching disk"""
+        db = SessionLocal()
+        try:
+            assessment = self._assessment(assessment_id, db)
+            header = {
+                "name": assessment.name,
+                "organization_name": assessment.organization.name,
+                "completed_at": assessment.completed_at.strftime('%Y-%m-%d %H:%M:%S') if assessment.completed_at else None,
+            }
+            yield from csv_chunks(excel_rows(
+                header,
+                self._stream_scores(assessment_id, db),
+                self._stream_findings(assessment_id, db),
+                self._stream_recommendations(assessment_id, db, backlog_order=True),
+                self._stream_answers(assessment_id, db)
+            ))
+        finally:
+            db.close()
+    
+    def stream_json(self, assessment_id: int) -> Iterator[str]:
+        """JSON export built incrementally, one array chunk at a time"""
+        db = SessionLocal()
+        try:
+            assessment = self._assessment(assessment_id, db)
+            # One row per dimension
+            scores = list(self._stream_scores(assessment_id, db))
+            overall_maturity = sum(s["maturity_score"] for s in scores) / len(scores) if scores else 0.0
             
-            # Recommendations Sheet
-            writer.writerow(["=== RECOMMENDATIONS & ROADMAP ==="])
-            writer.writerow([
-                "Title", "Description", "Dimension", "Effort", "Impact", 
-                "KPI", "Timeline (days)", "Priority", "Status"
+            yield '{"assessment":' + json_dumps({
+                "id": assessment.id,
+                "name": assessment.name,
+                "version": assessment.version,
+                "status": assessment.status,
+                "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None
+            })
+            yield ',"organization":' + json_dumps({
+                "id": assessment.organization.id,
+                "name": assessment.organization.name
+            })
+            yield ',"overall_maturity":' + json_dumps(overall_maturity)
+            yield ',"scores":' + json_dumps([
+                {
+                    "dimension": s["dimension"],
+                    "maturity_score": s["maturity_score"],
+                    "weighted_score": s["weighted_score"],
+                    "percentage": s["percentage"]
+                }
+                for s in scores
             ])
-            for rec in recommendations:
-                writer.writerow([
-                    rec.title,
-                    rec.description,
-                    rec.dimension.value.replace('_', ' ').title(),
-                    rec.effort,
-                    rec.impact,
-                    rec.kpi or "",
-                    rec.timeline,
-                    rec.priority,
-                    rec.status or "pending"
-                ])
-            writer.writerow([])
-            
-            # Answers Sheet
-            writer.writerow(["=== ASSESSMENT ANSWERS ==="])
-            writer.writerow(["Question ID", "Answer Value", "Maturity Score"])
-            for answer in answers:
-                writer.writerow([
-                    answer.question_id,
-                    answer.answer_value,
-                    f"{answer.maturity_score:.2f}" if answer.maturity_score else ""
-                ])
-        
-        return filepath
-
+            yield ',"findings":'
+            yield from json_array_chunks(self._stream_findings(assessment_id, db))
+            yield ',"recommendations":'
+            yield from json_array_chunks(
+                {
+                    "dimension": r["dimension"],
+                    "title": r["title"],
+                    "description": r["description"],
+                    "effort": r["effort"],
+                    "impact": r["impact"],
+                    "kpi": r["kpi"],
+                    "timeline": r["timeline"],
+                    "priority": r["priority"]
+                }
+                for r in self._stream_recommendations(assessment_id, db)
+            )
+            yield ',"answers":'
+            yield from json_array_chunks(self._stream_answers(assessment_id, db))
+            yield "}"
+        finally:
+            db.close()
@@ -0,0 +1,75 @@
+"""
+Background pre-rendering of report artifacts after assessment completion, so the first download
+is served from the report cache
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+import os
+import threading
+import traceback
+
+from app.database import SessionLocal
+from app.services.report_generator import REPORT_ARTIFACTS, ReportGenerator
+
+DEFAULT_PRERENDER_REPORT_TYPES = "pdf:full,pdf:executive,csv,excel"
+
+
+def _configured_report_types() -> List[str]:
+    """PRERENDER_REPORT_TYPES: comma-separated REPORT_ARTIFACTS entries; empty disables pre-rendering"""
+    configured = os.getenv("PRERENDER_REPORT_TYPES", DEFAULT_PRERENDER_REPORT_TYPES)
+    report_types = [report.strip() for report in configured.split(",") if report.strip()]
+    unknown = [report for report in report_types if report not in REPORT_ARTIFACTS]
+    if unknown:
+        raise ValueError(f"Unknown PRERENDER_REPORT_TYPES entries: {', '.join(unknown)}")
+    return report_types
+
+
+class ReportPrerenderer:
+    """Renders the configured report artifacts of completed assessments on a bounded worker pool"""
+
+    def __init__(self, report_types: Optional[Iterable[str]] = None, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.report_types = list(report_types) if report_types is not None else _configured_report_types()
+        max_workers = max_workers or int(os.getenv("REPORT_PRERENDER_WORKERS", "2"))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-prerender")
+        # Queued plus running assessments; beyond this completions are not pre-rendered and the
+        # first download renders on demand instead
+        self._slots = threading.BoundedSemaphore(max_pending or int(os.getenv("REPORT_PRERENDER_QUEUE", "100")))
+
+    def schedule(self, assessment_id: int) -> bool:
+        """Queue pre-rendering of an assessment's reports; False if disabled or the queue is full"""
+        if not self.report_types:
+            return False
+        if not self._slots.acquire(blocking=False):
+            print(f"Report pre-render queue full; skipping assessment {assessment_id}")
+            return False
+        try:
+            self._executor.submit(self._run, assessment_id)
+        except RuntimeError:
+            # Shut down
+            self._slots.release()
+            return False
+        return True
+
+    def _run(self, assessment_id: int):
+        db = SessionLocal()
+        try:
+            generator = ReportGenerator()
+            for report in self.report_types:
+                try:
+                    generator.render(assessment_id, report, db)
+                except Exception as e:
+                    print(f"Report pre-render '{report}' failed for assessment {assessment_id}: {e}")
+                    print(traceback.format_exc())
+                finally:
+                    # Each artifact reads the committed state on its own
+                    db.rollback()
+        finally:
+            db.close()
+            self._slots.release()
+
+    def shutdown(self, wait_for_jobs: bool = False):
+        self._executor.shutdown(wait=wait_for_jobs, cancel_futures=not wait_for_jobs)
+
+
+report_prerenderer = ReportPrerenderer()
@@ -0,0 +1,320 @@
+"""
+Pure report renderers: plain JSON-representable data in, file out. No database or app imports,
+so report render worker processes start cheaply.
+"""
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from typing import Any, Dict, Iterable, Iterator, List
+import csv
+import io
+import json
+
+# Part of every cached report's content hash; bump when a renderer's output changes
+RENDER_VERSION = 1
+# Rows (or JSON array items) per chunk of a streamed export
+CSV_ROWS_PER_CHUNK = 500
+
+
+def render_pdf(data: Dict[str, Any], filepath: str):
+    """Render a PDF report from ReportGenerator.pdf_data()"""
+    report_type = data["report_type"]
+    assessment = data["assessment"]
+    scores = data["scores"]
+    findings = data["findings"]
+    recommendations = data["recommendations"]
+
+    doc = SimpleDocTemplate(filepath, pagesize=letter)
+    story = []
+    styles = getSampleStyleSheet()
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1a237e'),
+        spaceAfter=30
+    )
+    story.append(Paragraph("KPI99 PPI-F Engineering Maturity Report", title_style))
+    story.append(Paragraph("Performance failures are business risks — until they are engineered.", styles['Italic']))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Assessment Info
+    story.append(Paragraph(f"<b>Assessment:</b> {assessment['name']}", styles['Normal']))
+    story.append(Paragraph(f"<b>Organization:</b> {assessment['organization_name']}", styles['Normal']))
+    story.append(Paragraph(f"<b>Date:</b> {assessment['completed_at'] or 'N/A'}", styles['Normal']))
+    story.append(Spacer(1, 0.3*inch))
+
+    # Executive Summary (if full or executive)
+    if report_type in ["full", "executive"]:
+        overall_maturity = data["overall_maturity"]
+        story.append(Paragraph("<b>Executive Summary</b>", styles['Heading2']))
+
+        # Enhanced executive summary with visual indicators
+        summary_data = [
+            ["Metric", "Value", "Status"],
+            ["PPI-F Overall Maturity Score", f"{overall_maturity:.2f}/5.0",
+             "Excellent" if overall_maturity >= 4.0 else "Good" if overall_maturity >= 3.0 else "Fair" if overall_maturity >= 2.0 else "Critical"],
+            ["Total Findings", str(len(findings)),
+             "Critical" if data["critical_findings"] > 0 else "Normal"],
+            ["Total PPI-F Recommendations", str(len(recommendations)), "Action Required"],
+            ["Assessment Status", assessment["status"].title(), "Completed" if assessment["status"] == "completed" else "In Progress"]
+        ]
+
+        if overall_maturity < 2.0:
+            risk_level = "Critical"
+        elif overall_maturity < 3.0:
+            risk_level = "High"
+        elif overall_maturity < 4.0:
+            risk_level = "Medium"
+        else:
+            risk_level = "Low"
+
+        summary_data.append(["Risk Level", risk_level, risk_level])
+
+        summary_table = Table(summary_data)
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a237e')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        story.append(summary_table)
+        story.append(Spacer(1, 0.3*inch))
+
+    # Scores Heatmap (if full or engineering)
+    if report_type in ["full", "engineering"]:
+        story.append(Paragraph("<b>PPI-F Maturity Scores by Dimension</b>", styles['Heading2']))
+
+        score_data = [["Dimension", "Maturity Score", "Percentage", "Status"]]
+        for score in scores:
+            maturity_score = score["maturity_score"]
+            status = "Critical" if maturity_score < 2.0 else "High" if maturity_score < 3.0 else "Medium" if maturity_score < 4.0 else "Good"
+            score_data.append([
+                score["dimension"].replace('_', ' ').title(),
+                f"{maturity_score:.2f}/5.0",
+                f"{score['percentage']:.1f}%",
+                status
+            ])
+
+        score_table = Table(score_data)
+        score_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        story.append(score_table)
+        story.append(Spacer(1, 0.3*inch))
+
+    # Findings (if full or engineering)
+    if report_type in ["full", "engineering"] and findings:
+        story.append(Paragraph("<b>PPI-F Key Findings</b>", styles['Heading2']))
+        for finding in findings[:10]:  # Limit to top 10
+            story.append(Paragraph(f"<b>{finding['severity'].upper()}: {finding['title']}</b>", styles['Normal']))
+            story.append(Paragraph(finding["description"], styles['Normal']))
+            story.append(Spacer(1, 0.1*inch))
+        story.append(Spacer(1, 0.2*inch))
+
+    # Recommendations (if full or engineering)
+    if report_type in ["full", "engineering"] and recommendations:
+        story.append(Paragraph("<b>PPI-F Engineering Recommendations & Roadmap</b>", styles['Heading2']))
+
+        # Group by timeline
+        by_timeline = {}
+        for rec in recommendations:
+            by_timeline.setdefault(rec["timeline"], []).append(rec)
+
+        for timeline in ["30", "60", "90"]:
+            if timeline in by_timeline:
+                story.append(Paragraph(f"<b>{timeline}-Day Roadmap</b>", styles['Heading3']))
+
+                # Create recommendations table for better formatting
+                rec_data = [["Title", "Effort", "Impact", "Status", "Priority"]]
+                for rec in by_timeline[timeline]:
+                    title = rec["title"]
+                    rec_data.append([
+                        title[:50] + "..." if len(title) > 50 else title,
+                        rec["effort"].title(),
+                        rec["impact"].title(),
+                        (rec["status"] or "pending").replace("_", " ").title(),
+                        str(rec["priority"])
+                    ])
+
+                rec_table = Table(rec_data, colWidths=[3*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.6*inch])
+                rec_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, 0), 10),
+                    ('FONTSIZE', (0, 1), (-1, -1), 9),
+                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ]))
+                story.append(rec_table)
+                story.append(Spacer(1, 0.2*inch))
+
+                # Detailed descriptions
+                for rec in by_timeline[timeline]:
+                    story.append(Paragraph(f"<b>{rec['title']}</b>", styles['Normal']))
+                    story.append(Paragraph(rec["description"], styles['Normal']))
+                    if rec["kpi"]:
+                        story.append(Paragraph(f"<i>KPI: {rec['kpi']}</i>", styles['Italic']))
+                    story.append(Spacer(1, 0.1*inch))
+                story.append(Spacer(1, 0.2*inch))
+
+    doc.build(story)
+
+
+def csv_backlog_rows(recommendations: Iterable[Dict[str, Any]]) -> Iterator[List[Any]]:
+    """Rows of the CSV recommendation backlog"""
+    yield [
+        "Title", "Description", "Dimension", "Effort", "Impact",
+        "KPI", "Timeline (days)", "Priority", "Status", "Created At"
+    ]
+    for rec in recommendations:
+        yield [
+            rec["title"],
+            rec["description"],
+            rec["dimension"].replace('_', ' ').title(),
+            rec["effort"],
+            rec["impact"],
+            rec["kpi"] or "",
+            rec["timeline"],
+            rec["priority"],
+            rec["status"] or "pending",
+            rec["created_at"] or ""
+        ]
+
+
+def excel_rows(assessment: Dict[str, Any], scores: Iterable[Dict[str, Any]], findings: Iterable[Dict[str, Any]],
+               recommendations: Iterable[Dict[str, Any]], answers: Iterable[Dict[str, Any]]) -> Iterator[List[Any]]:
+    """Rows of the Excel-compatible CSV export, one simulated sheet after another"""
+    # Assessment Info Sheet (simulated with headers)
+    yield ["KPI99 PPI-F Digital Diagnostic - Assessment Export"]
+    yield ["Assessment:", assessment["name"]]
+    yield ["Organization:", assessment["organization_name"]]
+    yield ["Completed:", assessment["completed_at"] or "N/A"]
+    yield []
+
+    # Scores Sheet
+    yield ["=== MATURITY SCORES ==="]
+    yield ["Dimension", "Maturity Score", "Weighted Score", "Max Possible", "Percentage"]
+    for score in scores:
+        yield [
+            score["dimension"].replace('_', ' ').title(),
+            f"{score['maturity_score']:.2f}",
+            f"{score['weighted_score']:.2f}",
+            f"{score['max_possible_score']:.2f}",
+            f"{score['percentage']:.1f}%"
+        ]
+    yield []
+
+    # Findings Sheet
+    yield ["=== KEY FINDINGS ==="]
+    yield ["Severity", "Dimension", "Title", "Description"]
+    for finding in findings:
+        yield [
+            finding["severity"],
+            finding["dimension"].replace('_', ' ').title(),
+            finding["title"],
+            finding["description"]
+        ]
+    yield []
+
+    # Recommendations Sheet
+    yield ["=== RECOMMENDATIONS & ROADMAP ==="]
+    yield [
+        "Title", "Description", "Dimension", "Effort", "Impact",
+        "KPI", "Timeline (days)", "Priority", "Status"
+    ]
+    for rec in recommendations:
+        yield [
+            rec["title"],
+            rec["description"],
+            rec["dimension"].replace('_', ' ').title(),
+            rec["effort"],
+            rec["impact"],
+            rec["kpi"] or "",
+            rec["timeline"],
+            rec["priority"],
+            rec["status"] or "pending"
+        ]
+    yield []
+
+    # Answers Sheet
+    yield ["=== ASSESSMENT ANSWERS ==="]
+    yield ["Question ID", "Answer Value", "Maturity Score"]
+    for answer in answers:
+        yield [
+            answer["question_id"],
+            answer["answer_value"],
+            f"{answer['maturity_score']:.2f}" if answer["maturity_score"] else ""
+        ]
+
+
+def csv_chunks(rows: Iterable[List[Any]], rows_per_chunk: int = CSV_ROWS_PER_CHUNK) -> Iterator[str]:
+    """CSV text in chunks of rows_per_chunk rows, for streaming responses"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def json_dumps(value: Any) -> str:
+    """Compact JSON, encoded the way JSONResponse encodes it"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def json_array_chunks(items: Iterable[Any], items_per_chunk: int = CSV_ROWS_PER_CHUNK) -> Iterator[str]:
+    """A JSON array in chunks of items_per_chunk items, for streaming responses"""
+    encoded = []
+    separator = "["
+    for item in items:
+        encoded.append(json_dumps(item))
+        if len(encoded) >= items_per_chunk:
+            yield separator + ",".join(encoded)
+            separator = ","
+            encoded = []
+    if encoded:
+        yield separator + ",".join(encoded)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+def _write_csv(rows: Iterable[List[Any]], filepath: str):
+    with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        csv.writer(csvfile).writerows(rows)
+
+
+def render_csv_backlog(data: Dict[str, Any], filepath: str):
+    """Render the CSV recommendation backlog from ReportGenerator.csv_data()"""
+    _write_csv(csv_backlog_rows(data["recommendations"]), filepath)
+
+
+def render_excel(data: Dict[str, Any], filepath: str):
+    """Render the Excel-compatible CSV export from ReportGenerator.excel_data()"""
+    _write_csv(excel_rows(data["assessment"], data["scores"], data["findings"], data["recommendations"], data["answers"]), filepath)
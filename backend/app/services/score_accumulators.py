@@ -0,0 +1,168 @@
+"""
+Running per-dimension score accumulators maintained on every answer write
+"""
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app import models
+from app.database import dialect_insert
+from app.services.question_catalog import ScoringPlan
+
+# (plan, created, previous maturity score, new maturity score)
+AnswerChange = Tuple[ScoringPlan, bool, Optional[float], Optional[float]]
+
+
+class ScoreAccumulatorService:
+    """Keeps weighted sums, weights and critical-blocker counts per dimension up to date"""
+
+    @staticmethod
+    def _contribution(plan: ScoringPlan, maturity_score: Optional[float]) -> Tuple[float, float, int]:
+        """What one answer adds to its dimension's totals"""
+        if maturity_score is None:
+            return 0.0, 0.0, 0
+        blocker = 1 if plan.is_critical and maturity_score < 2.0 else 0
+        return maturity_score * plan.weight, plan.weight, blocker
+
+    @staticmethod
+    def apply_changes(assessment_id: int, changes: Iterable[AnswerChange], db: Session) -> None:
+        """Fold answer writes into the accumulators inside the caller's transaction"""
+        deltas: Dict[models.Dimension, List[float]] = {}
+        for plan, created, previous, current in changes:
+            new_sum, new_weight, new_blockers = ScoreAccumulatorService._contribution(plan, current)
+            old_sum, old_weight, old_blockers = (0.0, 0.0, 0) if created else \
+                ScoreAccumulatorService._contribution(plan, previous)
+            delta = deltas.setdefault(plan.dimension, [0.0, 0.0, 0, 0])
+            delta[0] += new_sum - old_sum
+            delta[1] += new_weight - old_weight
+            delta[2] += new_blockers - old_blockers
+            delta[3] += 1 if created else 0
+        if not deltas:
+            return
+
+        rows = [
+            {
+                "assessment_id": assessment_id,
+                "dimension": dimension,
+                "weighted_sum": delta[0],
+                "total_weight": delta[1],
+                "critical_blockers": delta[2],
+                "answer_count": delta[3],
+            }
+            for dimension, delta in deltas.items()
+        ]
+
+        insert = dialect_insert(db)
+        if insert is None:
+            ScoreAccumulatorService._apply_rows_orm(assessment_id, rows, db)
+            return
+
+        Accumulator = models.ScoreAccumulator
+        stmt = insert(Accumulator).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Accumulator.assessment_id, Accumulator.dimension],
+            set_={
+                "weighted_sum": Accumulator.weighted_sum + stmt.excluded.weighted_sum,
+                "total_weight": Accumulator.total_weight + stmt.excluded.total_weight,
+                "critical_blockers": Accumulator.critical_blockers + stmt.excluded.critical_blockers,
+                "answer_count": Accumulator.answer_count + stmt.excluded.answer_count,
+                "updated_at": func.now(),
+            }
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def _apply_rows_orm(assessment_id: int, rows: List[dict], db: Session) -> None:
+        """Portable fallback for dialects without ON CONFLICT"""
+        existing = {
+            acc.dimension: acc
+            for acc in db.query(models.ScoreAccumulator).filter(
+                models.ScoreAccumulator.assessment_id == assessment_id
+            ).all()
+        }
+        for row in rows:
+            acc = existing.get(row["dimension"])
+            if acc is None:
+                db.add(models.ScoreAccumulator(**row))
+                continue
+            acc.weighted_sum += row["weighted_sum"]
+            acc.total_weight += row["total_weight"]
+            acc.critical_blockers += row["critical_blockers"]
+            acc.answer_count += row["answer_count"]
+        db.flush()
+
+    @staticmethod
+    def get(assessment_id: int, db: Session) -> List[models.ScoreAccumulator]:
+        """Current accumulators of an assessment; one indexed read"""
+        return db.query(models.ScoreAccumulator).filter(
+            models.ScoreAccumulator.assessment_id == assessment_id
+        ).all()
+
+    @staticmethod
+    def lock(assessment_id: int, db: Session) -> None:
+        """
+        Lock the assessment row until the caller's transaction ends, so answer writes and
+        rebuilds of one assessment read previous scores and fold deltas one at a time
+        """
+        db.query(models.Assessment.id).filter(models.Assessment.id == assessment_id).with_for_update().first()
+
+    @staticmethod
+    def rebuild(assessment_id: int, db: Session) -> List[models.ScoreAccumulator]:
+        """Recompute the accumulators from the stored answers with one grouped query"""
+        ScoreAccumulatorService.lock(assessment_id, db)
+        Answer, Question = models.Answer, models.Question
+        weight = func.coalesce(Question.weight, 1.0)
+        scored = Answer.maturity_score.isnot(None)
+        totals = db.query(
+            Question.dimension,
+            func.sum(case((scored, Answer.maturity_score * weight), else_=0.0)),
+            func.sum(case((scored, weight), else_=0.0)),
+            func.sum(case((and_(Question.is_critical.is_(True), Answer.maturity_score < 2.0), 1), else_=0)),
+            func.count(Answer.id)
+        ).join(Question, Question.id == Answer.question_id).filter(
+            Answer.assessment_id == assessment_id
+        ).group_by(Question.dimension).all()
+
+        db.query(models.ScoreAccumulator).filter(
+            models.ScoreAccumulator.assessment_id == assessment_id
+        ).delete()
+        accumulators = [
+            models.ScoreAccumulator(
+                assessment_id=assessment_id,
+                dimension=dimension,
+                weighted_sum=weighted_sum or 0.0,
+                total_weight=total_weight or 0.0,
+                critical_blockers=critical_blockers or 0,
+                answer_count=answer_count
+            )
+            for dimension, weighted_sum, total_weight, critical_blockers, answer_count in totals
+        ]
+        db.add_all(accumulators)
+        db.flush()
+        return accumulators
+
+    @staticmethod
+    def load_for_completion(assessment_id: int, db: Session) -> List[models.ScoreAccumulator]:
+        """
+        Accumulators to finalize into Score rows, read under the lock answer writes take so
+        no write is half-folded in. Assessments answered before accumulators existed have
+        none and are rebuilt once from their answers.
+        """
+        ScoreAccumulatorService.lock(assessment_id, db)
+        accumulators = ScoreAccumulatorService.get(assessment_id, db)
+        if not accumulators:
+            accumulators = ScoreAccumulatorService.rebuild(assessment_id, db)
+        return accumulators
+
+    @staticmethod
+    def copy(source_assessment_id: int, target_assessment_id: int, db: Session) -> None:
+        """Copy accumulators alongside cloned answers"""
+        for acc in ScoreAccumulatorService.get(source_assessment_id, db):
+            db.add(models.ScoreAccumulator(
+                assessment_id=target_assessment_id,
+                dimension=acc.dimension,
+                weighted_sum=acc.weighted_sum,
+                total_weight=acc.total_weight,
+                critical_blockers=acc.critical_blockers,
+                answer_count=acc.answer_count
+            ))
@@ -0,0 +1,163 @@
+"""
+Per-organization score history shared by the AI diagnostics, loaded with one query and cached
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app import models
+from app.services.cache import cache, score_history_cache_key
+
+# Invalidated on completion and assessment status changes; the TTL only bounds staleness
+# from writes that bypass invalidate_assessment_cache
+HISTORY_TTL_SECONDS = 3600
+
+
+@dataclass
+class AssessmentHistoryEntry:
+    id: int
+    name: str
+    status: str
+    created_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    scores: Dict[str, float] = field(default_factory=dict)  # dimension value -> maturity score, in score order
+
+    @property
+    def overall_maturity(self) -> float:
+        return sum(self.scores.values()) / len(self.scores) if self.scores else 0.0
+
+
+class OrgScoreHistory:
+    """Every assessment of one organization with its dimension scores, oldest first"""
+
+    def __init__(self, organization_id: int, entries: List[AssessmentHistoryEntry]):
+        self.organization_id = organization_id
+        self.entries = entries
+        self._by_id = {entry.id: entry for entry in entries}
+
+    def get(self, assessment_id: int) -> Optional[AssessmentHistoryEntry]:
+        return self._by_id.get(assessment_id)
+
+    @property
+    def completed(self) -> List[AssessmentHistoryEntry]:
+        return [entry for entry in self.entries if entry.status == "completed"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-representable form, so shared cache backends can hold it"""
+        return {
+            "organization_id": self.organization_id,
+            "entries": [
+                {
+                    "id": entry.id,
+                    "name": entry.name,
+                    "status": entry.status,
+                    "created_at": entry.created_at.isoformat() if entry.created_at else None,
+                    "completed_at": entry.completed_at.isoformat() if entry.completed_at else None,
+                    "scores": [[dimension, score] for dimension, score in entry.scores.items()],
+                }
+                for entry in self.entries
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OrgScoreHistory":
+        return cls(data["organization_id"], [
+            AssessmentHistoryEntry(
+                id=entry["id"],
+                name=entry["name"],
+                status=entry["status"],
+                created_at=datetime.fromisoformat(entry["created_at"]) if entry["created_at"] else None,
+                completed_at=datetime.fromisoformat(entry["completed_at"]) if entry["completed_at"] else None,
+                scores={dimension: score for dimension, score in entry["scores"]},
+            )
+            for entry in data["entries"]
+        ])
+
+
+def _assessment_org_key(assessment_id: int) -> str:
+    return f"score_history:assessment_{assessment_id}:org"
+
+
+class ScoreHistoryService:
+    """Loads and caches OrgScoreHistory objects"""
+
+    @staticmethod
+    def _select():
+        Assessment = models.Assessment
+        return select(
+            Assessment.organization_id, Assessment.id, Assessment.name, Assessment.status,
+            Assessment.created_at, Assessment.completed_at,
+            models.Score.dimension, models.Score.maturity_score
+        ).outerjoin(models.Score, models.Score.assessment_id == Assessment.id).order_by(
+            Assessment.organization_id, Assessment.created_at, Assessment.id, models.Score.id
+        )
+
+    @staticmethod
+    def _build(rows) -> Dict[int, OrgScoreHistory]:
+        """Histories keyed by organization id from rows of _select()"""
+        entries: Dict[int, Dict[int, AssessmentHistoryEntry]] = {}
+        for organization_id, entry_id, name, status, created_at, completed_at, dimension, score in rows:
+            organization_entries = entries.setdefault(organization_id, {})
+            entry = organization_entries.get(entry_id)
+            if entry is None:
+                entry = organization_entries[entry_id] = AssessmentHistoryEntry(entry_id, name, status, created_at, completed_at)
+            if dimension is not None:
+                entry.scores[dimension.value] = score
+        return {
+            organization_id: OrgScoreHistory(organization_id, list(organization_entries.values()))
+            for organization_id, organization_entries in entries.items()
+        }
+
+    @staticmethod
+    def load(db: Session, organization_id: Optional[int] = None, assessment_id: Optional[int] = None) -> Optional[OrgScoreHistory]:
+        """
+        One query for the history of an organization, given directly or as the organization of
+        an assessment. None if the assessment does not exist.
+        """
+        Assessment = models.Assessment
+        if organization_id is None:
+            condition = Assessment.organization_id == select(Assessment.organization_id).where(
+                Assessment.id == assessment_id
+            ).scalar_subquery()
+        else:
+            condition = Assessment.organization_id == organization_id
+        histories = ScoreHistoryService._build(db.execute(ScoreHistoryService._select().where(condition)).all())
+        if not histories:
+            return None if organization_id is None else OrgScoreHistory(organization_id, [])
+        return next(iter(histories.values()))
+
+    @staticmethod
+    def load_all(db: Session, organization_ids: Optional[Iterable[int]] = None) -> Dict[int, OrgScoreHistory]:
+        """Histories of the given organizations (default: all with assessments) with one query"""
+        statement = ScoreHistoryService._select()
+        if organization_ids is not None:
+            statement = statement.where(models.Assessment.organization_id.in_(list(organization_ids)))
+        return ScoreHistoryService._build(db.execute(statement).all())
+
+    @staticmethod
+    def get(organization_id: int, db: Session) -> OrgScoreHistory:
+        """The organization's history from cache, loaded on a miss"""
+        data = cache.get(score_history_cache_key(organization_id))
+        if data is not None:
+            return OrgScoreHistory.from_dict(data)
+        history = ScoreHistoryService.load(db, organization_id=organization_id)
+        cache.set(score_history_cache_key(organization_id), history.to_dict(), ttl_seconds=HISTORY_TTL_SECONDS)
+        return history
+
+    @staticmethod
+    def get_for_assessment(assessment_id: int, db: Session) -> Optional[OrgScoreHistory]:
+        """History of the assessment's organization (one query on a cold cache); None if it does not exist"""
+        organization_id = cache.get(_assessment_org_key(assessment_id))
+        if organization_id is not None:
+            history = ScoreHistoryService.get(organization_id, db)
+            return history if history.get(assessment_id) else None
+
+        history = ScoreHistoryService.load(db, assessment_id=assessment_id)
+        if history is None:
+            return None
+        # Assessments never change organization
+        cache.set(_assessment_org_key(assessment_id), history.organization_id, ttl_seconds=86400)
+        cache.set(score_history_cache_key(history.organization_id), history.to_dict(), ttl_seconds=HISTORY_TTL_SECONDS)
+        return history
@@ -2,122 +2,108 @@
 Scoring service for calculating maturity scores and generating findings
 """
 from sqlalchemy.orm import Session
-from typing import List
-import json
+from dataclasses import dataclass
+from typing import List, Optional
 
 from app import models
 from app.models import Dimension
+from app.services.question_catalog import ScoringPlan
+from app.services.score_accumulators import ScoreAccumulatorService
+
+
+@dataclass(frozen=True)
+class DimensionScore:
+    """A stored Score row's values, readable after the session has committed"""
+    id: int
+    dimension: Dimension
+    maturity_score: float
+
 
 class ScoringService:
     """Service for calculating assessment scores"""
     
     def calculate_maturity_score(self, question: models.Question, answer_value: str) -> float:
         """Calculate maturity score (0-5) for a single answer"""
-        if question.maturity_mapping:
-            # Use explicit mapping if available
-            try:
-                answer_data = json.loads(answer_value) if answer_value.startswith('{') else answer_value
-                if isinstance(answer_data, dict):
-                    # For structured answers, check mapping
-                    for key, score in question.maturity_mapping.items():
-                        if key in str(answer_data):
-                            return float(score)
-                else:
-                    # Direct value mapping
-                    score = question.maturity_mapping.get(str(answer_data), 0.0)
-                    return float(score)
-            except:
-                pass
-        
-        # Default scoring logic based on question type
-        if question.question_type.value == "numeric":
-            try:
-                value = float(answer_value)
-                # Normalize to 0-5 scale (adjust based on expected ranges)
-                return min(5.0, max(0.0, value / 20.0 * 5.0))
-            except:
-                return 0.0
-        elif question.question_type.value in ["single_select", "multi_select"]:
-            # For select questions, assume higher index = higher maturity
-            try:
-                options = question.options or {}
-                if isinstance(options, dict) and "options" in options:
-                    options_list = options["options"]
-                    answer_data = json.loads(answer_value) if answer_value.startswith('[') else [answer_value]
-                    if isinstance(answer_data, list) and answer_data:
-                        selected = answer_data[0] if answer_data else None
-                        if selected in options_list:
-                            index = options_list.index(selected)
-                            return (index / len(options_list)) * 5.0
-            except:
-                pass
-            return 2.5  # Default middle score
-        
-        return 0.0
+        # Hot paths score through question_catalog plans; this compiles a one-off plan
+        return ScoringPlan.compile(question).score(answer_value)
     
-    def calculate_all_scores(self, assessment_id: int, db: Session) -> List[models.Score]:
-        """Calculate scores for all dimensions"""
+    def calculate_all_scores(self, assessment_id: int, db: Session) -> List[DimensionScore]:
+        """Finalize the running score accumulators into Score rows"""
         assessment = db.query(models.Assessment).filter(models.Assessment.id == assessment_id).first()
         if not assessment:
             return []
         
-        # Delete existing scores
-        db.query(models.Score).filter(models.Score.assessment_id == assessment_id).delete()
+        # Totals are maintained on every answer write (serialized per assessment); only
+        # assessments without accumulators are recomputed from their answers here
+        accumulators = {
+            acc.dimension: acc
+            for acc in ScoreAccumulatorService.load_for_completion(assessment_id, db)
+        }
+        existing = {
+            score.dimension: score
+            for score in db.query(models.Score).filter(models.Score.assessment_id == assessment_id).all()
+        }
         
         scores = []
         for dimension in Dimension:
-            dimension_scores = self._calculate_dimension_score(assessment_id, dimension, db)
-            if dimension_scores:
-                scores.append(dimension_scores)
-        
+            acc = accumulators.get(dimension)
+            built = self.build_dimension_score(assessment_id, acc) if acc is not None else None
+            current = existing.pop(dimension, None)
+            if built is None:
+                if current is not None:
+                    db.delete(current)
+                continue
+            if current is None:
+                db.add(built)
+                scores.append(built)
+            else:
+                # Update in place instead of delete + reinsert
+                current.maturity_score = built.maturity_score
+                current.weighted_score = built.weighted_score
+                current.max_possible_score = built.max_possible_score
+                current.percentage = built.percentage
+                scores.append(current)
+        
+        for stale in existing.values():
+            db.delete(stale)
+        
+        # Captured before the commit expires the rows, so callers do not reload them
+        db.flush()
+        values = [DimensionScore(score.id, score.dimension, score.maturity_score) for score in scores]
         db.commit()
-        return scores
+        return values
     
-    def _calculate_dimension_score(self, assessment_id: int, dimension: Dimension, db: Session) -> models.Score:
-        """Calculate score for a specific dimension"""
-        # Get all answers for questions in this dimension
-        answers = db.query(models.Answer).join(models.Question).filter(
-            models.Answer.assessment_id == assessment_id,
-            models.Question.dimension == dimension
-        ).all()
-        
-        if not answers:
-            return None
-        
-        # Calculate weighted average
-        total_weighted_score = 0.0
-        total_weight = 0.0
-        max_possible_score = 0.0
-        
-        for answer in answers:
-            if answer.maturity_score is not None:
-                weight = answer.question.weight
-                total_weighted_score += answer.maturity_score * weight
-                total_weight += weight
-                max_possible_score += 5.0 * weight  # Max score is 5
-        
-        if total_weight == 0:
+    def build_dimension_score(self, assessment_id: int, acc: models.ScoreAccumulator) -> Optional[models.Score]:
+        """Build the (unsaved) Score row for a dimension from its accumulator"""
+        return self._build_dimension_score(
+            assessment_id, acc.dimension, acc.weighted_sum, acc.total_weight, acc.critical_blockers > 0
+        )
+    
+    def _build_dimension_score(
+        self,
+        assessment_id: int,
+        dimension: Dimension,
+        total_weighted_score: float,
+        total_weight: float,
+        critical_blocker: bool
+    ) -> Optional[models.Score]:
+        """Build the Score row for a dimension from its weighted totals"""
+        # Accumulated float deltas may leave a tiny residue instead of an exact zero
+        if total_weight < 1e-9:
             return None
         
-        weighted_score = total_weighted_score / total_weight if total_weight > 0 else 0.0
-        average_maturity = total_weighted_score / total_weight if total_weight > 0 else 0.0
-        percentage = (weighted_score / 5.0) * 100.0 if max_possible_score > 0 else 0.0
-        
-        # Check for critical blockers
-        critical_questions = db.query(models.Question).filter(
-            models.Question.dimension == dimension,
-            models.Question.is_critical == True
-        ).all()
+        max_possible_score = 5.0 * total_weight  # Max score is 5
+        weighted_score = total_weighted_score / total_weight
+        average_maturity = weighted_score
+        percentage = (weighted_score / 5.0) * 100.0
         
-        for crit_q in critical_questions:
-            answer = next((a for a in answers if a.question_id == crit_q.id), None)
-            if answer and answer.maturity_score is not None and answer.maturity_score < 2.0:
-                # Critical blocker - cap the score
-                weighted_score = min(weighted_score, 2.0)
-                average_maturity = min(average_maturity, 2.0)
-                percentage = min(percentage, 40.0)
+        if critical_blocker:
+            # Critical blocker - cap the score
+            weighted_score = min(weighted_score, 2.0)
+            average_maturity = min(average_maturity, 2.0)
+            percentage = min(percentage, 40.0)
         
-        score = models.Score(
+        return models.Score(
             assessment_id=assessment_id,
             dimension=dimension,
             maturity_score=average_maturity,
@@ -125,8 +111,6 @@ class ScoringService:
             max_possible_score=max_possible_score,
             percentage=percentage
         )
-        db.add(score)
-        return score
     
     def generate_findings(self, assessment_id: int, db: Session) -> List[models.Finding]:
         """Generate findings based on scores and answers"""
@@ -0,0 +1,366 @@
+"""
+Full-text search over assessment name, tags, notes and custom field values
+"""
+from bisect import bisect_left
+from sqlalchemy import Float, Integer, case, text
+from sqlalchemy.orm import Query, Session
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import re
+import threading
+
+from app import models
+
+# Relevance weights per field, highest first
+FIELDS = ["name", "tags", "notes", "custom_fields"]
+FIELD_WEIGHTS = {"name": 4.0, "tags": 2.0, "notes": 1.0, "custom_fields": 1.0}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Rows per statement when (re)building an index from the assessments table
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def tokenize(value: str) -> List[str]:
+    return [token.lower() for token in TOKEN_RE.findall(value or "")]
+
+
+def _flatten(value: Any) -> Iterable[str]:
+    """Searchable strings inside a JSON value (custom fields may nest)"""
+    if value is None:
+        return
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+    else:
+        yield str(value)
+
+
+def document_fields(name, notes, tags, custom_fields) -> Dict[str, str]:
+    """Text indexed for each field of an assessment"""
+    return {
+        "name": name or "",
+        "tags": " ".join(_flatten(tags if isinstance(tags, (list, tuple)) else None)),
+        "notes": notes or "",
+        "custom_fields": " ".join(_flatten(custom_fields if isinstance(custom_fields, dict) else None)),
+    }
+
+
+def _assessment_rows(db: Session, assessment_ids: Optional[List[int]] = None):
+    """(id, field texts) for the given assessments, or every assessment in chunks"""
+    columns = (
+        models.Assessment.id,
+        models.Assessment.name,
+        models.Assessment.notes,
+        models.Assessment.tags,
+        models.Assessment.custom_fields,
+    )
+    if assessment_ids is not None:
+        rows = db.query(*columns).filter(models.Assessment.id.in_(assessment_ids)).all()
+        for assessment_id, name, notes, tags, custom_fields in rows:
+            yield assessment_id, document_fields(name, notes, tags, custom_fields)
+        return
+    last_id = 0
+    while True:
+        rows = db.query(*columns).filter(models.Assessment.id > last_id).order_by(
+            models.Assessment.id
+        ).limit(BACKFILL_CHUNK_SIZE).all()
+        if not rows:
+            return
+        for assessment_id, name, notes, tags, custom_fields in rows:
+            yield assessment_id, document_fields(name, notes, tags, custom_fields)
+        last_id = rows[-1][0]
+
+
+class SQLiteFTSIndex:
+    """FTS5 virtual table keyed by assessment id, ranked with per-field bm25 weights"""
+
+    name = "sqlite_fts5"
+    TABLE = "assessment_search"
+
+    def ensure(self, db: Session) -> bool:
+        """Create the FTS table if missing and fill it; returns True when it was created"""
+        exists = db.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {"name": self.TABLE}).first()
+        if exists:
+            return False
+        db.execute(text(
+            f"CREATE VIRTUAL TABLE {self.TABLE} USING fts5("
+            f"{', '.join(FIELDS)}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+        self._write(db, _assessment_rows(db))
+        return True
+
+    def index(self, db: Session, assessment_ids: List[int]):
+        self.remove(db, assessment_ids)
+        self._write(db, _assessment_rows(db, assessment_ids))
+
+    def remove(self, db: Session, assessment_ids: List[int]):
+        if assessment_ids:
+            db.execute(
+                text(f"DELETE FROM {self.TABLE} WHERE rowid = :id"),
+                [{"id": assessment_id} for assessment_id in assessment_ids]
+            )
+
+    def _write(self, db: Session, rows):
+        statement = text(
+            f"INSERT INTO {self.TABLE} (rowid, {', '.join(FIELDS)}) "
+            f"VALUES (:id, {', '.join(':' + field for field in FIELDS)})"
+        )
+        batch = []
+        for assessment_id, fields in rows:
+            batch.append(dict(fields, id=assessment_id))
+            if len(batch) >= BACKFILL_CHUNK_SIZE:
+                db.execute(statement, batch)
+                batch = []
+        if batch:
+            db.execute(statement, batch)
+
+    def apply(self, query: Query, db: Session, term: str) -> Query:
+        tokens = tokenize(term)
+        if not tokens:
+            return query.filter(text("0 = 1"))
+        # Every token must match as a word prefix in some field
+        match = " AND ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
+        weights = ", ".join(str(FIELD_WEIGHTS[field]) for field in FIELDS)
+        ranked = text(
+            f"SELECT rowid AS id, -bm25({self.TABLE}, {weights}) AS score "
+            f"FROM {self.TABLE} WHERE {self.TABLE} MATCH :match"
+        ).bindparams(match=match).columns(id=Integer, score=Float).subquery("search_ranked")
+        return query.join(ranked, ranked.c.id == models.Assessment.id).order_by(ranked.c.score.desc())
+
+
+class PostgresSearchIndex:
+    """tsvector side table with a GIN index, ranked with ts_rank over weighted fields"""
+
+    name = "postgres_tsvector"
+    TABLE = "assessment_search_documents"
+    WEIGHT_CLASSES = {"name": "A", "tags": "B", "notes": "C", "custom_fields": "D"}
+
+    def ensure(self, db: Session) -> bool:
+        exists = db.execute(text("SELECT to_regclass(:name)"), {"name": self.TABLE}).scalar()
+        if exists:
+            return False
+        db.execute(text(
+            f"CREATE TABLE {self.TABLE} ("
+            "assessment_id INTEGER PRIMARY KEY REFERENCES assessments(id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        ))
+        db.execute(text(
+            f"CREATE INDEX ix_{self.TABLE}_document ON {self.TABLE} USING GIN (document)"
+        ))
+        self._write(db, _assessment_rows(db))
+        return True
+
+    def index(self, db: Session, assessment_ids: List[int]):
+        self._write(db, _assessment_rows(db, assessment_ids))
+
+    def remove(self, db: Session, assessment_ids: List[int]):
+        if assessment_ids:
+            db.execute(
+                text(f"DELETE FROM {self.TABLE} WHERE assessment_id = ANY(:ids)"),
+                {"ids": list(assessment_ids)}
+            )
+
+    def _write(self, db: Session, rows):
+        document = " || ".join(
+            f"setweight(to_tsvector('simple', :{field}), '{weight}')"
+            for field, weight in self.WEIGHT_CLASSES.items()
+        )
+        statement = text(
+            f"INSERT INTO {self.TABLE} (assessment_id, document) VALUES (:id, {document}) "
+            "ON CONFLICT (assessment_id) DO UPDATE SET document = EXCLUDED.document"
+        )
+        batch = []
+        for assessment_id, fields in rows:
+            batch.append(dict(fields, id=assessment_id))
+            if len(batch) >= BACKFILL_CHUNK_SIZE:
+                db.execute(statement, batch)
+                batch = []
+        if batch:
+            db.execute(statement, batch)
+
+    def apply(self, query: Query, db: Session, term: str) -> Query:
+        tokens = tokenize(term)
+        if not tokens:
+            return query.filter(text("false"))
+        tsquery = " & ".join(f"{token}:*" for token in tokens)
+        ranked = text(
+            f"SELECT assessment_id AS id, ts_rank(document, to_tsquery('simple', :tsquery)) AS score "
+            f"FROM {self.TABLE} WHERE document @@ to_tsquery('simple', :tsquery)"
+        ).bindparams(tsquery=tsquery).columns(id=Integer, score=Float).subquery("search_ranked")
+        return query.join(ranked, ranked.c.id == models.Assessment.id).order_by(ranked.c.score.desc())
+
+
+class InMemorySearchIndex:
+    """
+    Inverted index held by this process, for databases without native full-text search.
+    Built from the assessments table on first use; other workers' writes are not seen.
+    """
+
+    name = "memory"
+
+    # Only this many best matches that pass the caller's filters take part in a query
+    MAX_RESULTS = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._documents: Dict[int, Set[str]] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+    def ensure(self, db: Session) -> bool:
+        with self._lock:
+            if self._loaded:
+                return False
+            for assessment_id, fields in _assessment_rows(db):
+                self._add(assessment_id, fields)
+            self._loaded = True
+            return True
+
+    def index(self, db: Session, assessment_ids: List[int]):
+        self.ensure(db)
+        rows = list(_assessment_rows(db, assessment_ids))
+        with self._lock:
+            for assessment_id in assessment_ids:
+                self._discard(assessment_id)
+            for assessment_id, fields in rows:
+                self._add(assessment_id, fields)
+
+    def remove(self, db: Session, assessment_ids: List[int]):
+        with self._lock:
+            for assessment_id in assessment_ids:
+                self._discard(assessment_id)
+
+    def _add(self, assessment_id: int, fields: Dict[str, str]):
+        tokens = set()
+        for field, value in fields.items():
+            for token in tokenize(value):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._vocabulary_dirty = True
+                postings[assessment_id] = postings.get(assessment_id, 0.0) + FIELD_WEIGHTS[field]
+                tokens.add(token)
+        self._documents[assessment_id] = tokens
+
+    def _discard(self, assessment_id: int):
+        for token in self._documents.pop(assessment_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(assessment_id, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary_dirty = True
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Vocabulary words starting with prefix"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        words = []
+        for position in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            word = self._vocabulary[position]
+            if not word.startswith(prefix):
+                break
+            words.append(word)
+        return words
+
+    def search(self, term: str) -> List[Tuple[int, float]]:
+        """(assessment_id, score) of every document matching every token prefix, best first"""
+        tokens = tokenize(term)
+        if not tokens:
+            return []
+        with self._lock:
+            scores: Optional[Dict[int, float]] = None
+            for token in tokens:
+                matches: Dict[int, float] = {}
+                for word in self._expand(token):
+                    for assessment_id, weight in self._postings[word].items():
+                        matches[assessment_id] = matches.get(assessment_id, 0.0) + weight
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {i: s + matches[i] for i, s in scores.items() if i in matches}
+                if not scores:
+                    return []
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+    def apply(self, query: Query, db: Session, term: str) -> Query:
+        self.ensure(db)
+        ranked = [assessment_id for assessment_id, _ in self.search(term)]
+        # Run the caller's filters over the matches best first, so the cut keeps
+        # the top MAX_RESULTS rows the query can actually return
+        ids = []
+        for start in range(0, len(ranked), self.MAX_RESULTS):
+            chunk = ranked[start:start + self.MAX_RESULTS]
+            allowed = {
+                assessment_id for assessment_id, in query.with_entities(models.Assessment.id)
+                .order_by(None).filter(models.Assessment.id.in_(chunk))
+            }
+            ids.extend(assessment_id for assessment_id in chunk if assessment_id in allowed)
+            if len(ids) >= self.MAX_RESULTS:
+                del ids[self.MAX_RESULTS:]
+                break
+        if not ids:
+            return query.filter(text("1 = 0"))
+        order = case({assessment_id: position for position, assessment_id in enumerate(ids)},
+                     value=models.Assessment.id)
+        return query.filter(models.Assessment.id.in_(ids)).order_by(order)
+
+
+class SearchService:
+    """Keeps the assessment search index in step with writes and ranks search queries"""
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+
+    def backend(self, db: Session):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._select_backend(db)
+        return self._backend
+
+    @staticmethod
+    def _select_backend(db: Session):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return PostgresSearchIndex()
+        if dialect == "sqlite":
+            try:
+                db.connection().exec_driver_sql(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)"
+                )
+                db.connection().exec_driver_sql("DROP TABLE IF EXISTS temp.fts5_probe")
+                return SQLiteFTSIndex()
+            except Exception:
+                pass
+        return InMemorySearchIndex()
+
+    def ensure(self, db: Session) -> bool:
+        """Create and backfill the index if it does not exist yet; caller commits"""
+        return self.backend(db).ensure(db)
+
+    def index(self, assessment_ids: Iterable[int], db: Session):
+        """Re-index assessments after they were created or edited (flushed, not yet committed)"""
+        db.flush()
+        self.backend(db).index(db, list(assessment_ids))
+
+    def remove(self, assessment_ids: Iterable[int], db: Session):
+        """Drop deleted assessments from the index"""
+        self.backend(db).remove(db, list(assessment_ids))
+
+    def apply(self, query: Query, term: str, db: Session) -> Query:
+        """Restrict an assessment query to search matches, best ranked first"""
+        return self.backend(db).apply(query, db, term)
+
+
+# Global search service
+search_service = SearchService()
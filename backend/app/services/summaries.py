@@ -0,0 +1,177 @@
+"""
+Precomputed per-assessment summaries: written at completion, patched on recommendation status changes
+"""
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app import models, schemas
+
+RECOMMENDATION_STATUSES = ("pending", "in_progress", "completed", "skipped")
+
+
+def risk_level(overall_maturity: float) -> str:
+    if overall_maturity < 2.0:
+        return "critical"
+    if overall_maturity < 3.0:
+        return "high"
+    if overall_maturity < 4.0:
+        return "medium"
+    return "low"
+
+
+def _status_breakdown(recommendations: List[Dict[str, Any]]) -> Dict[str, int]:
+    breakdown = {status: 0 for status in RECOMMENDATION_STATUSES}
+    for rec in recommendations:
+        status = rec["status"] or "pending"
+        if status in breakdown:
+            breakdown[status] += 1
+    return breakdown
+
+
+class AssessmentSummaryService:
+    """Builds, stores and reads assessment_summaries rows"""
+
+    @staticmethod
+    def build_payload(assessment_id: int, db: Session) -> Dict[str, Any]:
+        """Scores, findings, recommendations and everything the read paths derive from them"""
+        scores = [
+            schemas.Score.model_validate(score).model_dump(mode="json")
+            for score in db.query(models.Score).filter(
+                models.Score.assessment_id == assessment_id
+            ).order_by(models.Score.id).all()
+        ]
+        findings = [
+            schemas.Finding.model_validate(finding).model_dump(mode="json")
+            for finding in db.query(models.Finding).filter(
+                models.Finding.assessment_id == assessment_id
+            ).order_by(models.Finding.id).all()
+        ]
+        recommendations = [
+            schemas.Recommendation.model_validate(rec).model_dump(mode="json")
+            for rec in db.query(models.Recommendation).filter(
+                models.Recommendation.assessment_id == assessment_id
+            ).order_by(models.Recommendation.id).all()
+        ]
+
+        dimension_scores = {score["dimension"]: score["maturity_score"] for score in scores}
+        overall_maturity = sum(score["maturity_score"] for score in scores) / len(scores) if scores else 0.0
+        return {
+            "scores": scores,
+            "findings": findings,
+            "recommendations": recommendations,
+            "dimension_scores": dimension_scores,
+            "overall_maturity": overall_maturity,
+            "risk_level": risk_level(overall_maturity),
+            "strongest_dimension": max(dimension_scores.items(), key=lambda x: x[1])[0] if dimension_scores else None,
+            "weakest_dimension": min(dimension_scores.items(), key=lambda x: x[1])[0] if dimension_scores else None,
+            "total_findings": len(findings),
+            "critical_findings": len([f for f in findings if f["severity"] == "critical"]),
+            "total_recommendations": len(recommendations),
+            "high_priority_recommendations": len([r for r in recommendations if r["priority"] >= 8]),
+            "quick_wins": len([r for r in recommendations if r["effort"] == "low" and r["impact"] == "high"]),
+            "recommendation_status_breakdown": _status_breakdown(recommendations),
+        }
+
+    @staticmethod
+    def refresh(assessment_id: int, db: Session) -> Dict[str, Any]:
+        """Rebuild and store the assessment's summary in the caller's transaction (not committed)"""
+        db.flush()
+        payload = AssessmentSummaryService.build_payload(assessment_id, db)
+        db.merge(models.AssessmentSummary(assessment_id=assessment_id, payload=payload))
+        db.flush()
+        return payload
+
+    @staticmethod
+    def get(assessment_id: int, db: Session) -> Dict[str, Any]:
+        """The assessment's summary payload: one primary-key read, built first if missing"""
+        summary = db.get(models.AssessmentSummary, assessment_id)
+        if summary is not None:
+            return summary.payload
+        return AssessmentSummaryService.get_many([assessment_id], db)[assessment_id]
+
+    @staticmethod
+    def get_many(assessment_ids: Iterable[int], db: Session, known: Optional[Dict[int, Dict[str, Any]]] = None) -> Dict[int, Dict[str, Any]]:
+        """Summary payloads keyed by assessment id with one IN query, building missing ones"""
+        assessment_ids = list(dict.fromkeys(assessment_ids))
+        payloads = dict(known or {})
+        wanted = [assessment_id for assessment_id in assessment_ids if assessment_id not in payloads]
+        if wanted:
+            for summary in db.query(models.AssessmentSummary).filter(
+                models.AssessmentSummary.assessment_id.in_(wanted)
+            ).all():
+                payloads[summary.assessment_id] = summary.payload
+
+        missing = [assessment_id for assessment_id in assessment_ids if assessment_id not in payloads]
+        if missing:
+            try:
+                for assessment_id in missing:
+                    payloads[assessment_id] = AssessmentSummaryService.refresh(assessment_id, db)
+                db.commit()
+            except IntegrityError:
+                # A concurrent request stored one of them first; theirs is equally current
+                db.rollback()
+                for assessment_id in missing:
+                    payloads[assessment_id] = AssessmentSummaryService.build_payload(assessment_id, db)
+        return {assessment_id: payloads[assessment_id] for assessment_id in assessment_ids}
+
+    @staticmethod
+    def with_assessments(assessment_ids: Iterable[int], db: Session) -> List[Tuple[models.Assessment, Dict[str, Any]]]:
+        """(assessment, summary payload) pairs for the existing assessments, in the given order, with one joined query"""
+        assessment_ids = list(dict.fromkeys(assessment_ids))
+        rows = {
+            assessment.id: (assessment, payload)
+            for assessment, payload in db.query(models.Assessment, models.AssessmentSummary.payload).outerjoin(
+                models.AssessmentSummary, models.AssessmentSummary.assessment_id == models.Assessment.id
+            ).filter(models.Assessment.id.in_(assessment_ids)).all()
+        }
+        payloads = AssessmentSummaryService.get_many(
+            rows, db, known={assessment_id: payload for assessment_id, (_, payload) in rows.items() if payload is not None}
+        )
+        return [(rows[assessment_id][0], payloads[assessment_id]) for assessment_id in assessment_ids if assessment_id in rows]
+
+    @staticmethod
+    def records(payload: Dict[str, Any]) -> Tuple[List[schemas.Score], List[schemas.Finding], List[schemas.Recommendation]]:
+        """The payload's scores, findings and recommendations as schema objects (attribute access, enums, datetimes)"""
+        return (
+            [schemas.Score.model_validate(score) for score in payload["scores"]],
+            [schemas.Finding.model_validate(finding) for finding in payload["findings"]],
+            [schemas.Recommendation.model_validate(rec) for rec in payload["recommendations"]],
+        )
+
+    @staticmethod
+    def apply_recommendation_status(changes: Iterable[Tuple[int, int, str]], db: Session):
+        """
+        Patch stored summaries for recommendation status changes, given as
+        (assessment_id, recommendation_id, new status). Missing summaries are built on read.
+        """
+        by_assessment: Dict[int, Dict[int, str]] = {}
+        for assessment_id, recommendation_id, status in changes:
+            by_assessment.setdefault(assessment_id, {})[recommendation_id] = status
+        if not by_assessment:
+            return
+
+        summaries = db.query(models.AssessmentSummary).filter(
+            models.AssessmentSummary.assessment_id.in_(list(by_assessment))
+        ).with_for_update().all()
+        for summary in summaries:
+            statuses = by_assessment[summary.assessment_id]
+            recommendations = [
+                dict(rec, status=statuses[rec["id"]]) if rec["id"] in statuses else rec
+                for rec in summary.payload["recommendations"]
+            ]
+            # Reassign so the JSON column is flagged dirty
+            summary.payload = dict(
+                summary.payload,
+                recommendations=recommendations,
+                recommendation_status_breakdown=_status_breakdown(recommendations)
+            )
+
+    @staticmethod
+    def invalidate(assessment_ids: Iterable[int], db: Session):
+        """Drop summaries so the next read rebuilds them"""
+        assessment_ids = list(set(assessment_ids))
+        if assessment_ids:
+            db.query(models.AssessmentSummary).filter(
+                models.AssessmentSummary.assessment_id.in_(assessment_ids)
+            ).delete(synchronize_session=False)
@@ -1,6 +1,7 @@
 """
 Webhook service for sending events to external systems
 """
+import asyncio
 import httpx
 import hmac
 import hashlib
@@ -77,11 +78,14 @@ class WebhookService:
         payload: Dict[str, Any],
         db: Session
     ):
-        """Trigger webhook event for all matching webhooks"""
+        """Trigger webhook event for all matching webhooks concurrently"""
         webhooks = WebhookService.get_webhooks_for_organization(organization_id, db)
         
-        for webhook in webhooks:
-            await WebhookService.send_webhook(webhook, event_type, payload)
+        # A slow endpoint must not hold up delivery to the others
+        await asyncio.gather(*(
+            WebhookService.send_webhook(webhook, event_type, payload)
+            for webhook in webhooks
+        ))
 
 
 
@@ -16,6 +16,38 @@ except Exception as e:
     print(f"Migration failed: {e}", file=sys.stderr)
     sys.exit(1)
 
+# Answer upserts need the unique (assessment_id, question_id) index (idempotent).
+try:
+    from app.migrate_add_answer_unique_index import migrate as migrate_answer_index
+    migrate_answer_index()
+except Exception as e:
+    print(f"Migration failed: {e}", file=sys.stderr)
+    sys.exit(1)
+
+# Index assessment child tables and analytics columns (idempotent).
+try:
+    from app.migrate_add_foreign_key_indexes import migrate as migrate_foreign_key_indexes
+    migrate_foreign_key_indexes()
+except Exception as e:
+    print(f"Migration failed: {e}", file=sys.stderr)
+    sys.exit(1)
+
+# Keyset pagination indexes on assessments (idempotent).
+try:
+    from app.migrate_add_assessment_cursor_indexes import migrate as migrate_cursor_indexes
+    migrate_cursor_indexes()
+except Exception as e:
+    print(f"Migration failed: {e}", file=sys.stderr)
+    sys.exit(1)
+
+# Full-text search index over assessments (idempotent).
+try:
+    from app.migrate_add_assessment_search import migrate as migrate_assessment_search
+    migrate_assessment_search()
+except Exception as e:
+    print(f"Migration failed: {e}", file=sys.stderr)
+    sys.exit(1)
+
 # Seed questions if the database has none (idempotent).
 try:
     from app.init_questions import init_questions
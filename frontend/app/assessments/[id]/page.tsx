@@ -196,11 +196,15 @@ export default function AssessmentPage() {
     }
 
     try {
-      await assessmentsApi.complete(assessmentId)
-      toast.success('PPI-F Diagnostic completed!')
+      const job = await assessmentsApi.complete(assessmentId)
+      if (job.data.status === 'completed_with_errors') {
+        toast.error(`PPI-F Diagnostic completed, but some follow-up steps failed (${job.data.error})`)
+      } else {
+        toast.success('PPI-F Diagnostic completed!')
+      }
       router.push(`/assessments/${assessmentId}/results`)
     } catch (error: any) {
-      toast.error(error.response?.data?.detail || 'Failed to complete assessment')
+      toast.error(error.response?.data?.detail || error.message || 'Failed to complete assessment')
     }
   }
 
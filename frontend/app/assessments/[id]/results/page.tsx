@@ -689,13 +689,13 @@ export default function ResultsPage() {
               <p className="text-sm text-slate-600 mb-3">Export data for analysis and integration</p>
               <div className="flex flex-wrap gap-2">
                 <a
-                  href={reportsApi.getExcel(assessmentId)}
+                  href={reportsApi.getExcel(assessmentId, true)}
                   className="inline-flex items-center px-4 py-2 bg-green-600 text-white rounded-lg hover:bg-green-700 transition text-sm font-semibold"
                 >
                   Excel Export
                 </a>
                 <a
-                  href={reportsApi.getCsv(assessmentId)}
+                  href={reportsApi.getCsv(assessmentId, true)}
                   className="inline-flex items-center px-4 py-2 bg-green-500 text-white rounded-lg hover:bg-green-600 transition text-sm font-semibold"
                 >
                   CSV Backlog
@@ -15,11 +15,23 @@ interface Anomaly {
 interface PredictiveInsight {
   maturity_projection?: {
     current: number
-    projected_6mo: number
+    // null when the completed assessments span too little time to show a trend
+    projected_6mo: number | null
+    lower_6mo: number | null
+    upper_6mo: number | null
+    interval_level: number
     trend: string
-    velocity: number
-    confidence: number
+    velocity: number | null
+    r_squared: number | null
+    data_points: number
   }
+  dimension_projections?: Record<string, {
+    current: number | null
+    projected_6mo: number | null
+    lower_6mo: number | null
+    upper_6mo: number | null
+    velocity: number | null
+  }>
   risk_forecast?: any
   capacity_insights?: Array<{
     dimension: string
@@ -70,15 +82,11 @@ export default function AIInsights({ assessmentId }: AIInsightsProps) {
 
   const fetchAIInsights = async () => {
     try {
-      const [anomaliesRes, predictiveRes, workloadRes] = await Promise.all([
-        aiDiagnosticsApi.getAnomalies(assessmentId),
-        aiDiagnosticsApi.getInsights(assessmentId),
-        aiDiagnosticsApi.getWorkloadInsights(assessmentId)
-      ])
+      const { data } = await aiDiagnosticsApi.getAll(assessmentId)
 
-      setAnomalies(anomaliesRes.data.anomalies || [])
-      setPredictiveInsights(predictiveRes.data || null)
-      setWorkloadInsights(workloadRes.data.insights || [])
+      setAnomalies(data.anomalies?.anomalies || [])
+      setPredictiveInsights(data.insights || null)
+      setWorkloadInsights(data.workload?.insights || [])
     } catch (error: any) {
       console.error('Error fetching AI insights:', error)
       // Silently fail - AI insights are optional
@@ -217,7 +225,7 @@ export default function AIInsights({ assessmentId }: AIInsightsProps) {
       {/* Predictive Insights Tab */}
       {activeTab === 'predictive' && (
         <div className="space-y-6">
-          {predictiveInsights?.maturity_projection && (
+          {predictiveInsights?.maturity_projection?.projected_6mo !== undefined && (
             <div className="bg-gradient-to-br from-blue-50 to-purple-50 rounded-lg p-6 border border-blue-200">
               <h3 className="font-semibold text-lg mb-4 flex items-center">
                 <span className="mr-2">📈</span>
@@ -233,25 +241,52 @@ export default function AIInsights({ assessmentId }: AIInsightsProps) {
                 <div>
                   <div className="text-xs text-slate-600 mb-1">6-Month Projection</div>
                   <div className="text-2xl font-bold text-purple-600">
-                    {predictiveInsights.maturity_projection.projected_6mo.toFixed(2)}
+                    {predictiveInsights.maturity_projection.projected_6mo !== null
+                      ? predictiveInsights.maturity_projection.projected_6mo.toFixed(2)
+                      : '—'}
                   </div>
                 </div>
                 <div>
                   <div className="text-xs text-slate-600 mb-1">Trend</div>
                   <div className="text-lg font-semibold capitalize">
                     {predictiveInsights.maturity_projection.trend === 'improving' ? '📈' : 
-                     predictiveInsights.maturity_projection.trend === 'declining' ? '📉' : '➡️'}
+                     predictiveInsights.maturity_projection.trend === 'declining' ? '📉' :
+                     predictiveInsights.maturity_projection.trend === 'insufficient_data' ? '⏳' : '➡️'}
                     {' '}
-                    {predictiveInsights.maturity_projection.trend}
+                    {predictiveInsights.maturity_projection.trend.replace('_', ' ')}
                   </div>
                 </div>
                 <div>
-                  <div className="text-xs text-slate-600 mb-1">Confidence</div>
+                  <div className="text-xs text-slate-600 mb-1">
+                    {Math.round(predictiveInsights.maturity_projection.interval_level * 100)}% Interval
+                  </div>
                   <div className="text-lg font-semibold">
-                    {Math.round(predictiveInsights.maturity_projection.confidence * 100)}%
+                    {predictiveInsights.maturity_projection.lower_6mo !== null && predictiveInsights.maturity_projection.upper_6mo !== null
+                      ? `${predictiveInsights.maturity_projection.lower_6mo.toFixed(2)} – ${predictiveInsights.maturity_projection.upper_6mo.toFixed(2)}`
+                      : 'Needs 3+ assessments'}
                   </div>
                 </div>
               </div>
+              <p className="text-xs text-slate-600 mt-3">
+                {predictiveInsights.maturity_projection.velocity !== null
+                  ? `${predictiveInsights.maturity_projection.velocity >= 0 ? '+' : ''}${predictiveInsights.maturity_projection.velocity.toFixed(2)} points/month, fitted over ${predictiveInsights.maturity_projection.data_points} completed assessments`
+                  : `${predictiveInsights.maturity_projection.data_points} completed assessments within a day of each other; complete assessments over time to see a trend`}
+              </p>
+              {predictiveInsights.dimension_projections && Object.keys(predictiveInsights.dimension_projections).length > 0 && (
+                <div className="mt-4 space-y-1">
+                  {Object.entries(predictiveInsights.dimension_projections).map(([dimension, projection]) => (
+                    <div key={dimension} className="flex justify-between text-sm">
+                      <span>{DIMENSION_LABELS[dimension] || dimension}</span>
+                      <span className="font-medium">
+                        {projection.current !== null ? `${projection.current.toFixed(2)} → ` : ''}
+                        {projection.projected_6mo !== null ? projection.projected_6mo.toFixed(2) : '—'}
+                        {projection.lower_6mo !== null && projection.upper_6mo !== null &&
+                          ` (${projection.lower_6mo.toFixed(2)} – ${projection.upper_6mo.toFixed(2)})`}
+                      </span>
+                    </div>
+                  ))}
+                </div>
+              )}
             </div>
           )}
 
@@ -292,7 +327,7 @@ export default function AIInsights({ assessmentId }: AIInsightsProps) {
             </div>
           )}
 
-          {!predictiveInsights?.maturity_projection && 
+          {predictiveInsights?.maturity_projection?.projected_6mo === undefined && 
            (!predictiveInsights?.capacity_insights || predictiveInsights.capacity_insights.length === 0) &&
            (!predictiveInsights?.cost_insights || predictiveInsights.cost_insights.length === 0) && (
             <div className="text-center py-8 text-slate-500">
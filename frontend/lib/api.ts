@@ -57,6 +57,11 @@ export interface Assessment {
   completed_at?: string
 }
 
+export interface AssessmentPage {
+  items: Assessment[]
+  next_cursor: string | null
+}
+
 export interface Webhook {
   id: number
   organization_id: number
@@ -154,6 +159,34 @@ export interface TelemetryUploadDetail extends TelemetryUploadSummary {
   summary?: Record<string, unknown> | null
 }
 
+export interface CompletionStage {
+  name: string
+  status: 'pending' | 'running' | 'completed' | 'failed' | 'skipped'
+  started_at: string | null
+  finished_at: string | null
+  duration_ms: number | null
+  error: string | null
+}
+
+export interface CompletionJob {
+  job_id: string
+  assessment_id: number
+  // completed_with_errors: the assessment is completed but a follow-up stage
+  // (webhooks, notification, anomalies, reports) failed; see error and stages
+  // unknown: no worker still tracks the job and the assessment is not completed yet
+  status: 'queued' | 'running' | 'completed' | 'completed_with_errors' | 'failed' | 'unknown'
+  created_at: string | null
+  started_at: string | null
+  finished_at: string | null
+  error: string | null
+  result: { scores?: number; findings?: number; recommendations?: number; overall_maturity?: number }
+  stages: CompletionStage[]
+}
+
+// Completion polling gives up after two minutes
+const COMPLETION_POLL_INTERVAL_MS = 500
+const COMPLETION_POLL_MAX_ATTEMPTS = 240
+
 export const assessmentsApi = {
   list: (organizationId?: number, status?: string, search?: string) =>
     api.get<Assessment[]>('/api/assessments', {
@@ -163,6 +196,15 @@ export const assessmentsApi = {
         ...(search ? { search } : {}),
       },
     }),
+  listPage: (cursor: string | null, organizationId?: number, status?: string, limit?: number) =>
+    api.get<AssessmentPage>('/api/assessments', {
+      params: {
+        cursor: cursor || '',
+        ...(organizationId ? { organization_id: organizationId } : {}),
+        ...(status ? { status } : {}),
+        ...(limit ? { limit } : {}),
+      },
+    }),
   get: (id: number) => api.get<Assessment>(`/api/assessments/${id}`),
   create: (data: {
     organization_id: number
@@ -180,8 +222,25 @@ export const assessmentsApi = {
       assessment_id: assessmentId,
       ...data,
     }),
-  complete: (assessmentId: number) =>
-    api.post(`/api/assessments/${assessmentId}/complete`),
+  complete: async (assessmentId: number) => {
+    // Completion runs as a background job; poll its status until it finishes
+    const queued = await api.post<{ job_id: string }>(`/api/assessments/${assessmentId}/complete`)
+    for (let attempt = 0; attempt < COMPLETION_POLL_MAX_ATTEMPTS; attempt++) {
+      const status = await api.get<CompletionJob>(`/api/assessments/${assessmentId}/complete/status`, {
+        params: { job_id: queued.data.job_id },
+      })
+      if (status.data.status === 'completed' || status.data.status === 'completed_with_errors') return status
+      if (status.data.status === 'failed') {
+        throw new Error(status.data.error || 'Assessment completion failed')
+      }
+      await new Promise((resolve) => setTimeout(resolve, COMPLETION_POLL_INTERVAL_MS))
+    }
+    throw new Error('Timed out waiting for assessment completion')
+  },
+  getCompletionStatus: (assessmentId: number, jobId?: string) =>
+    api.get<CompletionJob>(`/api/assessments/${assessmentId}/complete/status`, {
+      params: jobId ? { job_id: jobId } : {},
+    }),
   getSummary: (assessmentId: number) =>
     api.get(`/api/assessments/${assessmentId}/summary`),
   compare: (assessmentId1: number, assessmentId2: number) =>
@@ -218,6 +277,8 @@ export const recommendationsApi = {
 }
 
 export const aiDiagnosticsApi = {
+  getAll: (assessmentId: number) =>
+    api.get(`/api/assessments/${assessmentId}/ai`),
   getAnomalies: (assessmentId: number) =>
     api.get(`/api/assessments/${assessmentId}/ai/anomalies`),
   getInsights: (assessmentId: number) =>
@@ -228,8 +289,11 @@ export const aiDiagnosticsApi = {
 
 export const analyticsApi = {
   getIndustries: () => api.get<IndustryOption[]>('/api/analytics/industries'),
-  getTrends: (organizationId: number) =>
-    api.get(`/api/analytics/organization/${organizationId}/trends`),
+  getTrends: (
+    organizationId: number,
+    options?: { since?: string; until?: string; bucket?: 'day' | 'week' | 'month' | 'quarter' | 'year' }
+  ) =>
+    api.get(`/api/analytics/organization/${organizationId}/trends`, { params: options || {} }),
   getMetrics: (organizationId: number) =>
     api.get(`/api/analytics/organization/${organizationId}/metrics`),
   getBenchmark: (organizationId: number) =>
@@ -277,10 +341,10 @@ export const reportsApi = {
     `${API_BASE}/api/reports/${assessmentId}/pdf?report_type=${reportType}`,
   getJson: (assessmentId: number) =>
     api.get(`/api/reports/${assessmentId}/json`),
-  getCsv: (assessmentId: number) =>
-    `${API_BASE}/api/reports/${assessmentId}/csv`,
-  getExcel: (assessmentId: number) =>
-    `${API_BASE}/api/reports/${assessmentId}/excel`,
+  getCsv: (assessmentId: number, cache: boolean = false) =>
+    `${API_BASE}/api/reports/${assessmentId}/csv${cache ? '?cache=true' : ''}`,
+  getExcel: (assessmentId: number, cache: boolean = false) =>
+    `${API_BASE}/api/reports/${assessmentId}/excel${cache ? '?cache=true' : ''}`,
 }
 
 export default api